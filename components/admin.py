@@ -1,10 +1,31 @@
 from django.contrib import admin
 
+from .caching import catalogue_version
 from .models import FavouritePlanet, FavouriteMovie, Movie, Planet
 
 # Register your models here.
 
-admin.site.register(Planet)
-admin.site.register(Movie)
+
+class CatalogueAdmin(admin.ModelAdmin):
+    """
+    Bumps the catalogue version on every edit so cached list payloads are rebuilt
+    """
+
+    def save_related(self, request, form, formsets, change):
+        # the object is saved before its many to many links, bump once both are
+        super().save_related(request, form, formsets, change)
+        catalogue_version.bump()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        catalogue_version.bump()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        catalogue_version.bump()
+
+
+admin.site.register(Planet, CatalogueAdmin)
+admin.site.register(Movie, CatalogueAdmin)
 admin.site.register(FavouriteMovie)
 admin.site.register(FavouritePlanet)
@@ -0,0 +1,207 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, JsonResponse
+from django.utils.decorators import classonlymethod
+from django.views import View
+
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
+
+from .caching import (
+    catalogue_payloads,
+    catalogue_searches,
+    catalogue_version,
+    primary_pins,
+)
+from .compression import negotiate
+from .metrics import timing
+from .pagination import KeysetPaginator
+from .routers import aread_alias_for, reading_from
+from .views import (
+    BulkFavouriteMovieMixin,
+    BulkFavouritePlanetMixin,
+    FavouriteMovieMixin,
+    FavouritePlanetMixin,
+    MovieListMixin,
+    PlanetListMixin,
+    page_etag,
+    page_response,
+    parse_stream,
+    search_key,
+)
+
+# Native async counterparts of the views in components.views, served without
+# going through the sync adapter when the project runs under an ASGI server.
+# Validation, querysets and rendering come from the mixins shared with the sync views
+
+
+def json_response(data, status=status.HTTP_200_OK):
+    with timing("render"):
+        content = JSONRenderer().render(data)
+    return HttpResponse(content, content_type="application/json", status=status)
+
+
+def parse_body(request):
+    try:
+        return json.loads(request.body or b"{}")
+    except ValueError:
+        raise ValidationError({"detail": "Malformed json body"})
+
+
+class AsyncView(View):
+    """
+    Async view turning DRF validation errors into 400 responses like APIView does
+    """
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except ValidationError as error:
+            return JsonResponse(error.detail, status=status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncCatalogueListView(AsyncView):
+    async def get(self, request):
+        term, user_id, include = self.parse_params(request.GET)
+        if parse_stream(request.GET):
+            # a page would silently stand in for the full list the client asked for
+            raise ValidationError({"stream": "Not supported by the async endpoints"})
+        paginator = KeysetPaginator(request.GET)
+        # the context is copied into the threads running async orm queries
+        with reading_from(await aread_alias_for(user_id)):
+            if user_id is None and not term:
+                return await self.cached_list(request, paginator, include)
+            if user_id is None:
+                content = await self.searched_list(paginator, term, include)
+            else:
+                has_favourites = await self.user_entries(user_id).aexists()
+                content = self.render(
+                    await self.get_page_data(
+                        paginator, user_id, has_favourites, term, include
+                    )
+                )
+        return HttpResponse(content, content_type="application/json")
+
+    async def get_page_data(
+        self, paginator, user_id, has_favourites, term, include=None
+    ):
+        queryset = self.row_renderer.rows(
+            self.get_queryset(user_id, has_favourites, term)
+        )
+        rows = await paginator.apaginate_queryset(queryset)
+        related = (
+            await self.includes[include].aload([row.id for row in rows])
+            if include
+            else {}
+        )
+        return self.to_page_data(paginator, rows, related, include)
+
+    async def cached_list(self, request, paginator, include=None):
+        version = await catalogue_version.aget()
+        kind = self.page_kind(include)
+        encoding = negotiate(request.headers.get("Accept-Encoding", ""))
+        not_modified = self.not_modified(
+            request, page_etag(version, kind, paginator, encoding)
+        )
+        if not_modified:
+            return not_modified
+
+        async def build():
+            return self.render(
+                await self.get_page_data(paginator, None, False, None, include)
+            )
+
+        served, content = await catalogue_payloads.aget_or_build(
+            version, kind, paginator.limit, paginator.after, build, encoding
+        )
+        return page_response(
+            content, page_etag(served, kind, paginator, encoding), encoding
+        )
+
+    async def searched_list(self, paginator, term, include=None):
+        version = await catalogue_version.aget()
+        key = search_key(version, self.kind, include, paginator, term)
+
+        async def search():
+            return self.render(
+                await self.get_page_data(paginator, None, False, term, include)
+            )
+
+        return await catalogue_searches.ado(key, search)
+
+
+class AsyncMovieListView(MovieListMixin, AsyncCatalogueListView):
+    pass
+
+
+class AsyncPlanetListView(PlanetListMixin, AsyncCatalogueListView):
+    pass
+
+
+class AsyncFavouriteView(AsyncView):
+    async def post(self, request):
+        user_id, object_id, custom_name = self.validate_upsert(parse_body(request))
+        # the single statement upsert runs on a raw cursor, which has no async api
+        favourite = await sync_to_async(self.model.objects.upsert)(
+            user_id, object_id, custom_name
+        )
+        if favourite is None:
+            raise self.missing_object()
+        await self.favourites_cache.ainvalidate(user_id)
+        await sync_to_async(self.entry_model.objects.materialize)(user_id, [object_id])
+        await primary_pins.apin(user_id)
+        return json_response(self.to_data(favourite))
+
+    put = post
+
+    async def delete(self, request):
+        user_id, object_id = self.validate_delete(parse_body(request))
+        if not await sync_to_async(self.model.objects.remove)(user_id, object_id):
+            return HttpResponse(status=status.HTTP_404_NOT_FOUND)
+        await self.favourites_cache.ainvalidate(user_id)
+        await sync_to_async(self.entry_model.objects.remove)(user_id, object_id)
+        await primary_pins.apin(user_id)
+        return HttpResponse(status=status.HTTP_204_NO_CONTENT)
+
+
+class AsyncFavouriteMovieView(FavouriteMovieMixin, AsyncFavouriteView):
+    pass
+
+
+class AsyncFavouritePlanetView(FavouritePlanetMixin, AsyncFavouriteView):
+    pass
+
+
+class AsyncBulkFavouriteView(AsyncView):
+    async def post(self, request):
+        user_id, favourites, results = self.validate_items(parse_body(request))
+        existing = {
+            object_id
+            async for object_id in self.catalogue_model.objects.filter(
+                id__in=favourites
+            ).values_list("id", flat=True)
+        }
+        saved = self.saved_ids(favourites, results, existing)
+        await self.model.objects.abulk_create(
+            self.to_objects(user_id, favourites, saved), **self.upsert_options()
+        )
+        await self.favourites_cache.ainvalidate(user_id)
+        await sync_to_async(self.entry_model.objects.materialize)(user_id, saved)
+        await primary_pins.apin(user_id)
+        return json_response({"data": {"user_id": user_id, "results": results}})
+
+
+class AsyncBulkFavouriteMovieView(BulkFavouriteMovieMixin, AsyncBulkFavouriteView):
+    pass
+
+
+class AsyncBulkFavouritePlanetView(BulkFavouritePlanetMixin, AsyncBulkFavouriteView):
+    pass
@@ -0,0 +1,155 @@
+import re
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left
+
+from .caching import catalogue_version, movie_favourites, planet_favourites
+from .models import Movie, Planet
+
+WORD = re.compile(r"\w+")
+
+
+def normalize(name):
+    """
+    Case and accent insensitive form of a name, "Hoth" and "hôth" both become "hoth"
+    """
+    decomposed = unicodedata.normalize("NFKD", name)
+    return "".join(
+        char for char in decomposed if not unicodedata.combining(char)
+    ).casefold()
+
+
+def suffixes(name):
+    """
+    Normalized name from its start and from the start of each of its words,
+    so a prefix of any word of the name finds it
+    """
+    normalized = normalize(name)
+    starts = {0, *(match.start() for match in WORD.finditer(normalized))}
+    return [normalized[start:] for start in sorted(starts)]
+
+
+class Record:
+    __slots__ = ("id", "name")
+
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+
+
+class PrefixIndex:
+    """
+    Read-only sorted array of the normalized word suffixes of catalogue names,
+    `positions` holds the record of each key so a prefix is a bisect and a scan
+    of the adjacent keys
+    """
+
+    __slots__ = ("records", "keys", "positions")
+
+    def __init__(self, rows):
+        self.records = [Record(object_id, name) for object_id, name in rows]
+        entries = sorted(
+            (key, position)
+            for position, record in enumerate(self.records)
+            for key in suffixes(record.name)
+        )
+        self.keys = [key for key, _ in entries]
+        self.positions = array("L", (position for _, position in entries))
+
+    def __len__(self):
+        return len(self.records)
+
+    def search(self, term, limit, exclude=frozenset()):
+        """
+        Records with a word starting with normalized term, in key order, skipping
+        ids in exclude
+        """
+        keys = self.keys
+        seen = set(exclude)
+        results = []
+        for index in range(bisect_left(keys, term), len(keys)):
+            if len(results) >= limit or not keys[index].startswith(term):
+                break
+            record = self.records[self.positions[index]]
+            if record.id not in seen:
+                seen.add(record.id)
+                results.append(record)
+        return results
+
+
+class CatalogueAutocomplete:
+    """
+    Process-local prefix index of a catalogue table, built on first use and rebuilt
+    when the catalogue version changes. Matches of the user renamed favourites come
+    first and every result carries the name the user sees
+    """
+
+    def __init__(self, model, name_field, favourites_cache):
+        self.model = model
+        self.name_field = name_field
+        self.favourites_cache = favourites_cache
+        # (catalogue version, index) swapped as a whole, readers never lock
+        self._current = None
+        self._lock = threading.Lock()
+
+    def build(self):
+        return PrefixIndex(
+            self.model.objects.order_by().values_list("id", self.name_field).iterator()
+        )
+
+    def get_index(self):
+        version = catalogue_version.get()
+        current = self._current
+        if current is not None and current[0] == version:
+            return current[1]
+        # one thread rebuilds while the others keep serving the previous index,
+        # only the first build is waited for
+        if not self._lock.acquire(blocking=current is None):
+            return current[1]
+        try:
+            current = self._current
+            if current is None or current[0] != version:
+                current = self._current = (version, self.build())
+        finally:
+            self._lock.release()
+        return current[1]
+
+    def complete(self, term, limit, user_id=None):
+        """
+        Up to limit (id, name, is_favourite) matches of term
+        """
+        term = normalize(term.strip())
+        if not term:
+            return []
+        index = self.get_index()
+        favourites = (
+            self.favourites_cache.get_map(user_id) if user_id is not None else {}
+        )
+        renamed = {
+            object_id: custom_name
+            for object_id, custom_name in favourites.items()
+            if custom_name
+        }
+        results = [
+            (object_id, custom_name, True)
+            for object_id, custom_name in sorted(
+                renamed.items(), key=lambda item: item[1]
+            )
+            if any(key.startswith(term) for key in suffixes(custom_name))
+        ][:limit]
+        for record in index.search(
+            term, limit - len(results), exclude={object_id for object_id, *_ in results}
+        ):
+            results.append(
+                (
+                    record.id,
+                    renamed.get(record.id, record.name),
+                    record.id in favourites,
+                )
+            )
+        return results
+
+
+movie_autocomplete = CatalogueAutocomplete(Movie, "title", movie_favourites)
+planet_autocomplete = CatalogueAutocomplete(Planet, "name", planet_favourites)
@@ -0,0 +1,64 @@
+import statistics
+import subprocess
+import time
+
+from django.conf import settings
+
+# benchmark favourites are written for user ids above any real user
+FIRST_USER_ID = 10**9
+
+
+def percentile(samples, pct):
+    """
+    Nearest-rank percentile of a list of samples
+    """
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    """
+    Summarize a list of durations in seconds as milliseconds
+    """
+    return {
+        "runs": len(samples),
+        "mean_ms": round(statistics.mean(samples) * 1000, 3),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+    }
+
+
+def measure(func, repeat):
+    """
+    Call func repeat times and summarize how long each call took
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+class Rollback(Exception):
+    """
+    Raised to roll back the transaction holding generated benchmark data
+    """
+
+
+def git_revision():
+    """
+    Commit the benchmark ran against, None outside of a git checkout
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            cwd=settings.BASE_DIR,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -0,0 +1,297 @@
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .compression import compress
+from .models import FavouriteMovie, FavouritePlanet
+from .singleflight import SingleFlight
+
+
+class FavouritesCache:
+    """
+    Per-user map of favourite object id to its custom name, loaded from the
+    database on first read and invalidated on favourite writes
+    """
+
+    def __init__(self, model, object_field, name_field, key_prefix):
+        self.model = model
+        self.object_field = object_field
+        self.name_field = name_field
+        self.key_prefix = key_prefix
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[settings.FAVOURITES_CACHE_ALIAS]
+
+    def key(self, user_id):
+        return f"{self.key_prefix}:{user_id}"
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def load(self, user_id):
+        return dict(
+            self.model.objects.filter(user_id=user_id).values_list(
+                self.object_field, self.name_field
+            )
+        )
+
+    def get_map(self, user_id):
+        favourites = self.cache.get(self.key(user_id))
+        self._count(hit=favourites is not None)
+        if favourites is None:
+            favourites = self.load(user_id)
+            self.cache.set(
+                self.key(user_id), favourites, settings.FAVOURITES_CACHE_TIMEOUT
+            )
+        return favourites
+
+    async def aget_map(self, user_id):
+        favourites = await self.cache.aget(self.key(user_id))
+        self._count(hit=favourites is not None)
+        if favourites is None:
+            favourites = {
+                object_id: custom_name
+                async for object_id, custom_name in self.model.objects.filter(
+                    user_id=user_id
+                ).values_list(self.object_field, self.name_field)
+            }
+            await self.cache.aset(
+                self.key(user_id), favourites, settings.FAVOURITES_CACHE_TIMEOUT
+            )
+        return favourites
+
+    def invalidate(self, user_id):
+        """
+        Drop the cached map of a user after a favourite write, deleting the key is
+        atomic where updating the map in place would lose concurrent writes
+        """
+        self.cache.delete(self.key(user_id))
+
+    async def ainvalidate(self, user_id):
+        await self.cache.adelete(self.key(user_id))
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+
+movie_favourites = FavouritesCache(
+    FavouriteMovie, "movie_id", "custom_title", "favourites:movie"
+)
+planet_favourites = FavouritesCache(
+    FavouritePlanet, "planet_id", "custom_name", "favourites:planet"
+)
+
+
+def cache_stats():
+    return {
+        "favourite_movies": movie_favourites.stats(),
+        "favourite_planets": planet_favourites.stats(),
+    }
+
+
+class CatalogueVersion:
+    """
+    Token identifying the current state of the movie and planet catalogue, bumped
+    whenever the catalogue is written so cached payloads of the old version expire.
+    A random token instead of a counter keeps versions unique after cache eviction,
+    and the token expiring bounds staleness of process-local caches that never see
+    bumps made by other processes
+    """
+
+    key = "catalogue:version"
+
+    @property
+    def cache(self):
+        return caches[settings.CATALOGUE_CACHE_ALIAS]
+
+    def get(self):
+        version = self.cache.get(self.key)
+        if version is None:
+            self.cache.add(self.key, uuid.uuid4().hex, settings.CATALOGUE_CACHE_TIMEOUT)
+            version = self.cache.get(self.key)
+        return version
+
+    async def aget(self):
+        version = await self.cache.aget(self.key)
+        if version is None:
+            await self.cache.aadd(
+                self.key, uuid.uuid4().hex, settings.CATALOGUE_CACHE_TIMEOUT
+            )
+            version = await self.cache.aget(self.key)
+        return version
+
+    def bump(self):
+        self.cache.set(self.key, uuid.uuid4().hex, settings.CATALOGUE_CACHE_TIMEOUT)
+
+
+class CataloguePayloadCache:
+    """
+    Pre-encoded JSON bodies of anonymous, unfiltered list pages, keyed by catalogue version.
+    Concurrent misses of a page are coalesced so it is built once, and with
+    CATALOGUE_STALE_WHILE_REVALIDATE the page of the previous version is served
+    while it is rebuilt. Pages are returned as (version, content).
+    Compressed variants are built once per version, at the slowest compression level,
+    and cached next to the page
+    """
+
+    def __init__(self):
+        self.flights = SingleFlight("catalogue_pages")
+
+    @property
+    def cache(self):
+        return caches[settings.CATALOGUE_CACHE_ALIAS]
+
+    def key(self, version, kind, limit, cursor):
+        return f"catalogue:{version}:{kind}:{limit}:{cursor or ''}"
+
+    def latest_key(self, kind, limit, cursor):
+        return f"catalogue:latest:{kind}:{limit}:{cursor or ''}"
+
+    def get_or_build(self, version, kind, limit, cursor, build, encoding=None):
+        if encoding is None:
+            return self.get_or_build_page(version, kind, limit, cursor, build)
+        variant_key = f"{self.key(version, kind, limit, cursor)}:{encoding}"
+        content = self.cache.get(variant_key)
+        if content is not None:
+            return version, content
+
+        def compress_page():
+            served, content = self.get_or_build_page(
+                version, kind, limit, cursor, build
+            )
+            if served != version:
+                return served, compress(content, encoding)
+            content = compress(content, encoding, cached=True)
+            self.cache.set(variant_key, content, settings.CATALOGUE_CACHE_TIMEOUT)
+            return served, content
+
+        return self.flights.do(variant_key, compress_page)
+
+    def get_or_build_page(self, version, kind, limit, cursor, build):
+        key = self.key(version, kind, limit, cursor)
+        content = self.cache.get(key)
+        if content is not None:
+            return version, content
+
+        def build_page():
+            # another process may have stored the page while this one waited
+            content = self.cache.get(key)
+            if content is None:
+                content = build()
+                self.cache.set(key, content, settings.CATALOGUE_CACHE_TIMEOUT)
+                self.cache.set(
+                    self.latest_key(kind, limit, cursor),
+                    (version, content),
+                    settings.CATALOGUE_CACHE_TIMEOUT,
+                )
+            return version, content
+
+        stale = None
+        if settings.CATALOGUE_STALE_WHILE_REVALIDATE:
+
+            def stale():
+                return self.cache.get(self.latest_key(kind, limit, cursor))
+
+        return self.flights.do(key, build_page, stale)
+
+    async def aget_or_build(self, version, kind, limit, cursor, abuild, encoding=None):
+        if encoding is None:
+            return await self.aget_or_build_page(version, kind, limit, cursor, abuild)
+        variant_key = f"{self.key(version, kind, limit, cursor)}:{encoding}"
+        content = await self.cache.aget(variant_key)
+        if content is not None:
+            return version, content
+
+        async def compress_page():
+            served, content = await self.aget_or_build_page(
+                version, kind, limit, cursor, abuild
+            )
+            if served != version:
+                return served, compress(content, encoding)
+            content = compress(content, encoding, cached=True)
+            await self.cache.aset(
+                variant_key, content, settings.CATALOGUE_CACHE_TIMEOUT
+            )
+            return served, content
+
+        return await self.flights.ado(variant_key, compress_page)
+
+    async def aget_or_build_page(self, version, kind, limit, cursor, abuild):
+        key = self.key(version, kind, limit, cursor)
+        content = await self.cache.aget(key)
+        if content is not None:
+            return version, content
+
+        async def build_page():
+            content = await self.cache.aget(key)
+            if content is None:
+                content = await abuild()
+                await self.cache.aset(key, content, settings.CATALOGUE_CACHE_TIMEOUT)
+                await self.cache.aset(
+                    self.latest_key(kind, limit, cursor),
+                    (version, content),
+                    settings.CATALOGUE_CACHE_TIMEOUT,
+                )
+            return version, content
+
+        astale = None
+        if settings.CATALOGUE_STALE_WHILE_REVALIDATE:
+
+            async def astale():
+                return await self.cache.aget(self.latest_key(kind, limit, cursor))
+
+        return await self.flights.ado(key, build_page, astale)
+
+
+catalogue_version = CatalogueVersion()
+catalogue_payloads = CataloguePayloadCache()
+# anonymous searches are not cached, concurrent identical ones are still computed once
+catalogue_searches = SingleFlight("catalogue_searches")
+
+
+def flight_stats():
+    return {
+        flights.name: flights.stats()
+        for flights in (catalogue_payloads.flights, catalogue_searches)
+    }
+
+
+class PrimaryPins:
+    """
+    Users who wrote favourites recently, their reads stay on the primary database
+    for REPLICA_PIN_SECONDS so they see their own writes despite replication lag
+    """
+
+    @property
+    def cache(self):
+        return caches[settings.FAVOURITES_CACHE_ALIAS]
+
+    def key(self, user_id):
+        return f"primary:{user_id}"
+
+    def pin(self, user_id):
+        if settings.DATABASE_REPLICAS:
+            self.cache.set(self.key(user_id), True, settings.REPLICA_PIN_SECONDS)
+
+    def is_pinned(self, user_id):
+        return self.cache.get(self.key(user_id), False)
+
+    async def apin(self, user_id):
+        if settings.DATABASE_REPLICAS:
+            await self.cache.aset(self.key(user_id), True, settings.REPLICA_PIN_SECONDS)
+
+    async def ais_pinned(self, user_id):
+        return await self.cache.aget(self.key(user_id), False)
+
+
+primary_pins = PrimaryPins()
@@ -0,0 +1,124 @@
+import gzip
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence
+
+try:
+    import brotli
+except ImportError:  # optional, responses are only gzipped without it
+    brotli = None
+
+# preferred first when the client accepts several with the same quality
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson")
+# smaller bodies grow or barely shrink once compressed
+MIN_SIZE = 200
+# encoding -> (level per response, level of payloads compressed once and cached)
+LEVELS = {"br": (5, 11), "gzip": (6, 9)}
+
+
+def negotiate(accept_encoding):
+    """
+    Supported encoding of the highest quality in an Accept-Encoding header, or None
+    """
+    qualities = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding.strip().lower()] = quality
+    best, best_quality = None, 0.0
+    for encoding in ENCODINGS:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(content, encoding, cached=False):
+    """
+    Compress a body, at the slowest level when it is cached and served many times
+    """
+    level = LEVELS[encoding][cached]
+    if encoding == "br":
+        return brotli.compress(content, quality=level)
+    # a fixed mtime keeps compressed bytes identical across workers
+    return gzip.compress(content, compresslevel=level, mtime=0)
+
+
+def compress_stream(chunks, encoding):
+    if encoding == "gzip":
+        yield from compress_sequence(chunks)
+        return
+    compressor = brotli.Compressor(quality=LEVELS[encoding][0])
+    for chunk in chunks:
+        data = compressor.process(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware:
+    """
+    Compresses API responses with the encoding negotiated from Accept-Encoding,
+    brotli when installed, gzip otherwise. Responses the view already compressed,
+    such as cached catalogue pages, carry a Content-Encoding and pass through.
+    Only JSON bodies are compressed, pages embedding secrets stay untouched
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        content_type = response.get("Content-Type", "").split(";")[0]
+        if content_type not in COMPRESSIBLE_TYPES or response.has_header(
+            "Content-Encoding"
+        ):
+            return response
+        if not response.streaming and len(response.content) < MIN_SIZE:
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = negotiate(request.headers.get("Accept-Encoding", ""))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if getattr(response, "is_async", False):
+                return response
+            response.streaming_content = compress_stream(
+                response.streaming_content, encoding
+            )
+            del response.headers["Content-Length"]
+        else:
+            compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # the compressed body is another representation, a strong etag would be wrong
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
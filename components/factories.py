@@ -8,7 +8,7 @@ class MovieFactory(factory.django.DjangoModelFactory):
     release_date = factory.Faker("date_time")
     created = factory.Faker("date_time")
     updated = factory.Faker("date_time")
-    url = factory.Faker("url")
+    url = factory.Sequence(lambda n: f"https://swapi.dev/api/films/{n}/")
 
     class Meta:
         model = Movie
@@ -18,7 +18,7 @@ class PlanetFactory(factory.django.DjangoModelFactory):
     name = factory.Faker("company")
     created = factory.Faker("date_time")
     updated = factory.Faker("date_time")
-    url = factory.Faker("url")
+    url = factory.Sequence(lambda n: f"https://swapi.dev/api/planets/{n}/")
 
     class Meta:
         model = Planet
@@ -0,0 +1,273 @@
+from django.utils.dateparse import parse_datetime
+
+from .caching import catalogue_version
+from .models import (
+    Movie,
+    MovieCatalogueEntry,
+    PendingLink,
+    Planet,
+    PlanetCatalogueEntry,
+)
+
+
+# records never edited upstream may come without `edited`, they last changed when created
+def movie_from_record(node):
+    return Movie(
+        title=node.get("title"),
+        release_date=node.get("release_date"),
+        created=node.get("created"),
+        updated=parse_datetime(node.get("edited") or node.get("created")),
+        url=node.get("url"),
+    )
+
+
+def planet_from_record(node):
+    return Planet(
+        name=node.get("name"),
+        created=node.get("created"),
+        updated=parse_datetime(node.get("edited") or node.get("created")),
+        url=node.get("url"),
+    )
+
+
+# swapi resource name -> api listing its records
+API_URLS = {
+    "films": "https://swapi.dev/api/films/",
+    "planets": "https://swapi.dev/api/planets/",
+}
+
+# swapi resource name -> (model, record converter, fields updated by incremental sync)
+RESOURCES = {
+    "films": (
+        Movie,
+        movie_from_record,
+        ["title", "release_date", "created", "updated"],
+    ),
+    "planets": (
+        Planet,
+        planet_from_record,
+        ["name", "created", "updated"],
+    ),
+}
+
+# swapi resource name -> key of its records listing urls of the other resource,
+# film - planet links are collected from both sides
+RELATION_KEYS = {
+    "films": "planets",
+    "planets": "films",
+}
+
+# swapi resource name -> per-user read model built from it
+CATALOGUE_ENTRIES = {
+    "films": MovieCatalogueEntry,
+    "planets": PlanetCatalogueEntry,
+}
+
+
+def upsert_changed(model, objects, update_fields):
+    """
+    Insert new records and update records edited upstream since they were stored,
+    records are matched by their swapi url. Returns the created count and the urls
+    of the updated records
+    """
+    stored = dict(
+        model.objects.filter(url__in=[obj.url for obj in objects]).values_list(
+            "url", "updated"
+        )
+    )
+    changed = [
+        obj for obj in objects if obj.url not in stored or obj.updated > stored[obj.url]
+    ]
+    model.objects.bulk_create(
+        changed,
+        update_conflicts=True,
+        unique_fields=["url"],
+        update_fields=update_fields,
+    )
+    updated = [obj.url for obj in changed if obj.url in stored]
+    return len(changed) - len(updated), updated
+
+
+class CatalogueIngestion:
+    """
+    Streaming ingestion of swapi records, pages are converted and written in batches
+    of `batch_size` as they arrive so memory stays bounded by the batch size
+    """
+
+    def __init__(self, batch_size, incremental=False):
+        self.batch_size = batch_size
+        self.incremental = incremental
+        self.buffers = {resource: [] for resource in RESOURCES}
+        self.created = {resource: 0 for resource in RESOURCES}
+        self.updated = {resource: 0 for resource in RESOURCES}
+        # (record url, urls of the other resource it lists or None) of the buffered records
+        self.relations = {resource: [] for resource in RESOURCES}
+        self.links_created = 0
+        self.links_removed = 0
+
+    def clean(self):
+        """
+        Full reload starts from an empty catalogue, cascading to user favourites
+        """
+        for model, _, _ in reversed(RESOURCES.values()):
+            model.objects.all().delete()
+        PendingLink.objects.all().delete()
+
+    def add_page(self, resource, records):
+        _, from_record, _ = RESOURCES[resource]
+        for node in records:
+            self.buffers[resource].append(from_record(node))
+            self.relations[resource].append(
+                (node.get("url"), node.get(RELATION_KEYS[resource]))
+            )
+            if len(self.buffers[resource]) >= self.batch_size:
+                self.flush(resource)
+
+    def write_links(self, resource, relations):
+        """
+        Link flushed records to the records they list by swapi url, looking up only
+        the urls of the batch. Links to records not ingested yet are kept as pending
+        links, and the pending links of the flushed records are written now.
+        An incremental sync also removes links of flushed films no longer listing a planet
+        """
+        if resource == "films":
+            pairs = {
+                (url, other_url)
+                for url, other_urls in relations
+                for other_url in other_urls or ()
+            }
+            own_field = "film_url"
+        else:
+            pairs = {
+                (other_url, url)
+                for url, other_urls in relations
+                for other_url in other_urls or ()
+            }
+            own_field = "planet_url"
+        urls = [url for url, _ in relations]
+        pending = PendingLink.objects.filter(**{f"{own_field}__in": urls})
+        pairs.update(pending.values_list("film_url", "planet_url"))
+        pending.delete()
+
+        listing_films = [url for url, other_urls in relations if other_urls is not None]
+        movie_ids = dict(
+            Movie.objects.filter(
+                url__in={film_url for film_url, _ in pairs}.union(
+                    listing_films if resource == "films" else ()
+                )
+            ).values_list("url", "id")
+        )
+        planet_ids = dict(
+            Planet.objects.filter(
+                url__in={planet_url for _, planet_url in pairs}
+            ).values_list("url", "id")
+        )
+        wanted = set()
+        missing = []
+        for film_url, planet_url in pairs:
+            if film_url in movie_ids and planet_url in planet_ids:
+                wanted.add((movie_ids[film_url], planet_ids[planet_url]))
+            else:
+                missing.append(PendingLink(film_url=film_url, planet_url=planet_url))
+        PendingLink.objects.bulk_create(missing, ignore_conflicts=True)
+
+        through = Movie.planets.through
+        listed_movies = (
+            [movie_ids[url] for url in listing_films if url in movie_ids]
+            if self.incremental and resource == "films"
+            else []
+        )
+        existing = {
+            (movie_id, planet_id): link_id
+            for link_id, movie_id, planet_id in through.objects.filter(
+                movie_id__in={movie_id for movie_id, _ in wanted}.union(listed_movies)
+            ).values_list("id", "movie_id", "planet_id")
+        }
+        stale = [
+            link_id
+            for (movie_id, planet_id), link_id in existing.items()
+            if movie_id in listed_movies and (movie_id, planet_id) not in wanted
+        ]
+        if stale:
+            through.objects.filter(id__in=stale).delete()
+            self.links_removed += len(stale)
+        new = [link for link in wanted if link not in existing]
+        if new:
+            through.objects.bulk_create(
+                [
+                    through(movie_id=movie_id, planet_id=planet_id)
+                    for movie_id, planet_id in new
+                ],
+                ignore_conflicts=True,
+            )
+            self.links_created += len(new)
+
+    def flush(self, resource):
+        model, _, update_fields = RESOURCES[resource]
+        objects = self.buffers[resource]
+        if not objects:
+            return
+        if self.incremental:
+            created, updated = upsert_changed(model, objects, update_fields)
+            # bulk writes skip the catalogue signals, only the favourites of updated
+            # records have entries to refresh. New records have no favourites yet and
+            # a full reload deletes every favourite along with the catalogue
+            self.refresh_entries(resource, updated)
+        else:
+            model.objects.bulk_create(objects)
+            created, updated = len(objects), []
+        self.created[resource] += created
+        self.updated[resource] += len(updated)
+        self.write_links(resource, self.relations[resource])
+        self.buffers[resource] = []
+        self.relations[resource] = []
+
+    def get_state(self):
+        """
+        Counters, enough to carry on with the remaining pages in another process
+        through `set_state`, every flushed batch is already written with its links
+        and catalogue entries
+        """
+        return {
+            "created": self.created,
+            "updated": self.updated,
+            "links_created": self.links_created,
+            "links_removed": self.links_removed,
+        }
+
+    def set_state(self, state):
+        self.created.update(state.get("created", {}))
+        self.updated.update(state.get("updated", {}))
+        self.links_created = state.get("links_created", 0)
+        self.links_removed = state.get("links_removed", 0)
+
+    def run(self, pages):
+        """
+        Consume (resource, records) pairs and write them
+        """
+        for resource, records in pages:
+            self.add_page(resource, records)
+        self.finish()
+
+    def refresh_entries(self, resource, urls):
+        if not urls:
+            return
+        model, _, _ = RESOURCES[resource]
+        ids = model.objects.filter(url__in=urls).values_list("id", flat=True)
+        CATALOGUE_ENTRIES[resource].objects.materialize(object_ids=ids)
+
+    def finish(self):
+        """
+        Write buffered records once every page is consumed, links still pending
+        point to records missing upstream and are dropped
+        """
+        for resource in RESOURCES:
+            self.flush(resource)
+        PendingLink.objects.all().delete()
+        changed = [
+            resource
+            for resource in RESOURCES
+            if not self.incremental or self.created[resource] or self.updated[resource]
+        ]
+        if changed or self.links_created or self.links_removed:
+            catalogue_version.bump()
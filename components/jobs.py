@@ -0,0 +1,183 @@
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .ingestion import API_URLS, RESOURCES, CatalogueIngestion
+from .models import IngestionJob
+from .utils import fetch_all_resources
+
+# records converted per bulk write, pages are committed as a whole regardless
+BATCH_SIZE = 500
+
+
+class JobLost(Exception):
+    """
+    Raised when another worker took over a job considered stale
+    """
+
+
+def enqueue_job(incremental=False):
+    """
+    Queue an ingestion job unless one is already queued or running,
+    returns (job, created)
+    """
+    with transaction.atomic():
+        active = (
+            IngestionJob.objects.select_for_update()
+            .filter(
+                status__in=[IngestionJob.Status.QUEUED, IngestionJob.Status.RUNNING]
+            )
+            .first()
+        )
+        if active is not None:
+            return active, False
+        return IngestionJob.objects.create(incremental=incremental), True
+
+
+def claimable_jobs():
+    """
+    Queued jobs, and running jobs whose worker stopped sending heartbeats
+    """
+    stale = timezone.now() - timedelta(seconds=settings.INGESTION_JOB_STALE_SECONDS)
+    return IngestionJob.objects.filter(
+        Q(status=IngestionJob.Status.QUEUED)
+        | Q(status=IngestionJob.Status.RUNNING, heartbeat__lt=stale)
+    )
+
+
+def claim_next_job(worker):
+    """
+    Mark the oldest claimable job as run by worker. The claim is a conditional
+    UPDATE, of two workers racing for a job only one updates its row
+    """
+    for job_id in claimable_jobs().order_by("created").values_list("id", flat=True)[:5]:
+        now = timezone.now()
+        claimed = (
+            claimable_jobs()
+            .filter(id=job_id)
+            .update(
+                status=IngestionJob.Status.RUNNING,
+                worker=worker,
+                heartbeat=now,
+                attempts=F("attempts") + 1,
+            )
+        )
+        if claimed:
+            job = IngestionJob.objects.get(id=job_id)
+            if job.started is None:
+                job.started = now
+                job.save(update_fields=["started"])
+            return job
+    return None
+
+
+class JobRunner:
+    """
+    Runs a claimed job, every page is written in its own transaction together with
+    the job progress and ingestion state, pages of a resumed job start after the
+    last committed page of each resource
+    """
+
+    def __init__(self, job, worker):
+        self.job = job
+        self.worker = worker
+        self.ingestion = CatalogueIngestion(BATCH_SIZE, incremental=job.incremental)
+        self.ingestion.set_state(job.state.get("ingestion", {}))
+        self.progress = {
+            resource: {
+                "pages": 0,
+                "rows": 0,
+                "seconds": 0.0,
+                "rows_per_second": 0.0,
+                **job.progress.get(resource, {}),
+            }
+            for resource in RESOURCES
+        }
+
+    def save(self, **fields):
+        """
+        Persist the job if this worker still owns it, in the caller's transaction
+        """
+        owned = IngestionJob.objects.filter(id=self.job.id, worker=self.worker).update(
+            heartbeat=timezone.now(), **fields
+        )
+        if not owned:
+            raise JobLost(f"Ingestion job {self.job.id} was taken over")
+
+    def state(self, **extra):
+        return {
+            "cleaned": self.job.state.get("cleaned", False),
+            "ingestion": self.ingestion.get_state(),
+            **extra,
+        }
+
+    def fetch_pages(self):
+        start_pages = {
+            resource: progress["pages"] + 1
+            for resource, progress in self.progress.items()
+        }
+        return fetch_all_resources(API_URLS, start_pages=start_pages)
+
+    def run(self):
+        try:
+            if not self.job.incremental and not self.job.state.get("cleaned"):
+                with transaction.atomic():
+                    self.ingestion.clean()
+                    self.save(state=self.state(cleaned=True))
+                self.job.state["cleaned"] = True
+
+            # pages of the resources are fetched concurrently and arrive interleaved,
+            # each resource is timed from its own previous page
+            start = time.perf_counter()
+            last = dict.fromkeys(RESOURCES, start)
+            for resource, records in self.fetch_pages():
+                with transaction.atomic():
+                    self.ingestion.add_page(resource, records)
+                    self.ingestion.flush(resource)
+                    now = time.perf_counter()
+                    progress = self.progress[resource]
+                    progress["pages"] += 1
+                    progress["rows"] += len(records)
+                    progress["seconds"] = round(
+                        progress["seconds"] + now - last[resource], 3
+                    )
+                    progress["rows_per_second"] = round(
+                        progress["rows"] / max(progress["seconds"], 0.001), 1
+                    )
+                    self.save(progress=self.progress, state=self.state())
+                last[resource] = now
+
+            with transaction.atomic():
+                self.ingestion.finish()
+                self.save(
+                    status=IngestionJob.Status.SUCCEEDED,
+                    state=self.state(),
+                    finished=timezone.now(),
+                )
+        except JobLost:
+            raise
+        except Exception as error:
+            self.save(
+                status=IngestionJob.Status.FAILED,
+                error=f"{type(error).__name__}: {error}",
+                finished=timezone.now(),
+            )
+            raise
+
+
+def run_next_job(worker=None):
+    """
+    Claim and run one job, returns it or None when no job is waiting
+    """
+    worker = worker or uuid.uuid4().hex
+    job = claim_next_job(worker)
+    if job is None:
+        return None
+    JobRunner(job, worker).run()
+    job.refresh_from_db()
+    return job
@@ -0,0 +1,160 @@
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import BooleanField, Case, ExpressionWrapper, F, Q, Value, When
+
+from components.benchmarking import Rollback, measure
+from components.caching import movie_favourites
+from components.factories import MovieFactory
+from components.models import FavouriteMovie, Movie, MovieCatalogueEntry
+from components.pagination import DEFAULT_PAGE_LIMIT
+from components.queries import entry_queryset
+from components.rendering import movie_rows
+from components.search import get_search_backend
+
+
+def annotate_favourites(queryset, favourites, name_field, display_field):
+    """
+    Overlay a user favourites map on a catalogue queryset inside the query itself,
+    `is_favourite` and the effective display name come back with the rows
+    """
+    if not favourites:
+        return queryset.annotate(
+            is_favourite=Value(False), **{display_field: F(name_field)}
+        )
+    renamed = [
+        When(id=object_id, then=Value(custom_name))
+        for object_id, custom_name in favourites.items()
+        if custom_name
+    ]
+    display = Case(*renamed, default=F(name_field)) if renamed else F(name_field)
+    return queryset.annotate(
+        is_favourite=ExpressionWrapper(
+            Q(id__in=list(favourites)), output_field=BooleanField()
+        ),
+        **{display_field: display},
+    )
+
+
+def search_favourites(favourites, term):
+    """
+    Ids of favourites whose custom name contains term, case insensitive
+    """
+    term = term.casefold()
+    return [
+        object_id
+        for object_id, custom_name in favourites.items()
+        if custom_name and term in custom_name.casefold()
+    ]
+
+
+def overlay_queryset(model, name_field, display_field, favourites, term):
+    """
+    User catalogue read without catalogue entries, the baseline the entries replaced
+    """
+    queryset = annotate_favourites(
+        model.objects.all(), favourites, name_field, display_field
+    )
+    if term:
+        search = get_search_backend().search_q(model, name_field, term)
+        renamed = search_favourites(favourites, term)
+        if renamed:
+            search |= Q(id__in=renamed)
+        queryset = queryset.filter(search)
+    return queryset
+
+
+class Command(BaseCommand):
+    """
+    Command to compare a user's movie search through the in-query favourite overlay
+    (catalogue search OR renamed favourites) against the materialized catalogue entries,
+    generated movies, favourites and entries are rolled back once it finishes
+    """
+
+    help = "Benchmark per-user catalogue entries"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100000)
+        parser.add_argument("--movies", type=int, default=60)
+        parser.add_argument("--favourites", type=int, default=3)
+        parser.add_argument("--sample", type=int, default=50)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.seed(options)
+                report = self.run(options["sample"])
+                raise Rollback
+        except Rollback:
+            pass
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def seed(self, options):
+        Movie.objects.bulk_create(MovieFactory.build_batch(options["movies"]))
+        movie_ids = list(Movie.objects.values_list("id", flat=True))
+        favourites = []
+        for user_id in range(1, options["users"] + 1):
+            for movie_id in random.sample(movie_ids, options["favourites"]):
+                favourites.append(
+                    FavouriteMovie(
+                        user_id=user_id,
+                        movie_id=movie_id,
+                        custom_title=f"custom {user_id} {movie_id}",
+                    )
+                )
+            if len(favourites) >= options["batch_size"]:
+                FavouriteMovie.objects.bulk_create(favourites)
+                favourites = []
+        FavouriteMovie.objects.bulk_create(favourites)
+
+    def run(self, sample):
+        start = time.perf_counter()
+        rows = MovieCatalogueEntry.objects.rebuild()
+        report = {
+            "movies": Movie.objects.count(),
+            "favourites": FavouriteMovie.objects.count(),
+            "entries": rows,
+            "rebuild_s": round(time.perf_counter() - start, 3),
+        }
+
+        user_ids = random.sample(
+            list(FavouriteMovie.objects.values_list("user_id", flat=True).distinct()),
+            sample,
+        )
+        # the overlay reads favourites from their cache, load them outside the timing
+        favourites = {user_id: movie_favourites.load(user_id) for user_id in user_ids}
+        title = Movie.objects.first().title.split()[0]
+        terms = {
+            "list": lambda user_id: None,
+            "title": lambda user_id: title,
+            "custom": lambda user_id: f"custom {user_id} ",
+        }
+        paths = {
+            "overlay": lambda user_id, term: overlay_queryset(
+                Movie, "title", "display_title", favourites[user_id], term
+            ),
+            "entries": lambda user_id, term: entry_queryset(
+                Movie, "title", "display_title", user_id, term
+            ),
+        }
+        for path_name, build in paths.items():
+            for term_name, term in terms.items():
+
+                def pages():
+                    for user_id in user_ids:
+                        queryset = movie_rows.rows(build(user_id, term(user_id)))
+                        list(queryset.order_by("id")[:DEFAULT_PAGE_LIMIT])
+
+                summary = measure(pages, 5)
+                summary["per_user_ms"] = round(summary["mean_ms"] / len(user_ids), 3)
+                report[f"{path_name}:{term_name}"] = summary
+
+        report["user_refresh"] = measure(
+            lambda: MovieCatalogueEntry.objects.materialize(random.choice(user_ids)),
+            sample,
+        )
+        return report
@@ -0,0 +1,310 @@
+import json
+import platform
+import random
+import time
+from pathlib import Path
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+from factory.random import reseed_random
+
+from components.benchmarking import FIRST_USER_ID, Rollback, git_revision, summarize
+from components.caching import catalogue_version, movie_favourites, planet_favourites
+from components.factories import MovieFactory, PlanetFactory
+from components.metrics import RequestMetrics, current_request
+from components.models import (
+    FavouriteMovie,
+    FavouritePlanet,
+    Movie,
+    MovieCatalogueEntry,
+    Planet,
+    PlanetCatalogueEntry,
+)
+from components.search import get_search_backend
+
+# items per bulk favourite request
+BULK_ITEMS = 10
+
+
+class Command(BaseCommand):
+    """
+    Command to benchmark every endpoint of components.urls in process, through url
+    routing, middleware and views, on a generated catalogue with users and favourites.
+    List endpoints are driven with and without user and search params, favourite
+    endpoints with writes of benchmark users. Output is a JSON report meant to be
+    diffed across commits, generated data is rolled back once it finishes
+    """
+
+    help = "Benchmark the components endpoints and write a JSON report"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--movies", type=int, default=10000)
+        parser.add_argument("--planets", type=int, default=10000)
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument(
+            "--favourites", type=int, default=5, help="Per user, movies and planets"
+        )
+        parser.add_argument("--requests", type=int, default=200, help="Per scenario")
+        parser.add_argument("--warmup", type=int, default=5, help="Per scenario")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--output", help="Write the report to this file")
+
+    def handle(self, *args, **options):
+        reseed_random(options["seed"])
+        self.random = random.Random(options["seed"])
+        self.next_user_id = FIRST_USER_ID + options["users"] + 1
+        try:
+            with transaction.atomic():
+                dataset = self.seed(options)
+                # requests go through the test client host, metrics are read directly
+                with override_settings(
+                    ALLOWED_HOSTS=["testserver"], METRICS_ENABLED=False
+                ):
+                    endpoints = self.run(options)
+                raise Rollback
+        except Rollback:
+            pass
+        self.forget()
+
+        report = {
+            "meta": {
+                "commit": git_revision(),
+                "vendor": connection.vendor,
+                "django": django.get_version(),
+                "python": platform.python_version(),
+                "search_backend": type(get_search_backend()).__name__,
+                "requests": options["requests"],
+                "seed": options["seed"],
+                **dataset,
+            },
+            "endpoints": endpoints,
+        }
+        content = json.dumps(report, indent=2, sort_keys=True)
+        if options["output"]:
+            Path(options["output"]).write_text(content + "\n")
+        else:
+            self.stdout.write(content)
+
+    def seed(self, options):
+        batch_size = options["batch_size"]
+        for model, model_factory, rows in (
+            (Movie, MovieFactory, options["movies"]),
+            (Planet, PlanetFactory, options["planets"]),
+        ):
+            for start in range(0, rows, batch_size):
+                model.objects.bulk_create(
+                    model_factory.build_batch(min(batch_size, rows - start))
+                )
+        self.movie_ids = list(Movie.objects.values_list("id", flat=True))
+        self.planet_ids = list(Planet.objects.values_list("id", flat=True))
+        self.user_ids = range(FIRST_USER_ID + 1, FIRST_USER_ID + options["users"] + 1)
+
+        for model, object_field, name_field, object_ids in (
+            (FavouriteMovie, "movie_id", "custom_title", self.movie_ids),
+            (FavouritePlanet, "planet_id", "custom_name", self.planet_ids),
+        ):
+            favourites = []
+            for user_id in self.user_ids:
+                for object_id in self.random.sample(
+                    object_ids, min(options["favourites"], len(object_ids))
+                ):
+                    custom_name = (
+                        f"custom {user_id} {object_id}"
+                        if self.random.random() < 0.5
+                        else None
+                    )
+                    favourites.append(
+                        model(
+                            user_id=user_id,
+                            **{object_field: object_id, name_field: custom_name},
+                        )
+                    )
+                if len(favourites) >= batch_size:
+                    model.objects.bulk_create(favourites)
+                    favourites = []
+            model.objects.bulk_create(favourites)
+
+        start = time.perf_counter()
+        entries = MovieCatalogueEntry.objects.rebuild()
+        entries += PlanetCatalogueEntry.objects.rebuild()
+        catalogue_version.bump()
+
+        self.terms = {
+            "title": self.sample_terms(Movie, "title"),
+            "name": self.sample_terms(Planet, "name"),
+        }
+        return {
+            "movies": len(self.movie_ids),
+            "planets": len(self.planet_ids),
+            "users": options["users"],
+            "favourite_movies": FavouriteMovie.objects.count(),
+            "favourite_planets": FavouritePlanet.objects.count(),
+            "catalogue_entries": entries,
+            "catalogue_entries_rebuild_s": round(time.perf_counter() - start, 3),
+        }
+
+    def sample_terms(self, model, field):
+        names = model.objects.values_list(field, flat=True).order_by("id")[:1000]
+        return [name.split()[0] for name in names if name.split()]
+
+    def forget(self):
+        """
+        Drop cached favourites of benchmark users and catalogue pages of rolled back rows
+        """
+        for user_id in range(FIRST_USER_ID + 1, self.next_user_id):
+            movie_favourites.invalidate(user_id)
+            planet_favourites.invalidate(user_id)
+        catalogue_version.bump()
+
+    def run(self, options):
+        client = Client()
+        endpoints = {}
+        for prefix in ("", "async-"):
+            for kind, search_param, object_ids in (
+                ("movie", "title", self.movie_ids),
+                ("planet", "name", self.planet_ids),
+            ):
+                endpoints[f"{prefix}{kind}-list"] = self.run_list(
+                    client, reverse(f"{prefix}{kind}-list"), search_param, options
+                )
+                endpoints[f"{prefix}favourite-{kind}"] = self.run_favourite(
+                    client,
+                    reverse(f"{prefix}favourite-{kind}"),
+                    kind,
+                    object_ids,
+                    options,
+                )
+                endpoints[f"{prefix}favourite-{kind}-bulk"] = {
+                    "POST": self.run_scenario(
+                        lambda: client.post(
+                            reverse(f"{prefix}favourite-{kind}-bulk"),
+                            self.bulk_body(kind, object_ids),
+                            content_type="application/json",
+                        ),
+                        options,
+                    )
+                }
+        for kind, search_param in (("movie", "title"), ("planet", "name")):
+            endpoints[f"{kind}-autocomplete"] = self.run_autocomplete(
+                client, reverse(f"{kind}-autocomplete"), search_param, options
+            )
+        return endpoints
+
+    def run_list(self, client, url, search_param, options):
+        variants = {
+            "": lambda: {},
+            "user_id": lambda: {"user_id": self.random.choice(self.user_ids)},
+            search_param: lambda: {
+                search_param: self.random.choice(self.terms[search_param])
+            },
+            f"user_id&{search_param}": lambda: {
+                "user_id": self.random.choice(self.user_ids),
+                search_param: self.random.choice(self.terms[search_param]),
+            },
+        }
+        return {
+            variant: self.run_scenario(lambda: client.get(url, params()), options)
+            for variant, params in variants.items()
+        }
+
+    def run_autocomplete(self, client, url, search_param, options):
+        # the first characters of a word, as sent on each keystroke
+        variants = {
+            search_param: lambda: {
+                search_param: self.random.choice(self.terms[search_param])[:3]
+            },
+            f"user_id&{search_param}": lambda: {
+                "user_id": self.random.choice(self.user_ids),
+                search_param: self.random.choice(self.terms[search_param])[:3],
+            },
+        }
+        return {
+            variant: self.run_scenario(lambda: client.get(url, params()), options)
+            for variant, params in variants.items()
+        }
+
+    def run_favourite(self, client, url, kind, object_ids, options):
+        name_field = "custom_title" if kind == "movie" else "custom_name"
+        written = []
+
+        def post():
+            # a new benchmark user per write, so every deletion below finds its row
+            body = {
+                "user_id": self.next_user_id,
+                kind: self.random.choice(object_ids),
+                name_field: f"custom {self.next_user_id}",
+            }
+            self.next_user_id += 1
+            written.append(body)
+            return client.post(url, body, content_type="application/json")
+
+        def delete():
+            body = written.pop()
+            return client.delete(
+                url,
+                json.dumps({"user_id": body["user_id"], kind: body[kind]}),
+                content_type="application/json",
+            )
+
+        return {
+            "POST": self.run_scenario(post, options),
+            "DELETE": self.run_scenario(delete, options),
+        }
+
+    def bulk_body(self, kind, object_ids):
+        name_field = "custom_title" if kind == "movie" else "custom_name"
+        user_id = self.random.choice(self.user_ids)
+        items = [
+            {kind: object_id, name_field: f"bulk {user_id} {object_id}"}
+            for object_id in self.random.sample(
+                object_ids, min(BULK_ITEMS, len(object_ids))
+            )
+        ]
+        return {"user_id": user_id, "items": items}
+
+    def run_scenario(self, request, options):
+        """
+        Send warmup then measured requests, each one with its own query counters
+        """
+        for _ in range(options["warmup"]):
+            request()
+        samples, queries, db, serialize, render, sizes = ([] for _ in range(6))
+        errors = 0
+        started = time.perf_counter()
+        for _ in range(options["requests"]):
+            metrics = RequestMetrics()
+            token = current_request.set(metrics)
+            start = time.perf_counter()
+            try:
+                response = request()
+            finally:
+                current_request.reset(token)
+            samples.append(time.perf_counter() - start)
+            errors += response.status_code >= 400
+            queries.append(metrics.queries)
+            db.append(metrics.db)
+            serialize.append(metrics.serialize)
+            render.append(metrics.render)
+            sizes.append(len(response.content))
+        elapsed = time.perf_counter() - started
+        if not samples:
+            return {"runs": 0}
+
+        def mean_ms(values):
+            return round(sum(values) / len(values) * 1000, 3)
+
+        return {
+            "requests_per_second": round(len(samples) / elapsed, 1),
+            "errors": errors,
+            **summarize(samples),
+            "queries_mean": round(sum(queries) / len(queries), 2),
+            "queries_max": max(queries),
+            "db_mean_ms": mean_ms(db),
+            "serialize_mean_ms": mean_ms(serialize),
+            "render_mean_ms": mean_ms(render),
+            "response_bytes_mean": round(sum(sizes) / len(sizes)),
+        }
@@ -0,0 +1,85 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework.test import APIRequestFactory
+
+from components.benchmarking import FIRST_USER_ID, summarize
+from components.factories import MovieFactory
+from components.models import FavouriteMovie, Movie
+from components.views import FavouriteMovieView
+
+
+class Command(BaseCommand):
+    """
+    Command to measure the favourite write endpoint under concurrent writers against
+    the configured database, each thread holds its own connection. Generated movies
+    and favourites are deleted once it finishes, writes cannot share a rolled back
+    transaction across threads
+    """
+
+    help = "Benchmark concurrent favourite writes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--writes", type=int, default=200, help="Per thread")
+        parser.add_argument("--movies", type=int, default=20)
+
+    def handle(self, *args, **options):
+        movies = Movie.objects.bulk_create(MovieFactory.build_batch(options["movies"]))
+        movie_ids = [movie.id for movie in movies]
+        try:
+            report = self.run(options["threads"], options["writes"], movie_ids)
+        finally:
+            FavouriteMovie.objects.filter(user_id__gte=FIRST_USER_ID).delete()
+            Movie.objects.filter(id__in=movie_ids).delete()
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def run(self, threads, writes, movie_ids):
+        factory = APIRequestFactory()
+        view = FavouriteMovieView.as_view()
+
+        def writer(thread):
+            samples, errors = [], 0
+            try:
+                for index in range(writes):
+                    request = factory.post(
+                        "/",
+                        {
+                            "user_id": FIRST_USER_ID + thread,
+                            "movie": movie_ids[index % len(movie_ids)],
+                            "custom_title": f"write {index}",
+                        },
+                        format="json",
+                    )
+                    start = time.perf_counter()
+                    try:
+                        response = view(request)
+                        errors += response.status_code != 200
+                    except Exception:
+                        errors += 1
+                    samples.append(time.perf_counter() - start)
+            finally:
+                connection.close()
+            return samples, errors
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(writer, range(threads)))
+        elapsed = time.perf_counter() - started
+
+        samples = [sample for thread_samples, _ in results for sample in thread_samples]
+        report = {
+            "vendor": connection.vendor,
+            "threads": threads,
+            "writes_per_second": round(len(samples) / elapsed, 1),
+            "errors": sum(errors for _, errors in results),
+            **summarize(samples),
+        }
+        if connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA journal_mode")
+                report["journal_mode"] = cursor.fetchone()[0]
+        return report
@@ -0,0 +1,64 @@
+import json
+import random
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from components.benchmarking import Rollback, measure
+from components.factories import MovieFactory
+from components.models import Movie
+from components.pagination import DEFAULT_PAGE_LIMIT
+from components.search import IContainsSearchBackend, get_search_backend
+
+
+class Command(BaseCommand):
+    """
+    Command to compare title search through the search index against plain icontains,
+    generated movies are rolled back once the benchmark finishes
+    """
+
+    help = "Benchmark catalogue title search"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100000)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.seed(options["rows"], options["batch_size"])
+                report = self.run(options["repeat"])
+                raise Rollback
+        except Rollback:
+            pass
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def seed(self, rows, batch_size):
+        for start in range(0, rows, batch_size):
+            Movie.objects.bulk_create(
+                MovieFactory.build_batch(min(batch_size, rows - start))
+            )
+
+    def run(self, repeat):
+        titles = list(Movie.objects.values_list("title", flat=True)[:1000])
+        terms = {
+            "selective": random.choice(titles)[:8],
+            "common": "son",
+            "miss": "zzqx",
+        }
+        backends = {
+            "icontains": IContainsSearchBackend(),
+            "index": get_search_backend(),
+        }
+        report = {
+            "rows": Movie.objects.count(),
+            "index": type(backends["index"]).__name__,
+        }
+        for backend_name, backend in backends.items():
+            for term_name, term in terms.items():
+                queryset = Movie.objects.filter(backend.search_q(Movie, "title", term))
+                report[f"{backend_name}:{term_name}"] = measure(
+                    lambda: list(queryset.order_by("id")[:DEFAULT_PAGE_LIMIT]), repeat
+                )
+        return report
@@ -0,0 +1,52 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from components.benchmarking import Rollback, measure
+from components.factories import MovieFactory
+from components.queries import movie_queryset
+from components.rendering import dumps, movie_rows
+from components.serializers import MovieListItemSerializer
+
+
+class Command(BaseCommand):
+    """
+    Command to compare rendering a movie page through MovieListItemSerializer and
+    JSONRenderer against the values_list fast path, rows are fetched once up front so
+    only serialization is timed, generated movies are rolled back once it finishes
+    """
+
+    help = "Benchmark movie list serialization"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=50)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                MovieFactory.create_batch(options["rows"])
+                report = self.run(options["rows"], options["repeat"])
+                raise Rollback
+        except Rollback:
+            pass
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def run(self, rows, repeat):
+        queryset = movie_queryset(None, {}, None).order_by("id")[:rows]
+        objects = list(queryset)
+        tuples = list(movie_rows.rows(queryset))
+        report = {"rows": len(objects)}
+        candidates = {
+            "serializer": lambda: JSONRenderer().render(
+                MovieListItemSerializer(objects, many=True).data
+            ),
+            "values_list": lambda: dumps(movie_rows.to_data(tuples)),
+        }
+        for name, render in candidates.items():
+            summary = measure(render, repeat)
+            summary["per_row_us"] = round(summary["mean_ms"] * 1000 / len(objects), 3)
+            report[name] = summary
+        return report
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from components.snapshots import write_snapshot
+
+
+class Command(BaseCommand):
+    """
+    Command to export the catalogue into a JSONL snapshot that
+    `prepopulate_data --from-file` can seed a database from without network access
+    """
+
+    help = "Export catalogue snapshot"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", help="Snapshot file, compressed when ending in .gz or .zst"
+        )
+
+    def handle(self, *args, **options):
+        written = write_snapshot(options["path"])
+        self.stdout.write(self.style.SUCCESS(f"Catalogue exported| Records: {written}"))
@@ -0,0 +1,52 @@
+import socket
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from components.jobs import JobLost, run_next_job
+
+
+class Command(BaseCommand):
+    """
+    Command running queued ingestion jobs, every fetched page is committed with the
+    job progress so a job interrupted by a crash resumes from its last page
+    """
+
+    help = "Run queued catalogue ingestion jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="Exit once no job is waiting"
+        )
+        parser.add_argument("--poll-interval", type=float, default=5.0)
+
+    def handle(self, *args, **options):
+        worker = f"{socket.gethostname()}:{uuid.uuid4().hex[:8]}"
+        while True:
+            try:
+                job = run_next_job(worker)
+            except JobLost as error:
+                self.stderr.write(str(error))
+                time.sleep(options["poll_interval"])
+                continue
+            except Exception as error:
+                # a database or network outage would otherwise be retried in a busy loop
+                self.stderr.write(self.style.ERROR(f"Ingestion job failed| {error}"))
+                time.sleep(options["poll_interval"])
+                continue
+            if job is not None:
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Ingestion job {job.id} {job.status}"
+                        + "".join(
+                            f"| {resource}: {progress['pages']} pages, {progress['rows']} rows, "
+                            f"{progress['rows_per_second']} rows/s"
+                            for resource, progress in job.progress.items()
+                        )
+                    )
+                )
+                continue
+            if options["once"]:
+                return
+            time.sleep(options["poll_interval"])
@@ -0,0 +1,55 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from components.benchmarking import summarize
+from components.utils import build_session
+
+# paths hit on each server, the async views mirror the sync ones under /async/
+LOADTEST_PATHS = {
+    "wsgi": "/components/movies/",
+    "asgi": "/components/async/movies/",
+}
+
+
+class Command(BaseCommand):
+    """
+    Command to load test a running server, run it once against the sync views
+    served by a WSGI server and once against the async views served by uvicorn
+    to compare throughput and tail latency
+    """
+
+    help = "Load test the movie list endpoint of a running server"
+
+    def add_arguments(self, parser):
+        parser.add_argument("base_url", help="Server root, e.g. http://127.0.0.1:8000")
+        parser.add_argument("--mode", choices=LOADTEST_PATHS, default="asgi")
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--concurrency", type=int, default=32)
+        parser.add_argument("--user-id", type=int, help="Request a favourite overlay")
+
+    def handle(self, *args, **options):
+        url = options["base_url"].rstrip("/") + LOADTEST_PATHS[options["mode"]]
+        params = {"user_id": options["user_id"]} if options["user_id"] else {}
+        session = build_session(pool_size=options["concurrency"], retries=0)
+
+        def timed_request(_):
+            start = time.perf_counter()
+            response = session.get(url, params=params)
+            return time.perf_counter() - start, response.status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+            results = list(executor.map(timed_request, range(options["requests"])))
+        elapsed = time.perf_counter() - started
+
+        report = {
+            "url": url,
+            "concurrency": options["concurrency"],
+            "requests_per_second": round(len(results) / elapsed, 1),
+            "errors": sum(1 for _, status_code in results if status_code != 200),
+            **summarize([duration for duration, _ in results]),
+        }
+        self.stdout.write(json.dumps(report, indent=2))
@@ -1,56 +1,80 @@
+import os
+
 from django.core.management.base import BaseCommand, CommandError
-from components.models import Movie, Planet
-from components.utils import fetch_all_records
+from django.db import transaction
+
+from components.ingestion import API_URLS, CatalogueIngestion
+from components.jobs import enqueue_job
+from components.snapshots import read_snapshot
+from components.utils import fetch_all_resources
 
 
 class Command(BaseCommand):
     """
-    Command to fetch data from external api and seed the database
+    Command to fetch data from external api and seed the database,
+    pages are written in batches as they are fetched
     """
 
     help = "Populate Database"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Upsert records changed upstream instead of reloading everything, "
+            "keeps user favourites",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--from-file",
+            help="Seed from a snapshot written by export_catalogue instead of the api",
+        )
+        parser.add_argument(
+            "--background",
+            action="store_true",
+            help="Queue the ingestion for the ingestion_worker command and return",
+        )
+
     def handle(self, *args, **options):
-        Planet.objects.all().delete()
-        Movie.objects.all().delete()
-        self.stdout.write(self.style.SUCCESS("Successfully cleaned database"))
-        MOVIE_API_URL = "https://swapi.dev/api/films/"
-        PLANET_API_URL = "https://swapi.dev/api/planets/"
-
-        all_movies = fetch_all_records(MOVIE_API_URL)
-        all_planets = fetch_all_records(PLANET_API_URL)
-        all_movie_objects = []
-        all_planet_objects = []
-
-        for node in all_movies:
-            title = node.get("title")
-            release_date = node.get("release_date")
-            created = node.get("created")
-            updated = node.get("edited")
-            url = node.get("url")
-            all_movie_objects.append(
-                Movie(
-                    title=title,
-                    release_date=release_date,
-                    created=created,
-                    updated=updated,
-                    url=url,
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be greater than 0")
+
+        if options["background"]:
+            if options["from_file"]:
+                raise CommandError(
+                    "--background fetches from the api, drop --from-file"
                 )
-            )
+            job, created = enqueue_job(options["incremental"])
+            if not created:
+                raise CommandError(f"Ingestion job {job.id} is already {job.status}")
+            self.stdout.write(self.style.SUCCESS(f"Queued ingestion job {job.id}"))
+            return
 
-        for node in all_planets:
-            name = node.get("name")
-            created = node.get("created")
-            updated = node.get("edited")
-            url = node.get("url")
-            all_planet_objects.append(
-                Planet(name=name, created=created, updated=updated, url=url)
-            )
+        ingestion = CatalogueIngestion(options["batch_size"], options["incremental"])
+        if options["from_file"]:
+            if not os.path.isfile(options["from_file"]):
+                raise CommandError(f"Snapshot {options['from_file']} does not exist")
+            pages = read_snapshot(options["from_file"], options["batch_size"])
+        else:
+            pages = fetch_all_resources(API_URLS)
 
-        Movie.objects.bulk_create(all_movie_objects)
-        Planet.objects.bulk_create(all_planet_objects)
-        self.stdout.write(
-            self.style.SUCCESS(
-                f"Database populated| Movie records: {len(all_movie_objects)}| Planet records: {len(all_planet_objects)}"
+        if options["incremental"]:
+            with transaction.atomic():
+                ingestion.run(pages)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Database synced| Movie records created: {ingestion.created['films']}, updated: {ingestion.updated['films']}"
+                    f"| Planet records created: {ingestion.created['planets']}, updated: {ingestion.updated['planets']}"
+                    f"| Film-planet links created: {ingestion.links_created}, removed: {ingestion.links_removed}"
+                )
+            )
+        else:
+            ingestion.clean()
+            self.stdout.write(self.style.SUCCESS("Successfully cleaned database"))
+            ingestion.run(pages)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Database populated| Movie records: {ingestion.created['films']}| Planet records: {ingestion.created['planets']}"
+                    f"| Film-planet links: {ingestion.links_created}"
+                )
             )
-        )
@@ -0,0 +1,281 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .caching import cache_stats, flight_stats
+
+# metrics of the request being handled, copied into the threads running its orm queries
+current_request = ContextVar("current_request", default=None)
+
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class RequestMetrics:
+    """
+    Query count and time spent per phase of a single request, in seconds
+    """
+
+    __slots__ = ("queries", "db", "serialize", "render")
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+        self.render = 0.0
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper counting queries of the current request,
+    a plain pass-through for queries issued outside of a recorded request
+    """
+    metrics = current_request.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db += time.perf_counter() - start
+        metrics.queries += 1
+
+
+@contextmanager
+def timing(phase):
+    """
+    Add the time spent in the block to `phase` (serialize or render) of the current request
+    """
+    metrics = current_request.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(metrics, phase, getattr(metrics, phase) + time.perf_counter() - start)
+
+
+def format_labels(labels):
+    return ",".join(f'{name}="{value}"' for name, value in labels)
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name, help, labelnames):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self.values)
+        for labels, value in sorted(values.items()):
+            yield self.name, tuple(zip(self.labelnames, labels)), value
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames, buckets):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # per label values: cumulative count of each bucket, then +Inf, then sum
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, *labels, value):
+        with self._lock:
+            counts = self.values.get(labels)
+            if counts is None:
+                counts = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            counts[-2] += 1
+            counts[-1] += value
+
+    def samples(self):
+        with self._lock:
+            values = {labels: list(counts) for labels, counts in self.values.items()}
+        for labels, counts in sorted(values.items()):
+            labels = tuple(zip(self.labelnames, labels))
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                yield f"{self.name}_bucket", (*labels, ("le", bound)), count
+            yield f"{self.name}_sum", labels, round(counts[-1], 6)
+            yield f"{self.name}_count", labels, counts[-2]
+
+
+class Registry:
+    """
+    Process-local metrics rendered in the Prometheus text format, every worker
+    process exposes its own values and the scraper aggregates them
+    """
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{{{format_labels(labels)}}} {value}")
+        for cache, stats in cache_stats().items():
+            name = f"components_{cache}_cache_requests_total"
+            lines.append(f"# HELP {name} Lookups of the {cache} cache")
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f'{name}{{result="hit"}} {stats["hits"]}')
+            lines.append(f'{name}{{result="miss"}} {stats["misses"]}')
+        name = "components_singleflight_requests_total"
+        lines.append(
+            f"# HELP {name} Coalesced computations by how each request got its value"
+        )
+        lines.append(f"# TYPE {name} counter")
+        for flight, counts in flight_stats().items():
+            for result, count in counts.items():
+                lines.append(f'{name}{{flight="{flight}",result="{result}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+requests_total = registry.register(
+    Counter(
+        "components_requests_total",
+        "Handled requests",
+        ("view", "method", "status"),
+    )
+)
+request_seconds = registry.register(
+    Histogram(
+        "components_request_duration_seconds",
+        "Time to produce the response",
+        ("view",),
+        SECONDS_BUCKETS,
+    )
+)
+db_queries = registry.register(
+    Histogram(
+        "components_db_queries",
+        "SQL queries per request",
+        ("view",),
+        QUERY_BUCKETS,
+    )
+)
+db_seconds = registry.register(
+    Histogram(
+        "components_db_duration_seconds",
+        "Time spent executing SQL per request",
+        ("view",),
+        SECONDS_BUCKETS,
+    )
+)
+serialize_seconds = registry.register(
+    Histogram(
+        "components_serialize_duration_seconds",
+        "Time spent turning rows into response data per request",
+        ("view",),
+        SECONDS_BUCKETS,
+    )
+)
+render_seconds = registry.register(
+    Histogram(
+        "components_render_duration_seconds",
+        "Time spent encoding response data to JSON per request",
+        ("view",),
+        SECONDS_BUCKETS,
+    )
+)
+response_bytes = registry.register(
+    Histogram(
+        "components_response_size_bytes",
+        "Size of non streaming response bodies",
+        ("view",),
+        SIZE_BUCKETS,
+    )
+)
+
+
+class MetricsMiddleware:
+    """
+    Records query count, database, serializer and render time and response size of
+    each request, returned in a `Server-Timing` header and aggregated for /metrics.
+    Removed from the middleware chain unless METRICS_ENABLED is set. Rows of streamed
+    responses are read after the response leaves the middleware and are not counted
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = current_request.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_request.reset(token)
+        return self.finish(request, response, metrics, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = current_request.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_request.reset(token)
+        return self.finish(request, response, metrics, time.perf_counter() - start)
+
+    def finish(self, request, response, metrics, elapsed):
+        match = request.resolver_match
+        view = match.url_name if match and match.url_name else "unmatched"
+        requests_total.inc(view, request.method, response.status_code)
+        request_seconds.observe(view, value=elapsed)
+        db_queries.observe(view, value=metrics.queries)
+        db_seconds.observe(view, value=metrics.db)
+        serialize_seconds.observe(view, value=metrics.serialize)
+        render_seconds.observe(view, value=metrics.render)
+        if not response.streaming:
+            response_bytes.observe(view, value=len(response.content))
+
+        response["Server-Timing"] = ", ".join(
+            (
+                f'db;dur={metrics.db * 1000:.3f};desc="{metrics.queries} queries"',
+                f"serialize;dur={metrics.serialize * 1000:.3f}",
+                f"render;dur={metrics.render * 1000:.3f}",
+                f"total;dur={elapsed * 1000:.3f}",
+            )
+        )
+        return response
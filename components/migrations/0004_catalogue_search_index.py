@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from components.search import install_search_index, uninstall_search_index
+
+
+def forwards(apps, schema_editor):
+    install_search_index(schema_editor)
+
+
+def backwards(apps, schema_editor):
+    uninstall_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("components", "0003_alter_favouritemovie_custom_title_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
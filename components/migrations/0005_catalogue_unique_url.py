@@ -0,0 +1,31 @@
+# Generated by Django 4.1.2 on 2026-10-18 08:39
+
+from django.db import migrations, models
+
+from components.search import install_search_index
+
+
+def reinstall_search_index(apps, schema_editor):
+    # sqlite rebuilds the altered tables, dropping the search index triggers
+    install_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("components", "0004_catalogue_search_index"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="movie",
+            name="url",
+            field=models.URLField(unique=True),
+        ),
+        migrations.AlterField(
+            model_name="planet",
+            name="url",
+            field=models.URLField(unique=True),
+        ),
+        migrations.RunPython(reinstall_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 4.1.2 on 2026-10-18 08:49
+
+import components.models
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("components", "0005_catalogue_unique_url"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PlanetCatalogueEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("user_id", models.PositiveIntegerField()),
+                ("display_name", models.CharField(max_length=250)),
+                ("search_name", models.CharField(max_length=501)),
+                ("is_favourite", models.BooleanField()),
+                (
+                    "planet",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="user_entries",
+                        to="components.planet",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("user_id", "planet")},
+            },
+            managers=[
+                ("objects", components.models.PlanetCatalogueEntryManager()),
+            ],
+        ),
+        migrations.CreateModel(
+            name="MovieCatalogueEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("user_id", models.PositiveIntegerField()),
+                ("display_name", models.CharField(max_length=250)),
+                ("search_name", models.CharField(max_length=501)),
+                ("is_favourite", models.BooleanField()),
+                (
+                    "movie",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="user_entries",
+                        to="components.movie",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("user_id", "movie")},
+            },
+            managers=[
+                ("objects", components.models.MovieCatalogueEntryManager()),
+            ],
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.1.2 on 2026-10-18 08:52
+
+from django.db import migrations
+
+
+def materialize_entries(apps, schema_editor):
+    # users who already have favourites read the catalogue through their entries,
+    # runs apart from 0006 so the unique indexes the upsert targets exist
+    for model_name in ("MovieCatalogueEntry", "PlanetCatalogueEntry"):
+        model = apps.get_model("components", model_name)
+        model.objects.db_manager(schema_editor.connection.alias).materialize()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("components", "0006_catalogue_entries"),
+    ]
+
+    operations = [
+        migrations.RunPython(materialize_entries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.1.2 on 2026-10-18 08:55
+
+from django.db import migrations, models
+
+from components.search import install_search_index
+
+
+def reinstall_search_index(apps, schema_editor):
+    # sqlite rebuilds the altered catalogue tables, dropping the search index triggers
+    install_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("components", "0007_materialize_catalogue_entries"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="favouritemovie",
+            name="custom_title",
+            field=models.CharField(max_length=250, null=True),
+        ),
+        migrations.AlterField(
+            model_name="favouriteplanet",
+            name="custom_name",
+            field=models.CharField(max_length=250, null=True),
+        ),
+        migrations.AlterField(
+            model_name="movie",
+            name="title",
+            field=models.CharField(max_length=250),
+        ),
+        migrations.AlterField(
+            model_name="planet",
+            name="name",
+            field=models.CharField(max_length=250),
+        ),
+        migrations.AddIndex(
+            model_name="favouritemovie",
+            index=models.Index(
+                fields=["user_id", "movie"],
+                include=("custom_title",),
+                name="favouritemovie_user_covering",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="favouriteplanet",
+            index=models.Index(
+                fields=["user_id", "planet"],
+                include=("custom_name",),
+                name="favouriteplanet_user_covering",
+            ),
+        ),
+        migrations.RunPython(reinstall_search_index, migrations.RunPython.noop),
+    ]
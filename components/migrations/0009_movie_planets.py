@@ -0,0 +1,28 @@
+# Generated by Django 4.1.2 on 2026-10-18 09:04
+
+from django.db import migrations, models
+
+from components.search import install_search_index
+
+
+def reinstall_search_index(apps, schema_editor):
+    # sqlite rebuilds the movie table when adding the relation, dropping its triggers
+    install_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("components", "0008_list_query_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="movie",
+            name="planets",
+            field=models.ManyToManyField(
+                blank=True, related_name="movies", to="components.planet"
+            ),
+        ),
+        migrations.RunPython(reinstall_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def drop_unfavourited_entries(apps, schema_editor):
+    # entries are only kept for favourited objects, the list queries fall back to
+    # the catalogue row for the others
+    for model_name in ("MovieCatalogueEntry", "PlanetCatalogueEntry"):
+        model = apps.get_model("components", model_name)
+        model.objects.using(schema_editor.connection.alias).filter(
+            is_favourite=False
+        ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("components", "0010_ingestion_jobs"),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_unfavourited_entries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.1.2 on 2026-10-18 09:30
+
+import components.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("components", "0011_sparse_catalogue_entries"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="favouritemovie",
+            name="favouritemovie_user_covering",
+        ),
+        migrations.RemoveIndex(
+            model_name="favouriteplanet",
+            name="favouriteplanet_user_covering",
+        ),
+        migrations.AlterUniqueTogether(
+            name="favouritemovie",
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name="favouriteplanet",
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name="favouritemovie",
+            constraint=components.models.CoveringUniqueConstraint(
+                fields=("user_id", "movie"),
+                include=("custom_title",),
+                name="favouritemovie_user_unique",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="favouriteplanet",
+            constraint=components.models.CoveringUniqueConstraint(
+                fields=("user_id", "planet"),
+                include=("custom_name",),
+                name="favouriteplanet_user_unique",
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.1.2 on 2026-10-18 09:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("components", "0012_favourite_covering_unique"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PendingLink",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("film_url", models.URLField()),
+                ("planet_url", models.URLField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="pendinglink",
+            index=models.Index(fields=["planet_url"], name="pendinglink_planet_url"),
+        ),
+        migrations.AlterUniqueTogether(
+            name="pendinglink",
+            unique_together={("film_url", "planet_url")},
+        ),
+    ]
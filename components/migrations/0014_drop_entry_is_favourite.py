@@ -0,0 +1,21 @@
+# Generated by Django 4.1.2 on 2026-10-18 09:46
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("components", "0013_pending_links"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="moviecatalogueentry",
+            name="is_favourite",
+        ),
+        migrations.RemoveField(
+            model_name="planetcatalogueentry",
+            name="is_favourite",
+        ),
+    ]
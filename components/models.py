@@ -1,42 +1,349 @@
-from django.db import models
+from django.db import connections, models, router
 
 # Create your models here.
 
+# largest user or object id, the range of PositiveIntegerField and auto primary keys
+MAX_ID = 2147483647
+
+
+def write_connection(manager):
+    """
+    Connection the raw statements of a manager write with, the database given to
+    `db_manager()` or else the routed write database, never a read replica
+    """
+    return connections[manager._db or router.db_for_write(manager.model)]
+
+
+class CoveringUniqueConstraint(models.UniqueConstraint):
+    """
+    Unique constraint whose index also stores the `include` columns, on databases
+    without covering indexes it is a plain unique constraint rather than skipped
+    like UniqueConstraint does, upserts need it as their conflict target
+    """
+
+    def constraint_sql(self, model, schema_editor):
+        if schema_editor.connection.features.supports_covering_indexes:
+            return super().constraint_sql(model, schema_editor)
+        return self.without_include().constraint_sql(model, schema_editor)
+
+    def create_sql(self, model, schema_editor):
+        if schema_editor.connection.features.supports_covering_indexes:
+            return super().create_sql(model, schema_editor)
+        return self.without_include().create_sql(model, schema_editor)
+
+    def remove_sql(self, model, schema_editor):
+        if schema_editor.connection.features.supports_covering_indexes:
+            return super().remove_sql(model, schema_editor)
+        return self.without_include().remove_sql(model, schema_editor)
+
+    def without_include(self):
+        return models.UniqueConstraint(fields=self.fields, name=self.name)
+
+
+class FavouriteManager(models.Manager):
+    """
+    Single statement writes of a user favourite, no validation query runs before them
+    """
+
+    object_field = None
+    name_field = None
+
+    def upsert(self, user_id, object_id, custom_name):
+        """
+        Insert the favourite or replace its custom name when it exists, the catalogue
+        row is selected in the same statement so nothing is written and None is
+        returned when the object does not exist
+        """
+        connection = write_connection(self)
+        quote = connection.ops.quote_name
+        table = quote(self.model._meta.db_table)
+        catalogue_table = quote(
+            self.model._meta.get_field(self.object_field).related_model._meta.db_table
+        )
+        column = quote(f"{self.object_field}_id")
+        name = quote(self.name_field)
+        # the WHERE clause keeps sqlite from parsing ON CONFLICT as a join constraint
+        sql = (
+            f"INSERT INTO {table} ({quote('user_id')}, {column}, {name}) "
+            f"SELECT %s, {quote('id')}, %s FROM {catalogue_table} WHERE {quote('id')} = %s "
+            f"ON CONFLICT ({quote('user_id')}, {column}) "
+            f"DO UPDATE SET {name} = excluded.{name} RETURNING {quote('id')}"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [user_id, custom_name, object_id])
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        return self.model(
+            id=row[0],
+            user_id=user_id,
+            **{f"{self.object_field}_id": object_id, self.name_field: custom_name},
+        )
+
+    def remove(self, user_id, object_id):
+        """
+        Delete the favourite, returns whether it existed
+        """
+        connection = write_connection(self)
+        quote = connection.ops.quote_name
+        sql = (
+            f"DELETE FROM {quote(self.model._meta.db_table)} "
+            f"WHERE {quote('user_id')} = %s AND {quote(f'{self.object_field}_id')} = %s"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [user_id, object_id])
+            return cursor.rowcount > 0
+
+
+class FavouritePlanetManager(FavouriteManager):
+    object_field = "planet"
+    name_field = "custom_name"
+
+
+class FavouriteMovieManager(FavouriteManager):
+    object_field = "movie"
+    name_field = "custom_title"
+
 
 class Planet(models.Model):
-    name = models.CharField(max_length=250, db_index=True)
+    name = models.CharField(max_length=250)
     created = models.DateTimeField()
     updated = models.DateTimeField()
-    url = models.URLField()
+    url = models.URLField(unique=True)
 
 
 class Movie(models.Model):
-    title = models.CharField(max_length=250, db_index=True)
+    title = models.CharField(max_length=250)
     release_date = models.DateTimeField()
     created = models.DateTimeField()
     updated = models.DateTimeField()
-    url = models.URLField()
+    url = models.URLField(unique=True)
+    planets = models.ManyToManyField(Planet, related_name="movies", blank=True)
 
 
 class FavouritePlanet(models.Model):
     user_id = models.PositiveIntegerField()
     planet = models.ForeignKey(Planet, on_delete=models.CASCADE)
-    custom_name = models.CharField(max_length=250, null=True, db_index=True)
+    custom_name = models.CharField(max_length=250, null=True)
+
+    objects = FavouritePlanetManager()
 
     class Meta:
-        unique_together = (
-            "user_id",
-            "planet",
-        )
+        constraints = [
+            # index-only scans of the per-user favourites load on postgresql
+            CoveringUniqueConstraint(
+                fields=["user_id", "planet"],
+                include=["custom_name"],
+                name="favouriteplanet_user_unique",
+            )
+        ]
 
 
 class FavouriteMovie(models.Model):
     user_id = models.PositiveIntegerField()
     movie = models.ForeignKey(Movie, on_delete=models.CASCADE)
-    custom_title = models.CharField(max_length=250, null=True, db_index=True)
+    custom_title = models.CharField(max_length=250, null=True)
+
+    objects = FavouriteMovieManager()
+
+    class Meta:
+        constraints = [
+            # index-only scans of the per-user favourites load on postgresql
+            CoveringUniqueConstraint(
+                fields=["user_id", "movie"],
+                include=["custom_title"],
+                name="favouritemovie_user_unique",
+            )
+        ]
+
+
+class CatalogueEntryManager(models.Manager):
+    """
+    Set based maintenance of the per-user catalogue read model, entries are computed
+    from the user favourites and the catalogue with one INSERT ... SELECT upsert.
+    Only favourited objects have an entry, the list queries fall back to the
+    catalogue row for every other object
+    """
+
+    use_in_migrations = True
+
+    object_field = None
+    name_field = None
+    favourite_model = None
+    favourite_name_field = None
+
+    # joins the catalogue name and custom name so one LIKE matches either of them
+    SEARCH_SEPARATOR = "\n"
+
+    def materialize(self, user_id=None, object_ids=None):
+        """
+        Write the entries of the favourites of a user, or of every user when user_id
+        is None, optionally only for some catalogue objects. Existing entries are
+        updated in place, returns the number of rows written
+        """
+        connection = write_connection(self)
+        quote = connection.ops.quote_name
+        opts = self.model._meta
+        favourite_model = opts.apps.get_model(self.favourite_model)
+        catalogue_table = quote(
+            opts.get_field(self.object_field).related_model._meta.db_table
+        )
+        favourite_table = quote(favourite_model._meta.db_table)
+        column = quote(f"{self.object_field}_id")
+        name = f"c.{quote(self.name_field)}"
+        custom_name = f"NULLIF(f.{quote(self.favourite_name_field)}, '')"
+
+        params = [self.SEARCH_SEPARATOR]
+        where = []
+        if user_id is not None:
+            where.append(f"f.{quote('user_id')} = %s")
+            params.append(user_id)
+        if object_ids is not None:
+            object_ids = list(object_ids)
+            if not object_ids:
+                return 0
+            where.append(f"f.{column} IN ({', '.join(['%s'] * len(object_ids))})")
+            params.extend(object_ids)
+
+        # the WHERE clause keeps sqlite from parsing ON CONFLICT as a join constraint
+        sql = (
+            f"INSERT INTO {quote(opts.db_table)} ({quote('user_id')}, {column}, "
+            f"{quote('display_name')}, {quote('search_name')}) "
+            f"SELECT f.{quote('user_id')}, c.{quote('id')}, COALESCE({custom_name}, {name}), "
+            f"CASE WHEN {custom_name} IS NULL THEN {name} "
+            f"ELSE {name} || %s || {custom_name} END "
+            f"FROM {favourite_table} f "
+            f"INNER JOIN {catalogue_table} c ON c.{quote('id')} = f.{column} "
+            f"WHERE {' AND '.join(where) or '1 = 1'} "
+            f"ON CONFLICT ({quote('user_id')}, {column}) DO UPDATE SET "
+            f"{quote('display_name')} = excluded.{quote('display_name')}, "
+            f"{quote('search_name')} = excluded.{quote('search_name')}"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.rowcount
+
+    def remove(self, user_id, object_id):
+        """
+        Drop the entry of a favourite removed by its user
+        """
+        return self.filter(
+            user_id=user_id, **{f"{self.object_field}_id": object_id}
+        ).delete()
+
+    def rebuild(self):
+        """
+        Drop every entry and materialize them again from the favourites
+        """
+        self.all().delete()
+        return self.materialize()
+
+
+class MovieCatalogueEntryManager(CatalogueEntryManager):
+    object_field = "movie"
+    name_field = "title"
+    favourite_model = "components.FavouriteMovie"
+    favourite_name_field = "custom_title"
+
+
+class PlanetCatalogueEntryManager(CatalogueEntryManager):
+    object_field = "planet"
+    name_field = "name"
+    favourite_model = "components.FavouritePlanet"
+    favourite_name_field = "custom_name"
+
+
+class CatalogueEntry(models.Model):
+    """
+    Favourited catalogue row as seen by its user, the custom name is already
+    applied and `search_name` holds both names so a single predicate searches them
+    """
+
+    user_id = models.PositiveIntegerField()
+    display_name = models.CharField(max_length=250)
+    search_name = models.CharField(max_length=501)
+
+    class Meta:
+        abstract = True
+
+
+class MovieCatalogueEntry(CatalogueEntry):
+    movie = models.ForeignKey(
+        Movie, on_delete=models.CASCADE, related_name="user_entries"
+    )
+
+    objects = MovieCatalogueEntryManager()
 
     class Meta:
         unique_together = (
             "user_id",
             "movie",
         )
+
+
+class PlanetCatalogueEntry(CatalogueEntry):
+    planet = models.ForeignKey(
+        Planet, on_delete=models.CASCADE, related_name="user_entries"
+    )
+
+    objects = PlanetCatalogueEntryManager()
+
+    class Meta:
+        unique_together = (
+            "user_id",
+            "planet",
+        )
+
+
+class PendingLink(models.Model):
+    """
+    Film - planet link listed by an ingested record whose other side is not ingested
+    yet, written to the through table when that side is flushed
+    """
+
+    film_url = models.URLField()
+    planet_url = models.URLField()
+
+    class Meta:
+        unique_together = (
+            "film_url",
+            "planet_url",
+        )
+        indexes = [models.Index(fields=["planet_url"], name="pendinglink_planet_url")]
+
+
+class IngestionJob(models.Model):
+    """
+    Catalogue ingestion run by `ingestion_worker`, each page is committed together
+    with the progress so a job interrupted by a crash resumes after its last page
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = "queued"
+        RUNNING = "running"
+        SUCCEEDED = "succeeded"
+        FAILED = "failed"
+
+    status = models.CharField(
+        max_length=20, choices=Status.choices, default=Status.QUEUED
+    )
+    incremental = models.BooleanField(default=False)
+    # swapi resource name -> pages, rows, seconds and rows_per_second written so far
+    progress = models.JSONField(default=dict)
+    # CatalogueIngestion state and whether a full reload already cleaned the catalogue
+    state = models.JSONField(default=dict)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    # worker currently running the job, progress of any other worker is rejected
+    worker = models.CharField(max_length=64, blank=True)
+    heartbeat = models.DateTimeField(null=True)
+    created = models.DateTimeField(auto_now_add=True)
+    started = models.DateTimeField(null=True)
+    finished = models.DateTimeField(null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "created"], name="ingestionjob_status_created"
+            )
+        ]
@@ -0,0 +1,81 @@
+import base64
+import binascii
+
+from rest_framework.exceptions import ValidationError
+
+from .models import MAX_ID
+
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+
+
+def encode_cursor(last_id):
+    """
+    Encode the id of the last row of a page into an opaque cursor
+    """
+    return base64.urlsafe_b64encode(f"id:{last_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Decode an opaque cursor back to the id it points after
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        prefix, last_id = base64.urlsafe_b64decode(padded).decode().split(":")
+        last_id = int(last_id)
+        if prefix != "id" or not 0 <= last_id <= MAX_ID:
+            raise ValueError
+        return last_id
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValidationError({"cursor": "Invalid cursor"})
+
+
+class KeysetPaginator:
+    """
+    Keyset pagination keyed on `id`, pages are fetched with `id > cursor` so the
+    cost of a page does not depend on how deep into the table it is
+    """
+
+    def __init__(self, query_params):
+        self.limit = self.parse_limit(query_params.get("limit"))
+        cursor = query_params.get("cursor")
+        self.after = decode_cursor(cursor) if cursor else None
+        self.next_cursor = None
+
+    @staticmethod
+    def parse_limit(limit):
+        if limit is None:
+            return DEFAULT_PAGE_LIMIT
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValidationError({"limit": "A valid integer is required"})
+        if limit < 1:
+            raise ValidationError({"limit": "Ensure this value is greater than 0"})
+        return min(limit, MAX_PAGE_LIMIT)
+
+    def paginate_queryset(self, queryset):
+        """
+        Return the rows of the requested page, fetching one extra row to know
+        whether a next page exists
+        """
+        if self.after is not None:
+            queryset = queryset.filter(id__gt=self.after)
+        rows = list(queryset.order_by("id")[: self.limit + 1])
+        if len(rows) > self.limit:
+            rows = rows[: self.limit]
+            self.next_cursor = encode_cursor(rows[-1].id)
+        return rows
+
+    async def apaginate_queryset(self, queryset):
+        if self.after is not None:
+            queryset = queryset.filter(id__gt=self.after)
+        rows = [row async for row in queryset.order_by("id")[: self.limit + 1]]
+        if len(rows) > self.limit:
+            rows = rows[: self.limit]
+            self.next_cursor = encode_cursor(rows[-1].id)
+        return rows
+
+    def get_paginated_data(self, results):
+        return {"results": results, "next": self.next_cursor}
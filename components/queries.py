@@ -0,0 +1,116 @@
+from collections import defaultdict
+
+from django.db.models import (
+    BooleanField,
+    ExpressionWrapper,
+    F,
+    FilteredRelation,
+    Q,
+    Value,
+)
+from django.db.models.functions import Coalesce
+
+from .models import Movie, Planet
+from .search import get_search_backend
+
+
+def catalogue_queryset(model, name_field, display_field, term):
+    """
+    Catalogue as seen by a request without favourites, the display name is the
+    catalogue name
+    """
+    queryset = model.objects.annotate(
+        is_favourite=Value(False), **{display_field: F(name_field)}
+    )
+    if term:
+        queryset = queryset.filter(
+            get_search_backend().search_q(model, name_field, term)
+        )
+    return queryset
+
+
+def entry_queryset(model, name_field, display_field, user_id, term):
+    """
+    Catalogue of a user with favourites read through the entries of its favourites,
+    the overlay is a left join on (user_id, object) falling back to the catalogue
+    name. Search goes through the catalogue search index, or'ed with the custom
+    names of the user entries read through their (user_id, object) index
+    """
+    queryset = model.objects.annotate(
+        entry=FilteredRelation(
+            "user_entries", condition=Q(user_entries__user_id=user_id)
+        )
+    ).annotate(
+        is_favourite=ExpressionWrapper(
+            Q(entry__id__isnull=False), output_field=BooleanField()
+        ),
+        **{display_field: Coalesce(F("entry__display_name"), F(name_field))},
+    )
+    if term:
+        entries = model._meta.get_field("user_entries").related_model.objects
+        renamed = entries.filter(user_id=user_id, search_name__icontains=term).values(
+            f"{entries.object_field}_id"
+        )
+        queryset = queryset.filter(
+            get_search_backend().search_q(model, name_field, term) | Q(id__in=renamed)
+        )
+    return queryset
+
+
+def movie_queryset(user_id, has_favourites, title):
+    if has_favourites:
+        return entry_queryset(Movie, "title", "display_title", user_id, title)
+    return catalogue_queryset(Movie, "title", "display_title", title)
+
+
+def planet_queryset(user_id, has_favourites, name):
+    if has_favourites:
+        return entry_queryset(Planet, "name", "display_name", user_id, name)
+    return catalogue_queryset(Planet, "name", "display_name", name)
+
+
+class Relation:
+    """
+    Related catalogue objects of a page of rows, the list rows are tuples rather than
+    model instances so instead of `prefetch_related` one query reads the through
+    table joined to the related table for every id of the page
+    """
+
+    def __init__(self, through, source, target, fields):
+        self.through = through
+        self.source = source
+        self.target = target
+        self.fields = fields
+
+    def queryset(self, ids):
+        return (
+            self.through.objects.filter(**{f"{self.source}_id__in": ids})
+            .order_by(f"{self.source}_id", f"{self.target}_id")
+            .values_list(
+                f"{self.source}_id",
+                *(f"{self.target}__{field}" for field in self.fields),
+            )
+        )
+
+    def group(self, rows):
+        related = defaultdict(list)
+        for source_id, *values in rows:
+            related[source_id].append(dict(zip(self.fields, values)))
+        return related
+
+    def load(self, ids):
+        """
+        Map of each id to the list of its related objects
+        """
+        return self.group(self.queryset(ids))
+
+    async def aload(self, ids):
+        return self.group([row async for row in self.queryset(ids)])
+
+
+movie_planets = Relation(
+    Movie.planets.through, "movie", "planet", ("id", "name", "url")
+)
+planet_films = Relation(
+    Movie.planets.through, "planet", "movie", ("id", "title", "url")
+)
@@ -0,0 +1,96 @@
+import datetime
+import json
+
+try:
+    import orjson
+except ImportError:  # optional, falls back to the stdlib encoder
+    orjson = None
+
+
+def format_datetime(value):
+    """
+    Datetime in the format DRF's DateTimeField renders, utc offset written as Z
+    """
+    value = value.isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def encode_default(value):
+    if isinstance(value, datetime.datetime):
+        return format_datetime(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(data):
+    """
+    Encode data to JSON bytes with the same compact layout as DRF's JSONRenderer,
+    through orjson when it is installed
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_UTC_Z)
+    return json.dumps(
+        data,
+        default=encode_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode()
+
+
+class RowRenderer:
+    """
+    Renders `values_list` rows of a queryset without going through a serializer,
+    `fields` maps each output key to the queryset column or annotation it reads
+    """
+
+    def __init__(self, fields):
+        self.keys = list(fields)
+        self.columns = list(fields.values())
+
+    def rows(self, queryset):
+        return queryset.values_list(*self.columns, named=True)
+
+    def to_data(self, rows):
+        keys = self.keys
+        return [dict(zip(keys, row)) for row in rows]
+
+
+movie_rows = RowRenderer(
+    {
+        "id": "id",
+        "title": "display_title",
+        "release_date": "release_date",
+        "created": "created",
+        "updated": "updated",
+        "url": "url",
+        "is_favourite": "is_favourite",
+    }
+)
+planet_rows = RowRenderer(
+    {
+        "id": "id",
+        "name": "display_name",
+        "created": "created",
+        "updated": "updated",
+        "url": "url",
+        "is_favourite": "is_favourite",
+    }
+)
+
+
+def stream_ndjson(row_renderer, queryset, chunk_size):
+    """
+    Generator encoding a queryset one JSON row per line, rows are read from the
+    database `chunk_size` at a time and each chunk is yielded as one piece of the body
+    """
+    keys = row_renderer.keys
+    lines = []
+    for row in row_renderer.rows(queryset).iterator(chunk_size=chunk_size):
+        lines.append(dumps(dict(zip(keys, row))))
+        if len(lines) >= chunk_size:
+            yield b"\n".join(lines) + b"\n"
+            lines = []
+    if lines:
+        yield b"\n".join(lines) + b"\n"
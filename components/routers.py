@@ -0,0 +1,76 @@
+import itertools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+from .caching import primary_pins
+
+# database alias reads are routed to, None leaves them on the primary
+read_alias = ContextVar("read_alias", default=None)
+
+_requests = itertools.count()
+
+
+def next_replica():
+    """
+    Next configured replica in round-robin order, None when there is none
+    """
+    replicas = settings.DATABASE_REPLICAS
+    if not replicas:
+        return None
+    return replicas[next(_requests) % len(replicas)]
+
+
+def read_alias_for(user_id):
+    """
+    Replica a list request reads from, users pinned after a write read the primary
+    """
+    if not settings.DATABASE_REPLICAS or (
+        user_id is not None and primary_pins.is_pinned(user_id)
+    ):
+        return None
+    return next_replica()
+
+
+async def aread_alias_for(user_id):
+    if not settings.DATABASE_REPLICAS or (
+        user_id is not None and await primary_pins.ais_pinned(user_id)
+    ):
+        return None
+    return next_replica()
+
+
+@contextmanager
+def reading_from(alias):
+    """
+    Route the reads issued inside the block to alias
+    """
+    token = read_alias.set(alias)
+    try:
+        yield
+    finally:
+        read_alias.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Sends reads issued inside `reading_from` to the chosen replica, every other read
+    and all writes stay on the primary. Replicas hold the same data, so relations
+    between them are allowed, and are copies of the primary, so migrations never
+    run on them
+    """
+
+    def db_for_read(self, model, **hints):
+        return read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -0,0 +1,115 @@
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+# catalogue tables and the column substring search runs against
+SEARCH_COLUMNS = {
+    "components_movie": "title",
+    "components_planet": "name",
+}
+
+
+class IContainsSearchBackend:
+    """
+    Plain `icontains` match, every search is a full scan of the table
+    """
+
+    def search_q(self, model, field, term):
+        return Q(**{f"{field}__icontains": term})
+
+
+class SQLiteFTS5SearchBackend(IContainsSearchBackend):
+    """
+    Substring search served by an FTS5 trigram index kept in sync by triggers,
+    terms shorter than a trigram can not use the index and fall back to `icontains`
+    """
+
+    min_term_length = 3
+
+    def search_q(self, model, field, term):
+        if len(term) < self.min_term_length:
+            return super().search_q(model, field, term)
+        fts_table = f"{model._meta.db_table}_fts"
+        # a quoted string is matched as a phrase, so operators in term are literal
+        match = '"{}"'.format(term.replace('"', '""'))
+        return Q(
+            id__in=RawSQL(
+                f"SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH %s", [match]
+            )
+        )
+
+
+class PostgresTrigramSearchBackend(IContainsSearchBackend):
+    """
+    `icontains` compiles to `UPPER(column) LIKE UPPER(%term%)` on PostgreSQL, which
+    the `pg_trgm` GIN index on `UPPER(column)` serves without a table scan
+    """
+
+
+def get_search_backend():
+    if connection.vendor == "sqlite":
+        return SQLiteFTS5SearchBackend()
+    if connection.vendor == "postgresql":
+        return PostgresTrigramSearchBackend()
+    return IContainsSearchBackend()
+
+
+def install_search_index(schema_editor):
+    """
+    Create the search index of the catalogue tables for the current database,
+    safe to run again after a migration rebuilds a table and drops its triggers
+    """
+    vendor = schema_editor.connection.vendor
+    for table, column in SEARCH_COLUMNS.items():
+        if vendor == "sqlite":
+            fts_table = f"{table}_fts"
+            with schema_editor.connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+                    [fts_table],
+                )
+                exists = cursor.fetchone() is not None
+            if not exists:
+                schema_editor.execute(
+                    f"CREATE VIRTUAL TABLE {fts_table} USING fts5({column}, "
+                    f"content='{table}', content_rowid='id', tokenize='trigram')"
+                )
+            schema_editor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {table} "
+                f"BEGIN INSERT INTO {fts_table}(rowid, {column}) "
+                f"VALUES (new.id, new.{column}); END"
+            )
+            schema_editor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {table} "
+                f"BEGIN INSERT INTO {fts_table}({fts_table}, rowid, {column}) "
+                f"VALUES ('delete', old.id, old.{column}); END"
+            )
+            schema_editor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE ON {table} "
+                f"BEGIN INSERT INTO {fts_table}({fts_table}, rowid, {column}) "
+                f"VALUES ('delete', old.id, old.{column}); "
+                f"INSERT INTO {fts_table}(rowid, {column}) "
+                f"VALUES (new.id, new.{column}); END"
+            )
+            if not exists:
+                schema_editor.execute(
+                    f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')"
+                )
+        elif vendor == "postgresql":
+            schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            schema_editor.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_{column}_trgm "
+                f"ON {table} USING gin (UPPER({column}) gin_trgm_ops)"
+            )
+
+
+def uninstall_search_index(schema_editor):
+    vendor = schema_editor.connection.vendor
+    for table, column in SEARCH_COLUMNS.items():
+        if vendor == "sqlite":
+            fts_table = f"{table}_fts"
+            for suffix in ("ai", "ad", "au"):
+                schema_editor.execute(f"DROP TRIGGER IF EXISTS {fts_table}_{suffix}")
+            schema_editor.execute(f"DROP TABLE IF EXISTS {fts_table}")
+        elif vendor == "postgresql":
+            schema_editor.execute(f"DROP INDEX IF EXISTS {table}_{column}_trgm")
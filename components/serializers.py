@@ -1,5 +1,12 @@
-from rest_framework.serializers import ModelSerializer
-from .models import Movie, Planet, FavouriteMovie, FavouritePlanet
+from rest_framework.serializers import (
+    BooleanField,
+    CharField,
+    IntegerField,
+    ListField,
+    ModelSerializer,
+    Serializer,
+)
+from .models import MAX_ID, Movie, Planet, FavouriteMovie, FavouritePlanet, IngestionJob
 
 
 class MovieListSerializer(ModelSerializer):
@@ -14,6 +21,30 @@ class PlanetListSerializer(ModelSerializer):
         fields = ["id", "name", "created", "updated", "url"]
 
 
+class MovieListItemSerializer(MovieListSerializer):
+    """
+    Movie row annotated with the user favourite overlay by the list view
+    """
+
+    title = CharField(source="display_title")
+    is_favourite = BooleanField()
+
+    class Meta(MovieListSerializer.Meta):
+        fields = MovieListSerializer.Meta.fields + ["is_favourite"]
+
+
+class PlanetListItemSerializer(PlanetListSerializer):
+    """
+    Planet row annotated with the user favourite overlay by the list view
+    """
+
+    name = CharField(source="display_name")
+    is_favourite = BooleanField()
+
+    class Meta(PlanetListSerializer.Meta):
+        fields = PlanetListSerializer.Meta.fields + ["is_favourite"]
+
+
 class FavouriteMovieSerializer(ModelSerializer):
     class Meta:
         model = FavouriteMovie
@@ -24,3 +55,69 @@ class FavouritePlanetSerializer(ModelSerializer):
     class Meta:
         model = FavouritePlanet
         fields = ["id", "user_id", "planet", "custom_name"]
+
+
+class BulkFavouriteSerializer(Serializer):
+    """
+    Envelope of a bulk favourite request, items are validated one by one so a bad
+    item is reported in its own result instead of failing the whole request
+    """
+
+    user_id = IntegerField(min_value=0, max_value=MAX_ID)
+    items = ListField(allow_empty=False, max_length=1000)
+
+
+class BulkFavouriteMovieItemSerializer(Serializer):
+    movie = IntegerField(min_value=0, max_value=MAX_ID)
+    custom_title = CharField(max_length=250, allow_null=True, required=False)
+
+
+class BulkFavouritePlanetItemSerializer(Serializer):
+    planet = IntegerField(min_value=0, max_value=MAX_ID)
+    custom_name = CharField(max_length=250, allow_null=True, required=False)
+
+
+class FavouriteMovieUpsertSerializer(BulkFavouriteMovieItemSerializer):
+    """
+    Validates a favourite write without touching the database, the movie is
+    checked by the upsert statement itself
+    """
+
+    user_id = IntegerField(min_value=0, max_value=MAX_ID)
+
+
+class FavouritePlanetUpsertSerializer(BulkFavouritePlanetItemSerializer):
+    """
+    Validates a favourite write without touching the database, the planet is
+    checked by the upsert statement itself
+    """
+
+    user_id = IntegerField(min_value=0, max_value=MAX_ID)
+
+
+class FavouriteMovieDeleteSerializer(Serializer):
+    user_id = IntegerField(min_value=0, max_value=MAX_ID)
+    movie = IntegerField(min_value=0, max_value=MAX_ID)
+
+
+class FavouritePlanetDeleteSerializer(Serializer):
+    user_id = IntegerField(min_value=0, max_value=MAX_ID)
+    planet = IntegerField(min_value=0, max_value=MAX_ID)
+
+
+class IngestionJobSerializer(ModelSerializer):
+    class Meta:
+        model = IngestionJob
+        fields = [
+            "id",
+            "status",
+            "incremental",
+            "progress",
+            "error",
+            "attempts",
+            "created",
+            "started",
+            "heartbeat",
+            "finished",
+        ]
+        read_only_fields = [field for field in fields if field != "incremental"]
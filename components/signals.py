@@ -0,0 +1,98 @@
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .caching import movie_favourites, planet_favourites
+from .metrics import record_query
+from .models import (
+    FavouriteMovie,
+    FavouritePlanet,
+    Movie,
+    MovieCatalogueEntry,
+    Planet,
+    PlanetCatalogueEntry,
+)
+
+
+def deleted_directly(sender, origin):
+    """
+    Whether a favourite is deleted for itself rather than cascading from the deletion
+    of its catalogue object, whose entries are deleted by the same cascade
+    """
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model is sender
+
+
+def invalidate_on_commit(favourites, user_id, using):
+    """
+    Drop cached favourites once the write is committed, a read between the write
+    and its commit would otherwise cache the favourites of before the write again
+    """
+    transaction.on_commit(partial(favourites.invalidate, user_id), using=using)
+
+
+@receiver(post_save, sender=FavouriteMovie)
+def favourite_movie_saved(sender, instance, using, **kwargs):
+    invalidate_on_commit(movie_favourites, instance.user_id, using)
+    MovieCatalogueEntry.objects.materialize(instance.user_id, [instance.movie_id])
+
+
+@receiver(post_delete, sender=FavouriteMovie)
+def favourite_movie_deleted(sender, instance, using, origin=None, **kwargs):
+    invalidate_on_commit(movie_favourites, instance.user_id, using)
+    if deleted_directly(sender, origin):
+        MovieCatalogueEntry.objects.remove(instance.user_id, instance.movie_id)
+
+
+@receiver(post_save, sender=FavouritePlanet)
+def favourite_planet_saved(sender, instance, using, **kwargs):
+    invalidate_on_commit(planet_favourites, instance.user_id, using)
+    PlanetCatalogueEntry.objects.materialize(instance.user_id, [instance.planet_id])
+
+
+@receiver(post_delete, sender=FavouritePlanet)
+def favourite_planet_deleted(sender, instance, using, origin=None, **kwargs):
+    invalidate_on_commit(planet_favourites, instance.user_id, using)
+    if deleted_directly(sender, origin):
+        PlanetCatalogueEntry.objects.remove(instance.user_id, instance.planet_id)
+
+
+# bulk catalogue writes send no signals, ingestion refreshes the entries itself
+
+
+@receiver(post_save, sender=Movie)
+def movie_saved(sender, instance, **kwargs):
+    MovieCatalogueEntry.objects.materialize(object_ids=[instance.id])
+
+
+@receiver(post_save, sender=Planet)
+def planet_saved(sender, instance, **kwargs):
+    PlanetCatalogueEntry.objects.materialize(object_ids=[instance.id])
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    WAL lets readers run alongside the single writer, NORMAL sync is safe under WAL,
+    and busy_timeout makes concurrent writers wait for the lock instead of failing
+    """
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for pragma, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {pragma} = {value}")
+
+
+@receiver(connection_created)
+def install_query_metrics(sender, connection, **kwargs):
+    """
+    Count queries of every connection, including replicas and the connections of
+    threads running async orm calls, towards the request that issued them
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
@@ -0,0 +1,269 @@
+import asyncio
+import hashlib
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+# seconds between checks of the shared cache while another process computes a key
+POLL_INTERVAL = 0.05
+# seconds a result published for waiting processes is kept, they poll far more often
+RESULT_TIMEOUT = 5
+
+# backends private to a process, the flights of the process already coalesce callers
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+# how a call got its value: computed it, waited for another caller, served the
+# previous value, or computed it after waiting in vain
+RESULTS = ("leader", "coalesced", "stale", "fallback")
+
+MISSING = object()
+
+
+class Flight:
+    """
+    A computation running in this process, callers asking for its key wait on `done`
+    """
+
+    __slots__ = ("done", "value")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = MISSING
+
+
+class SingleFlight:
+    """
+    Computes a value once for concurrent callers asking for the same key. Threads of
+    this process wait for the one computing it, across processes the computation
+    runs under a lock in the shared cache and its result is published there for the
+    processes that registered as waiting on it, a process-local cache has no other
+    process to coordinate with and takes no lock. A caller waiting longer than
+    SINGLE_FLIGHT_TIMEOUT, or whose computation failed, computes the value itself.
+    `stale` returns a previous value served to waiting callers instead, or None
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.counts = dict.fromkeys(RESULTS, 0)
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[settings.CATALOGUE_CACHE_ALIAS]
+
+    @property
+    def shared(self):
+        """
+        Whether other processes use the cache too, only then is a lock taken in it
+        """
+        return not isinstance(self.cache, PROCESS_LOCAL_CACHES)
+
+    def lock_key(self, key):
+        # keys hold search terms, hashed to stay valid cache keys
+        return f"singleflight:{self.name}:{hashlib.sha1(key.encode()).hexdigest()}"
+
+    @staticmethod
+    def result_key(lock_key, token):
+        return f"{lock_key}:{token}"
+
+    @staticmethod
+    def waiting_key(lock_key, token):
+        return f"{lock_key}:{token}:waiting"
+
+    def _count(self, result):
+        with self._lock:
+            self.counts[result] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counts)
+
+    def _join(self, flights, key, new_flight):
+        with self._lock:
+            flight = flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = flights[key] = new_flight()
+            return flight, True
+
+    def _leave(self, flights, key):
+        with self._lock:
+            del flights[key]
+
+    def do(self, key, compute, stale=None):
+        flight, leader = self._join(self._flights, key, Flight)
+        if not leader:
+            return self._follow(flight, compute, stale)
+        try:
+            flight.value = self._lead(key, compute, stale)
+            return flight.value
+        finally:
+            self._leave(self._flights, key)
+            flight.done.set()
+
+    def _follow(self, flight, compute, stale):
+        value = stale() if stale else None
+        if value is not None:
+            self._count("stale")
+            return value
+        if flight.done.wait(settings.SINGLE_FLIGHT_TIMEOUT) and (
+            flight.value is not MISSING
+        ):
+            self._count("coalesced")
+            return flight.value
+        self._count("fallback")
+        return compute()
+
+    def _lead(self, key, compute, stale):
+        if not self.shared:
+            self._count("leader")
+            return compute()
+        lock_key = self.lock_key(key)
+        token = uuid.uuid4().hex
+        if self.cache.add(lock_key, token, settings.SINGLE_FLIGHT_TIMEOUT):
+            self._count("leader")
+            value = MISSING
+            try:
+                value = compute()
+                return value
+            finally:
+                self._release(lock_key, token, value)
+
+        value = stale() if stale else None
+        if value is not None:
+            self._count("stale")
+            return value
+        value = self._wait_remote(lock_key)
+        if value is not MISSING:
+            self._count("coalesced")
+            return value
+        self._count("fallback")
+        return compute()
+
+    def _release(self, lock_key, token, value):
+        """
+        Publish the value if another process waits for it, then release the lock
+        """
+        waiting_key = self.waiting_key(lock_key, token)
+        held = self.cache.get_many([lock_key, waiting_key])
+        if value is not MISSING and waiting_key in held:
+            self.cache.set(self.result_key(lock_key, token), value, RESULT_TIMEOUT)
+        if held.get(lock_key) == token:
+            self.cache.delete(lock_key)
+
+    def _wait_remote(self, lock_key):
+        """
+        Result published by the process holding the lock, MISSING if it released
+        the lock without one or did not finish in time
+        """
+        deadline = time.monotonic() + settings.SINGLE_FLIGHT_TIMEOUT
+        token = self.cache.get(lock_key)
+        if token is None:
+            return MISSING
+        result_key = self.result_key(lock_key, token)
+        self.cache.set(
+            self.waiting_key(lock_key, token), True, settings.SINGLE_FLIGHT_TIMEOUT
+        )
+        while True:
+            value = self.cache.get(result_key, MISSING)
+            if value is not MISSING:
+                return value
+            if self.cache.get(lock_key) != token:
+                # the result is published before the lock is released
+                return self.cache.get(result_key, MISSING)
+            if time.monotonic() >= deadline:
+                return MISSING
+            time.sleep(POLL_INTERVAL)
+
+    async def ado(self, key, acompute, astale=None):
+        # futures belong to the event loop that created them
+        loop = asyncio.get_running_loop()
+        future, leader = self._join(self._flights, (loop, key), loop.create_future)
+        if not leader:
+            return await self._afollow(future, acompute, astale)
+        try:
+            value = await self._alead(key, acompute, astale)
+            future.set_result(value)
+            return value
+        finally:
+            self._leave(self._flights, (loop, key))
+            if not future.done():
+                future.set_result(MISSING)
+
+    async def _afollow(self, future, acompute, astale):
+        value = await astale() if astale else None
+        if value is not None:
+            self._count("stale")
+            return value
+        try:
+            value = await asyncio.wait_for(
+                asyncio.shield(future), settings.SINGLE_FLIGHT_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            value = MISSING
+        if value is not MISSING:
+            self._count("coalesced")
+            return value
+        self._count("fallback")
+        return await acompute()
+
+    async def _alead(self, key, acompute, astale):
+        if not self.shared:
+            self._count("leader")
+            return await acompute()
+        lock_key = self.lock_key(key)
+        token = uuid.uuid4().hex
+        if await self.cache.aadd(lock_key, token, settings.SINGLE_FLIGHT_TIMEOUT):
+            self._count("leader")
+            value = MISSING
+            try:
+                value = await acompute()
+                return value
+            finally:
+                await self._arelease(lock_key, token, value)
+
+        value = await astale() if astale else None
+        if value is not None:
+            self._count("stale")
+            return value
+        value = await self._await_remote(lock_key)
+        if value is not MISSING:
+            self._count("coalesced")
+            return value
+        self._count("fallback")
+        return await acompute()
+
+    async def _arelease(self, lock_key, token, value):
+        waiting_key = self.waiting_key(lock_key, token)
+        held = await self.cache.aget_many([lock_key, waiting_key])
+        if value is not MISSING and waiting_key in held:
+            await self.cache.aset(
+                self.result_key(lock_key, token), value, RESULT_TIMEOUT
+            )
+        if held.get(lock_key) == token:
+            await self.cache.adelete(lock_key)
+
+    async def _await_remote(self, lock_key):
+        deadline = time.monotonic() + settings.SINGLE_FLIGHT_TIMEOUT
+        token = await self.cache.aget(lock_key)
+        if token is None:
+            return MISSING
+        result_key = self.result_key(lock_key, token)
+        await self.cache.aset(
+            self.waiting_key(lock_key, token), True, settings.SINGLE_FLIGHT_TIMEOUT
+        )
+        while True:
+            value = await self.cache.aget(result_key, MISSING)
+            if value is not MISSING:
+                return value
+            if await self.cache.aget(lock_key) != token:
+                return await self.cache.aget(result_key, MISSING)
+            if time.monotonic() >= deadline:
+                return MISSING
+            await asyncio.sleep(POLL_INTERVAL)
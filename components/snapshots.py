@@ -0,0 +1,99 @@
+import gzip
+import io
+import json
+
+from django.db.models import Prefetch
+
+from .models import Movie, Planet
+
+try:
+    import zstandard
+except ImportError:  # optional, only needed for .zst snapshots
+    zstandard = None
+
+
+def movie_to_record(movie):
+    return {
+        "title": movie.title,
+        "release_date": movie.release_date.isoformat(),
+        "created": movie.created.isoformat(),
+        "edited": movie.updated.isoformat(),
+        "url": movie.url,
+        "planets": [planet.url for planet in movie.planets.all()],
+    }
+
+
+def planet_to_record(planet):
+    return {
+        "name": planet.name,
+        "created": planet.created.isoformat(),
+        "edited": planet.updated.isoformat(),
+        "url": planet.url,
+    }
+
+
+# swapi resource name -> (model, record serializer, relations prefetched per chunk),
+# records are written in swapi shape so snapshots go through the same ingestion
+# as live api pages
+SNAPSHOT_RESOURCES = {
+    "films": (
+        Movie,
+        movie_to_record,
+        [Prefetch("planets", queryset=Planet.objects.only("url"))],
+    ),
+    "planets": (Planet, planet_to_record, []),
+}
+
+
+def open_snapshot(path, mode):
+    """
+    Open a JSONL snapshot for text reading ("r") or writing ("w"),
+    compression is picked from the file extension: .gz, .zst or none
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, f"{mode}t", encoding="utf-8")
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise ImportError("zstandard is required for .zst snapshots")
+        if mode == "w":
+            stream = zstandard.ZstdCompressor().stream_writer(open(path, "wb"))
+        else:
+            stream = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"))
+        return io.TextIOWrapper(stream, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def write_snapshot(path, chunk_size=2000):
+    """
+    Stream the catalogue into a snapshot one record per line, returns records written
+    """
+    written = 0
+    with open_snapshot(path, "w") as snapshot:
+        for resource, (model, to_record, prefetch) in SNAPSHOT_RESOURCES.items():
+            queryset = model.objects.order_by("id").prefetch_related(*prefetch)
+            for obj in queryset.iterator(chunk_size=chunk_size):
+                line = {"resource": resource, "record": to_record(obj)}
+                snapshot.write(json.dumps(line) + "\n")
+                written += 1
+    return written
+
+
+def read_snapshot(path, page_size=500):
+    """
+    Generator yielding (resource, page of records) pairs read line by line from a
+    snapshot, same shape as `components.utils.fetch_all_resources`
+    """
+    pages = {resource: [] for resource in SNAPSHOT_RESOURCES}
+    with open_snapshot(path, "r") as snapshot:
+        for line in snapshot:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            page = pages[entry["resource"]]
+            page.append(entry["record"])
+            if len(page) >= page_size:
+                yield entry["resource"], page
+                pages[entry["resource"]] = []
+    for resource, page in pages.items():
+        if page:
+            yield resource, page
@@ -0,0 +1,52 @@
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from components.models import FavouriteMovie, Movie, MovieCatalogueEntry, Planet
+from components.urls import urlpatterns
+
+
+class BenchmarkEndpointsTest(TestCase):
+    def test_report_covers_every_endpoint(self):
+        """
+        Validate the benchmark drives every components endpoint without errors,
+        writes a JSON report and rolls back the data it generated
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "report.json")
+            call_command(
+                "benchmark_endpoints",
+                movies=20,
+                planets=20,
+                users=5,
+                favourites=2,
+                requests=3,
+                warmup=1,
+                output=output,
+            )
+            with open(output) as report_file:
+                report = json.load(report_file)
+
+        self.assertEqual(report["meta"]["movies"], 20)
+        self.assertEqual(report["meta"]["catalogue_entries"], 5 * 2 * 2)
+        self.assertEqual(
+            set(report["endpoints"]), {pattern.name for pattern in urlpatterns}
+        )
+        for endpoint, variants in report["endpoints"].items():
+            for variant, summary in variants.items():
+                with self.subTest(endpoint=endpoint, variant=variant):
+                    self.assertEqual(summary["errors"], 0)
+                    self.assertEqual(summary["runs"], 3)
+                    self.assertIn("p99_ms", summary)
+                    self.assertIn("queries_mean", summary)
+        self.assertGreater(
+            report["endpoints"]["movie-list"]["user_id"]["queries_mean"], 0
+        )
+
+        self.assertFalse(Movie.objects.exists())
+        self.assertFalse(Planet.objects.exists())
+        self.assertFalse(FavouriteMovie.objects.exists())
+        self.assertFalse(MovieCatalogueEntry.objects.exists())
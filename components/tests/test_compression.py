@@ -0,0 +1,192 @@
+import gzip
+import zlib
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from components import compression
+from components.caching import catalogue_payloads, catalogue_version
+from components.factories import FavouriteMovieFactory, MovieFactory
+from components.models import Movie
+
+
+class FakeBrotli:
+    """
+    Stand-in for the optional brotli package when it is not installed, zlib streams
+    keep the bodies checkable
+    """
+
+    decompress = staticmethod(zlib.decompress)
+
+    @staticmethod
+    def compress(content, quality):
+        return zlib.compress(content, min(quality, 9))
+
+    class Compressor:
+        def __init__(self, quality):
+            self.compressor = zlib.compressobj(min(quality, 9))
+
+        def process(self, chunk):
+            return self.compressor.compress(chunk)
+
+        def finish(self):
+            return self.compressor.flush()
+
+
+class NegotiateTest(SimpleTestCase):
+    def test_negotiates_supported_encoding_by_quality(self):
+        """
+        Validate the accepted encoding of the highest quality is chosen
+        """
+        with mock.patch.object(compression, "ENCODINGS", ("br", "gzip")):
+            self.assertEqual(compression.negotiate("gzip, deflate, br"), "br")
+            self.assertEqual(compression.negotiate("br;q=0.5, gzip"), "gzip")
+            self.assertEqual(compression.negotiate("*"), "br")
+            self.assertEqual(compression.negotiate("gzip;q=0, br;q=0"), None)
+        with mock.patch.object(compression, "ENCODINGS", ("gzip",)):
+            self.assertEqual(compression.negotiate("br"), None)
+            self.assertEqual(compression.negotiate("br, GZIP;q=0.1"), "gzip")
+        self.assertEqual(compression.negotiate(""), None)
+        self.assertEqual(compression.negotiate("identity"), None)
+
+
+class CompressedResponseTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Movie.objects.all().delete()
+        cls.movies = MovieFactory.create_batch(5)
+        FavouriteMovieFactory(movie=cls.movies[0], user_id=1)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_anonymous_page_compressed_once_per_version(self):
+        """
+        Validate the gzip variant of a cached page is built once, served without
+        compressing again and revalidated under its own etag
+        """
+        url = reverse("movie-list")
+        plain = self.client.get(url)
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertNotEqual(response["ETag"], plain["ETag"])
+
+        with mock.patch("components.caching.compress") as compress:
+            with self.assertNumQueries(0):
+                cached = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+        compress.assert_not_called()
+        self.assertEqual(cached.content, response.content)
+        key = catalogue_payloads.key(catalogue_version.get(), "movie", 100, None)
+        self.assertEqual(cache.get(f"{key}:gzip"), response.content)
+
+        not_modified = self.client.get(
+            url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_async_anonymous_page_is_compressed(self):
+        """
+        Validate the async list serves the same compressed variant
+        """
+        response = await self.async_client.get(
+            reverse("async-movie-list"), ACCEPT_ENCODING="gzip"
+        )
+        plain = await self.async_client.get(reverse("movie-list"))
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+
+    def test_user_page_compressed_by_middleware(self):
+        """
+        Validate responses built per request are compressed on the way out
+        """
+        url = reverse("movie-list")
+        plain = self.client.get(url, {"user_id": 1})
+        response = self.client.get(url, {"user_id": 1}, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertEqual(int(response["Content-Length"]), len(response.content))
+
+    def test_stream_is_compressed(self):
+        """
+        Validate NDJSON streams are compressed chunk by chunk
+        """
+        url = reverse("movie-list")
+        plain = self.client.get(url, {"stream": 1})
+        response = self.client.get(url, {"stream": 1}, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(
+            gzip.decompress(b"".join(response.streaming_content)),
+            b"".join(plain.streaming_content),
+        )
+
+    def test_small_and_unaccepted_responses_are_not_compressed(self):
+        """
+        Validate tiny bodies and clients not accepting an encoding get plain JSON
+        """
+        response = self.client.get(
+            reverse("movie-list"),
+            {"title": "no such movie"},
+            HTTP_ACCEPT_ENCODING="gzip",
+        )
+        self.assertFalse(response.has_header("Content-Encoding"))
+        response = self.client.get(
+            reverse("movie-list"), {"user_id": 1}, HTTP_ACCEPT_ENCODING="br;q=0"
+        )
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+
+class BrotliResponseTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Movie.objects.all().delete()
+        cls.movies = MovieFactory.create_batch(5)
+
+    def setUp(self):
+        cache.clear()
+        brotli = compression.brotli or FakeBrotli
+        self.decompress = brotli.decompress
+        for patcher in (
+            mock.patch.object(compression, "brotli", brotli),
+            mock.patch.object(compression, "ENCODINGS", ("br", "gzip")),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_anonymous_page_cached_as_brotli(self):
+        """
+        Validate clients accepting brotli get the cached brotli variant of a page,
+        compressed once per catalogue version
+        """
+        url = reverse("movie-list")
+        plain = self.client.get(url)
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(self.decompress(response.content), plain.content)
+        self.assertTrue(response["ETag"].endswith('-br"'))
+
+        with mock.patch("components.caching.compress") as compress:
+            with self.assertNumQueries(0):
+                cached = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, br")
+        compress.assert_not_called()
+        self.assertEqual(cached.content, response.content)
+
+    def test_stream_is_compressed_as_brotli(self):
+        """
+        Validate NDJSON streams are compressed with brotli chunk by chunk
+        """
+        url = reverse("movie-list")
+        plain = self.client.get(url, {"stream": 1})
+        response = self.client.get(url, {"stream": 1}, HTTP_ACCEPT_ENCODING="br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(
+            self.decompress(b"".join(response.streaming_content)),
+            b"".join(plain.streaming_content),
+        )
@@ -0,0 +1,229 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from components.factories import FavouriteMovieFactory
+from components.models import (
+    IngestionJob,
+    Movie,
+    MovieCatalogueEntry,
+    PendingLink,
+    Planet,
+)
+from components.tests.test_prepopulate import film_record, links, planet_record
+
+PAGES = [
+    ("films", [film_record(1, "A New Hope", planets=[1])]),
+    ("films", [film_record(2, "The Empire Strikes Back", planets=[1, 2])]),
+    ("planets", [planet_record(1, "Tatooine"), planet_record(2, "Hoth")]),
+]
+
+
+def run_worker(pages):
+    with mock.patch(
+        "components.jobs.fetch_all_resources", return_value=iter(pages)
+    ) as fetch:
+        call_command("ingestion_worker", "--once", stdout=StringIO(), stderr=StringIO())
+    return fetch
+
+
+class IngestionJobApiTest(APITestCase):
+    def test_trigger_queues_a_single_job(self):
+        """
+        Validate triggering queues a job, and a second trigger reports the active one
+        """
+        response = self.client.post(reverse("ingestion-jobs"), {"incremental": True})
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], "queued")
+        self.assertTrue(response.data["incremental"])
+
+        conflict = self.client.post(reverse("ingestion-jobs"))
+        self.assertEqual(conflict.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(conflict.data["id"], response.data["id"])
+        self.assertEqual(IngestionJob.objects.count(), 1)
+
+        detail = self.client.get(
+            reverse("ingestion-job", kwargs={"pk": response.data["id"]})
+        )
+        self.assertEqual(detail.status_code, status.HTTP_200_OK)
+        self.assertEqual(detail.data["progress"], {})
+
+    def test_ingestion_api_is_local_only(self):
+        """
+        Validate the ingestion api is hidden from addresses outside the allow list
+        """
+        response = self.client.post(reverse("ingestion-jobs"), REMOTE_ADDR="10.0.0.1")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(IngestionJob.objects.exists())
+
+
+class IngestionWorkerTest(TestCase):
+    def test_worker_runs_job_and_reports_progress(self):
+        """
+        Validate the worker loads the catalogue and records per resource progress
+        """
+        Movie.objects.all().delete()
+        Planet.objects.all().delete()
+        job = IngestionJob.objects.create()
+
+        run_worker(PAGES)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, IngestionJob.Status.SUCCEEDED)
+        self.assertEqual(job.attempts, 1)
+        self.assertIsNotNone(job.finished)
+        self.assertEqual(job.progress["films"]["pages"], 2)
+        self.assertEqual(job.progress["films"]["rows"], 2)
+        self.assertEqual(job.progress["planets"]["rows"], 2)
+        self.assertIn("rows_per_second", job.progress["planets"])
+        self.assertEqual(Movie.objects.count(), 2)
+        self.assertEqual(len(links()), 3)
+
+    def test_incremental_job_state_holds_only_counters(self):
+        """
+        Validate an incremental job refreshes the entries of updated favourites as
+        their batch is written and keeps only counters in its resumable state
+        """
+        Movie.objects.all().delete()
+        Planet.objects.all().delete()
+        IngestionJob.objects.create()
+        run_worker(PAGES[:1])
+        movie = Movie.objects.get()
+        FavouriteMovieFactory(movie=movie, user_id=10, custom_title=None)
+        IngestionJob.objects.create(incremental=True)
+
+        edited = film_record(1, "Episode IV", "2015-01-01T00:00:00Z", planets=[1])
+        run_worker([("films", [edited])] + PAGES[1:])
+
+        job = IngestionJob.objects.latest("id")
+        self.assertEqual(job.status, IngestionJob.Status.SUCCEEDED)
+        self.assertEqual(
+            job.state["ingestion"],
+            {
+                "created": {"films": 1, "planets": 2},
+                "updated": {"films": 1, "planets": 0},
+                "links_created": 3,
+                "links_removed": 0,
+            },
+        )
+        self.assertEqual(
+            MovieCatalogueEntry.objects.get(user_id=10, movie=movie).display_name,
+            "Episode IV",
+        )
+
+    def test_worker_times_interleaved_resources_separately(self):
+        """
+        Validate each resource is timed from its own previous page when the pages
+        of several resources arrive interleaved
+        """
+        Movie.objects.all().delete()
+        Planet.objects.all().delete()
+        job = IngestionJob.objects.create()
+
+        with mock.patch("components.jobs.time") as clock:
+            clock.perf_counter.side_effect = [0.0, 1.0, 3.0, 6.0]
+            run_worker([PAGES[0], PAGES[2], PAGES[1]])
+
+        job.refresh_from_db()
+        self.assertEqual(job.progress["films"]["seconds"], 6.0)
+        self.assertEqual(job.progress["planets"]["seconds"], 3.0)
+        self.assertEqual(job.progress["planets"]["rows_per_second"], 0.7)
+
+    def test_worker_resumes_stale_job_after_last_page(self):
+        """
+        Validate a running job whose worker died resumes after its last committed
+        page, keeping the rows and pending links written before the crash
+        """
+        Movie.objects.all().delete()
+        Planet.objects.all().delete()
+        first_page = PAGES[0][1]
+        Movie.objects.create(
+            title="A New Hope",
+            release_date="1977-05-25",
+            created=first_page[0]["created"],
+            updated=first_page[0]["edited"],
+            url=first_page[0]["url"],
+        )
+        PendingLink.objects.create(
+            film_url=first_page[0]["url"], planet_url=first_page[0]["planets"][0]
+        )
+        job = IngestionJob.objects.create(
+            status=IngestionJob.Status.RUNNING,
+            worker="crashed",
+            attempts=1,
+            heartbeat=timezone.now() - timedelta(hours=1),
+            progress={"films": {"pages": 1, "rows": 1, "seconds": 0.5}},
+            state={
+                "cleaned": True,
+                "ingestion": {
+                    "created": {"films": 1},
+                },
+            },
+        )
+
+        fetch = run_worker(PAGES[1:])
+
+        self.assertEqual(
+            fetch.call_args.kwargs["start_pages"], {"films": 2, "planets": 1}
+        )
+        job.refresh_from_db()
+        self.assertEqual(job.status, IngestionJob.Status.SUCCEEDED)
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual(job.progress["films"]["pages"], 2)
+        self.assertEqual(job.state["ingestion"]["created"]["films"], 2)
+        self.assertEqual(Movie.objects.count(), 2)
+        self.assertEqual(len(links()), 3)
+
+    def test_worker_skips_job_with_live_heartbeat(self):
+        """
+        Validate a running job is left alone while its worker keeps beating
+        """
+        job = IngestionJob.objects.create(
+            status=IngestionJob.Status.RUNNING,
+            worker="alive",
+            heartbeat=timezone.now(),
+        )
+
+        fetch = run_worker(PAGES)
+
+        fetch.assert_not_called()
+        job.refresh_from_db()
+        self.assertEqual(job.worker, "alive")
+
+    def test_worker_marks_failed_job(self):
+        """
+        Validate an error while fetching fails the job with the error recorded
+        """
+        job = IngestionJob.objects.create(incremental=True)
+        with mock.patch(
+            "components.jobs.fetch_all_resources",
+            side_effect=ConnectionError("swapi is down"),
+        ), mock.patch(
+            "components.management.commands.ingestion_worker.time.sleep"
+        ) as sleep:
+            call_command(
+                "ingestion_worker", "--once", stdout=StringIO(), stderr=StringIO()
+            )
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, IngestionJob.Status.FAILED)
+        self.assertEqual(job.error, "ConnectionError: swapi is down")
+        # the worker waits before polling again after an error
+        sleep.assert_called_once_with(5.0)
+
+    def test_prepopulate_background_queues_job(self):
+        """
+        Validate --background queues an ingestion instead of running it
+        """
+        call_command("prepopulate_data", "--background", stdout=StringIO())
+
+        job = IngestionJob.objects.get()
+        self.assertEqual(job.status, IngestionJob.Status.QUEUED)
+        self.assertFalse(job.incremental)
@@ -0,0 +1,91 @@
+import re
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from components.factories import FavouriteMovieFactory, MovieFactory
+
+SERVER_TIMING = re.compile(
+    r'^db;dur=[\d.]+;desc="(\d+) queries", serialize;dur=[\d.]+, '
+    r"render;dur=[\d.]+, total;dur=[\d.]+$"
+)
+
+
+@override_settings(METRICS_ENABLED=True)
+class MetricsMiddlewareTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.movie = MovieFactory()
+        FavouriteMovieFactory(movie=cls.movie, user_id=1)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_server_timing_counts_request_queries(self):
+        """
+        Validate the Server-Timing header reports every query the request issued
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("movie-list"), data={"user_id": 1}, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        match = SERVER_TIMING.match(response["Server-Timing"])
+        self.assertIsNotNone(match, response["Server-Timing"])
+        self.assertEqual(int(match.group(1)), len(queries))
+
+    async def test_server_timing_counts_async_orm_queries(self):
+        """
+        Validate queries of async views, run in worker threads, count towards the request
+        """
+        response = await self.async_client.get(
+            reverse("async-movie-list"), {"user_id": 1}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        match = SERVER_TIMING.match(response["Server-Timing"])
+        self.assertIsNotNone(match, response["Server-Timing"])
+        self.assertGreater(int(match.group(1)), 0)
+
+    def test_metrics_endpoint_exposes_request_and_cache_metrics(self):
+        """
+        Validate /metrics renders request counters, histograms and cache stats
+        """
+        self.client.get(reverse("movie-list"), data={"user_id": 1}, format="json")
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        body = response.content.decode()
+        self.assertIn(
+            'components_requests_total{view="movie-list",method="GET",status="200"}',
+            body,
+        )
+        self.assertIn('components_db_queries_bucket{view="movie-list",le="+Inf"}', body)
+        self.assertIn('components_response_size_bytes_count{view="movie-list"}', body)
+        self.assertIn(
+            'components_favourite_movies_cache_requests_total{result="miss"}', body
+        )
+
+    def test_metrics_endpoint_is_local_only(self):
+        """
+        Validate /metrics is not served to remote addresses
+        """
+        response = self.client.get(reverse("metrics"), REMOTE_ADDR="10.0.0.1")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(METRICS_ENABLED=False)
+class MetricsDisabledTest(APITestCase):
+    def test_no_metrics_when_disabled(self):
+        """
+        Validate the middleware removes itself and /metrics is not served when disabled
+        """
+        response = self.client.get(reverse("movie-list"), format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("Server-Timing", response)
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
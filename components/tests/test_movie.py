@@ -1,14 +1,31 @@
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
-from components.models import Movie, Planet, FavouriteMovie, FavouritePlanet
+from components.caching import (
+    catalogue_payloads,
+    catalogue_version,
+    movie_favourites,
+)
+from components.models import (
+    Movie,
+    MovieCatalogueEntry,
+    Planet,
+    FavouriteMovie,
+    FavouritePlanet,
+)
 from django.utils import timezone
+from components.autocomplete import movie_autocomplete
+from components.pagination import encode_cursor
+from components.singleflight import SingleFlight
 from components.serializers import (
     MovieListSerializer,
     PlanetListSerializer,
     FavouriteMovieSerializer,
 )
 import json
+from unittest import mock
 from components.factories import (
     MovieFactory,
     PlanetFactory,
@@ -26,6 +43,9 @@ class MovieListApiTest(APITestCase):
         MovieFactory.create_batch(2)
         super().setUpClass()
 
+    def setUp(self):
+        cache.clear()
+
     def test_get_movielist_without_any_param(self):
         """
         Get List of movies when no params are sent
@@ -36,7 +56,7 @@ class MovieListApiTest(APITestCase):
         data = MovieListSerializer(Movie.objects.all(), many=True).data
         for node in data:
             node["is_favourite"] = False
-        output = json.loads(json.dumps({"results": data}))
+        output = json.loads(json.dumps({"results": data, "next": None}))
         self.assertEqual(response.json(), output)
 
     def test_get_movielist_with_user_param(self):
@@ -49,7 +69,7 @@ class MovieListApiTest(APITestCase):
         data = MovieListSerializer(Movie.objects.all(), many=True).data
         for node in data:
             node["is_favourite"] = False
-        output = json.loads(json.dumps({"results": data}))
+        output = json.loads(json.dumps({"results": data, "next": None}))
         self.assertEqual(response.json(), output)
 
     def test_get_movielist_with_title_param(self):
@@ -63,7 +83,7 @@ class MovieListApiTest(APITestCase):
 
         data = MovieListSerializer(Movie.objects.get(title=movie.title)).data
         data["is_favourite"] = False
-        output = json.loads(json.dumps({"results": [data]}))
+        output = json.loads(json.dumps({"results": [data], "next": None}))
         self.assertEqual(response.json(), output)
 
     def test_get_movielist_with_user_param_and_favourite(self):
@@ -178,6 +198,464 @@ class MovieListApiTest(APITestCase):
                 self.assertNotEqual(node["title"], movie_with_custom_title.title)
                 self.assertTrue(node["is_favourite"])
 
+    def test_get_movielist_is_paginated_with_cursor(self):
+        """
+        Validate walking the `next` cursors returns every movie exactly once and in id order,
+        and favourites are overlaid on later pages as well
+        """
+        last_movie = MovieFactory()
+        user_id = faker.pyint()
+        custom_title = faker.word()
+        FavouriteMovieFactory(
+            movie=last_movie, user_id=user_id, custom_title=custom_title
+        )
+
+        url = reverse("movie-list")
+        seen_ids = []
+        cursor = None
+        while True:
+            params = {"user_id": user_id, "limit": 1}
+            if cursor:
+                params["cursor"] = cursor
+            response = self.client.get(url, data=params, format="json")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.json()["results"]), 1)
+            node = response.json()["results"][0]
+            seen_ids.append(node["id"])
+            if node["id"] == last_movie.id:
+                self.assertEqual(node["title"], custom_title)
+                self.assertTrue(node["is_favourite"])
+            cursor = response.json()["next"]
+            if not cursor:
+                break
+
+        expected_ids = list(Movie.objects.order_by("id").values_list("id", flat=True))
+        self.assertEqual(seen_ids, expected_ids)
+
+    def test_get_movielist_with_invalid_pagination_param(self):
+        """
+        Validate malformed cursor or limit returns validationerror
+        """
+        url = reverse("movie-list")
+        response = self.client.get(url, data={"cursor": "invalid"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        for last_id in (99999999999999999999, -1):
+            response = self.client.get(
+                url,
+                data={"cursor": encode_cursor(last_id), "user_id": 1},
+                format="json",
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(response.json(), {"cursor": "Invalid cursor"})
+
+        for user_id in (2147483648, -1):
+            response = self.client.get(url, data={"user_id": user_id}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("user_id", response.json())
+
+        response = self.client.get(url, data={"limit": 0}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_movielist_runs_one_query_per_page(self):
+        """
+        Validate the favourite overlay and search are resolved in the same query as the page,
+        user requests first check whether the user has any favourites
+        """
+        movie = MovieFactory()
+        user_id = faker.pyint()
+        FavouriteMovieFactory(movie=movie, user_id=user_id, custom_title=faker.word())
+
+        url = reverse("movie-list")
+        with self.assertNumQueries(1):
+            response = self.client.get(url, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        for params in (
+            {"user_id": user_id},
+            {"user_id": user_id, "title": movie.title},
+            {"user_id": user_id, "limit": 1},
+            {"user_id": user_id + 1},
+        ):
+            with self.assertNumQueries(2):
+                response = self.client.get(url, data=params, format="json")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_movielist_favourites_cache_follows_writes(self):
+        """
+        Validate cached favourites are dropped when a favourite is added or removed, once the
+        removal is committed, while the list reads the written favourite
+        """
+        movie = Movie.objects.first()
+        user_id = faker.pyint()
+        url = reverse("movie-list")
+        stats = movie_favourites.stats()
+
+        movie_favourites.get_map(user_id)
+        movie_favourites.get_map(user_id)
+        self.assertEqual(movie_favourites.stats()["misses"], stats["misses"] + 1)
+        self.assertEqual(movie_favourites.stats()["hits"], stats["hits"] + 1)
+
+        custom_title = faker.word()
+        self.client.post(
+            reverse("favourite-movie"),
+            data={"movie": movie.id, "user_id": user_id, "custom_title": custom_title},
+            format="json",
+        )
+        self.assertEqual(movie_favourites.get_map(user_id), {movie.id: custom_title})
+        response = self.client.get(url, data={"user_id": user_id}, format="json")
+        node = {node["id"]: node for node in response.json()["results"]}[movie.id]
+        self.assertEqual(node["title"], custom_title)
+        self.assertTrue(node["is_favourite"])
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            FavouriteMovie.objects.get(user_id=user_id).delete()
+        self.assertIn(movie.id, movie_favourites.get_map(user_id))
+        for callback in callbacks:
+            callback()
+        self.assertNotIn(movie.id, movie_favourites.get_map(user_id))
+        response = self.client.get(url, data={"user_id": user_id}, format="json")
+        node = {node["id"]: node for node in response.json()["results"]}[movie.id]
+        self.assertEqual(node["title"], movie.title)
+        self.assertFalse(node["is_favourite"])
+
+    def test_get_movielist_for_user_zero(self):
+        """
+        Validate user 0 is a user like any other, not an anonymous request
+        """
+        movie = Movie.objects.first()
+        response = self.client.post(
+            reverse("favourite-movie"),
+            data={"movie": movie.id, "user_id": 0, "custom_title": "zero"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        url = reverse("movie-list")
+        response = self.client.get(url, data={"user_id": 0}, format="json")
+        node = {node["id"]: node for node in response.json()["results"]}[movie.id]
+        self.assertEqual(node["title"], "zero")
+        self.assertTrue(node["is_favourite"])
+        response = self.client.get(
+            url, data={"user_id": 0, "title": "zero"}, format="json"
+        )
+        self.assertEqual(
+            [node["id"] for node in response.json()["results"]], [movie.id]
+        )
+        response = self.client.get(
+            reverse("movie-autocomplete"),
+            data={"user_id": 0, "title": "zer"},
+            format="json",
+        )
+        self.assertEqual(
+            response.json()["results"],
+            [{"id": movie.id, "title": "zero", "is_favourite": True}],
+        )
+
+    def test_get_movielist_title_search_follows_title_updates(self):
+        """
+        Validate title search sees renamed and deleted movies once they are written
+        """
+        movie = MovieFactory(title="Revenge of the Sith")
+        url = reverse("movie-list")
+
+        movie.title = "Attack of the Clones"
+        movie.save()
+        response = self.client.get(url, data={"title": "revenge"}, format="json")
+        self.assertEqual(response.json()["results"], [])
+        response = self.client.get(url, data={"title": "clones"}, format="json")
+        self.assertEqual(
+            [node["id"] for node in response.json()["results"]], [movie.id]
+        )
+
+        movie.delete()
+        response = self.client.get(url, data={"title": "clones"}, format="json")
+        self.assertEqual(response.json()["results"], [])
+
+    def test_get_movielist_user_search_reads_catalogue_entries(self):
+        """
+        Validate a user with favourites searches catalogue and custom titles through its
+        catalogue entries, which follow favourite writes and movie updates
+        """
+        movie = MovieFactory(title="Revenge of the Sith")
+        user_id = faker.pyint()
+        FavouriteMovieFactory(movie=movie, user_id=user_id, custom_title="Episode III")
+        url = reverse("movie-list")
+
+        for title in ("sith", "episode"):
+            response = self.client.get(
+                url, data={"user_id": user_id, "title": title}, format="json"
+            )
+            self.assertEqual(
+                [(node["id"], node["title"]) for node in response.json()["results"]],
+                [(movie.id, "Episode III")],
+            )
+
+        movie.title = "Attack of the Clones"
+        movie.save()
+        response = self.client.get(
+            url, data={"user_id": user_id, "title": "clones"}, format="json"
+        )
+        self.assertEqual(
+            [node["id"] for node in response.json()["results"]], [movie.id]
+        )
+        self.assertFalse(
+            MovieCatalogueEntry.objects.filter(
+                user_id=user_id, search_name__icontains="sith"
+            ).exists()
+        )
+
+    def test_catalogue_entries_follow_favourites(self):
+        """
+        Validate only favourited movies have catalogue entries, and deleting a
+        favourited movie drops its favourites and entries
+        """
+        movie, other = MovieFactory.create_batch(2)
+        user_id = faker.pyint()
+        FavouriteMovieFactory(movie=movie, user_id=user_id, custom_title="toto")
+        self.assertEqual(
+            list(
+                MovieCatalogueEntry.objects.filter(user_id=user_id).values_list(
+                    "movie_id", flat=True
+                )
+            ),
+            [movie.id],
+        )
+        response = self.client.get(
+            reverse("movie-list"), data={"user_id": user_id}, format="json"
+        )
+        titles = {node["id"]: node["title"] for node in response.json()["results"]}
+        self.assertEqual(titles[movie.id], "toto")
+        self.assertEqual(titles[other.id], other.title)
+
+        movie.delete()
+        self.assertFalse(FavouriteMovie.objects.filter(user_id=user_id).exists())
+        self.assertFalse(MovieCatalogueEntry.objects.filter(user_id=user_id).exists())
+
+    def test_get_movielist_streams_whole_list_as_ndjson(self):
+        """
+        Validate `stream=1` streams every movie unpaginated, one json row per line,
+        with the favourite overlay applied across chunks
+        """
+        movie = MovieFactory()
+        user_id = faker.pyint()
+        custom_title = faker.word()
+        FavouriteMovieFactory(movie=movie, user_id=user_id, custom_title=custom_title)
+
+        url = reverse("movie-list")
+        with mock.patch("components.views.STREAM_CHUNK_SIZE", 2):
+            response = self.client.get(
+                url, data={"user_id": user_id, "stream": 1, "limit": 1}
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(response.streaming)
+            self.assertEqual(response["Content-Type"], "application/x-ndjson")
+            nodes = [
+                json.loads(line)
+                for line in b"".join(response.streaming_content).splitlines()
+            ]
+        self.assertEqual(
+            [node["id"] for node in nodes],
+            list(Movie.objects.order_by("id").values_list("id", flat=True)),
+        )
+        for node in nodes:
+            self.assertEqual(node["is_favourite"], node["id"] == movie.id)
+            if node["id"] == movie.id:
+                self.assertEqual(node["title"], custom_title)
+
+    def test_get_movielist_includes_planets_without_n_plus_one(self):
+        """
+        Validate include=planets adds the planets of each movie with one query per page,
+        whatever the number of movies on it
+        """
+        planets = PlanetFactory.create_batch(3)
+        movies = MovieFactory.create_batch(4)
+        for movie in movies:
+            movie.planets.set(planets[:2])
+        movies[0].planets.add(planets[2])
+        url = reverse("movie-list")
+
+        # page query and one query for the planets of every movie of the page
+        for limit in (1, 10):
+            cache.clear()
+            with self.assertNumQueries(2):
+                response = self.client.get(
+                    url, data={"include": "planets", "limit": limit}, format="json"
+                )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        nodes = {node["id"]: node for node in response.json()["results"]}
+        self.assertEqual(
+            nodes[movies[0].id]["planets"],
+            [
+                {"id": planet.id, "name": planet.name, "url": planet.url}
+                for planet in planets
+            ],
+        )
+        self.assertEqual(len(nodes[movies[1].id]["planets"]), 2)
+        for movie in Movie.objects.exclude(id__in=[movie.id for movie in movies]):
+            self.assertEqual(nodes[movie.id]["planets"], [])
+
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                url,
+                data={"include": "planets", "title": movies[1].title},
+                format="json",
+            )
+        self.assertIn("planets", response.json()["results"][0])
+        response = self.client.get(url, data={"include": "films"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(
+            url, data={"include": "planets", "stream": 1}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("include", response.json())
+
+    def test_get_movielist_anonymous_is_served_from_catalogue_cache(self):
+        """
+        Validate anonymous unfiltered pages are cached per catalogue version and support If-None-Match
+        """
+        url = reverse("movie-list")
+        response = self.client.get(url, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+
+        with self.assertNumQueries(0):
+            cached_response = self.client.get(url, format="json")
+        self.assertEqual(cached_response.content, response.content)
+        self.assertEqual(cached_response["ETag"], etag)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # a catalogue write invalidates cached pages and their etag
+        catalogue_version.bump()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_get_movielist_serves_stale_page_while_rebuilt(self):
+        """
+        Validate with stale-while-revalidate a page being rebuilt by another worker
+        is served from the previous catalogue version, under that version's etag
+        """
+        url = reverse("movie-list")
+        response = self.client.get(url, format="json")
+        etag = response["ETag"]
+        catalogue_version.bump()
+        # another worker is building the first page of the new version
+        key = catalogue_payloads.key(catalogue_version.get(), "movie", 100, None)
+        cache.add(catalogue_payloads.flights.lock_key(key), "other", 10)
+
+        with self.settings(CATALOGUE_STALE_WHILE_REVALIDATE=True), mock.patch.object(
+            SingleFlight, "shared", True
+        ):
+            with self.assertNumQueries(0):
+                stale_response = self.client.get(url, format="json")
+        self.assertEqual(stale_response.content, response.content)
+        self.assertEqual(stale_response["ETag"], etag)
+
+
+class MovieAutocompleteApiTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # other test classes leave movies behind, complete against these ones only
+        Movie.objects.all().delete()
+        cls.hope = MovieFactory(title="A New Hope")
+        cls.empire = MovieFactory(title="The Empire Strikes Back")
+        cls.jedi = MovieFactory(title="Return of the Jedi")
+
+    def setUp(self):
+        cache.clear()
+
+    def test_autocomplete_matches_word_prefixes(self):
+        """
+        Validate any word of the title starting with the typed text matches, case insensitive
+        """
+        url = reverse("movie-autocomplete")
+        response = self.client.get(url, data={"title": "ne"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json(),
+            {
+                "results": [
+                    {"id": self.hope.id, "title": "A New Hope", "is_favourite": False}
+                ]
+            },
+        )
+        response = self.client.get(url, data={"title": "THE"}, format="json")
+        self.assertEqual(
+            [node["id"] for node in response.json()["results"]],
+            [self.empire.id, self.jedi.id],
+        )
+        response = self.client.get(url, data={"title": "the", "limit": 1})
+        self.assertEqual(len(response.json()["results"]), 1)
+        response = self.client.get(url, data={"title": ""}, format="json")
+        self.assertEqual(response.json(), {"results": []})
+
+    def test_autocomplete_serves_from_index_and_merges_user_favourites(self):
+        """
+        Validate the user renamed favourites match by custom title and come first,
+        and the index is read without queries until the catalogue version changes
+        """
+        FavouriteMovieFactory(movie=self.jedi, user_id=1, custom_title="Jabba")
+        FavouriteMovieFactory(movie=self.empire, user_id=1)
+        url = reverse("movie-autocomplete")
+        self.client.get(url, data={"title": "a", "user_id": 1}, format="json")
+
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                url, data={"title": "j", "user_id": 1}, format="json"
+            )
+        self.assertEqual(
+            response.json()["results"],
+            [
+                {"id": self.jedi.id, "title": "Jabba", "is_favourite": True},
+            ],
+        )
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                url, data={"title": "emp", "user_id": 1}, format="json"
+            )
+        self.assertEqual(
+            response.json()["results"],
+            [
+                {
+                    "id": self.empire.id,
+                    "title": "The Empire Strikes Back",
+                    "is_favourite": True,
+                },
+            ],
+        )
+
+        # a catalogue write rebuilds the index with the next request
+        Movie.objects.filter(id=self.hope.id).update(title="Jedi Origins")
+        catalogue_version.bump()
+        response = self.client.get(url, data={"title": "jedi"}, format="json")
+        self.assertEqual(
+            [node["id"] for node in response.json()["results"]],
+            [self.jedi.id, self.hope.id],
+        )
+
+    def test_autocomplete_serves_previous_index_during_rebuild(self):
+        """
+        Validate requests arriving while another thread rebuilds the index are served
+        from the previous index instead of waiting for the rebuild
+        """
+        url = reverse("movie-autocomplete")
+        self.client.get(url, data={"title": "hope"}, format="json")
+        Movie.objects.filter(id=self.hope.id).update(title="Rogue One")
+        catalogue_version.bump()
+
+        # the lock is held by the thread rebuilding the index
+        with movie_autocomplete._lock, self.assertNumQueries(0):
+            response = self.client.get(url, data={"title": "hope"}, format="json")
+        self.assertEqual(
+            [node["id"] for node in response.json()["results"]], [self.hope.id]
+        )
+        response = self.client.get(url, data={"title": "hope"}, format="json")
+        self.assertEqual(response.json()["results"], [])
+
 
 class FavouriteMovieApiTest(APITestCase):
     @classmethod
@@ -249,3 +727,264 @@ class FavouriteMovieApiTest(APITestCase):
             format="json",
         )
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # ids beyond the integer columns are rejected before reaching the database
+        for data in (
+            {"movie": movie.id, "user_id": 2147483648},
+            {"movie": 2147483648, "user_id": user_id},
+        ):
+            with self.assertNumQueries(0):
+                response = self.client.post(url, data=data, format="json")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                response = self.client.delete(url, data=data, format="json")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_post_and_put_favourite_movie_upserts(self):
+        """
+        Validating re-adding a favourite movie replaces its custom_title with a single statement
+        """
+        movie = Movie.objects.first()
+        user_id = faker.pyint()
+        url = reverse("favourite-movie")
+        response = self.client.post(
+            url,
+            data={"movie": movie.id, "user_id": user_id, "custom_title": "old"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        favourite_id = response.json()["data"]["id"]
+
+        for method, custom_title in (
+            (self.client.post, "new"),
+            (self.client.put, "newer"),
+        ):
+            # the favourite upsert and the refresh of the user catalogue entries
+            with self.assertNumQueries(2):
+                response = method(
+                    url,
+                    data={
+                        "movie": movie.id,
+                        "user_id": user_id,
+                        "custom_title": custom_title,
+                    },
+                    format="json",
+                )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                response.json(),
+                {
+                    "data": {
+                        "id": favourite_id,
+                        "user_id": user_id,
+                        "movie": movie.id,
+                        "custom_title": custom_title,
+                    }
+                },
+            )
+        favourite = FavouriteMovie.objects.get(user_id=user_id)
+        self.assertEqual(favourite.custom_title, "newer")
+
+    def test_delete_favourite_movie(self):
+        """
+        Validating Api call to remove movie from user favourite
+        """
+        movie = Movie.objects.first()
+        user_id = faker.pyint()
+        FavouriteMovieFactory(movie=movie, user_id=user_id)
+        url = reverse("favourite-movie")
+
+        with self.assertNumQueries(2):
+            response = self.client.delete(
+                url, data={"movie": movie.id, "user_id": user_id}, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(FavouriteMovie.objects.filter(user_id=user_id).exists())
+
+        response = self.client.delete(
+            url, data={"movie": movie.id, "user_id": user_id}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class BulkFavouriteMovieApiTest(APITestCase):
+    def test_post_bulk_favourite_movies(self):
+        """
+        Validating bulk favourite Api adds and updates favourites with one lookup, one write and
+        one refresh of the user catalogue entries, and reports invalid items in their own result
+        """
+        new_movie, favourite_movie = MovieFactory.create_batch(2)
+        user_id = faker.pyint()
+        FavouriteMovieFactory(
+            movie=favourite_movie, user_id=user_id, custom_title="old"
+        )
+        missing_id = Movie.objects.order_by("-id").first().id + 1
+
+        url = reverse("favourite-movie-bulk")
+        with self.assertNumQueries(3):
+            response = self.client.post(
+                url,
+                data={
+                    "user_id": user_id,
+                    "items": [
+                        {"movie": new_movie.id},
+                        {"movie": favourite_movie.id, "custom_title": "new"},
+                        {"movie": missing_id, "custom_title": "missing"},
+                        {"custom_title": "malformed"},
+                    ],
+                },
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.json()["data"]["results"]
+        self.assertEqual(
+            [result["status"] for result in results],
+            ["saved", "saved", "invalid", "invalid"],
+        )
+        self.assertIn("movie", results[2]["errors"])
+        self.assertIn("movie", results[3]["errors"])
+        self.assertEqual(
+            dict(
+                FavouriteMovie.objects.filter(user_id=user_id).values_list(
+                    "movie_id", "custom_title"
+                )
+            ),
+            {new_movie.id: None, favourite_movie.id: "new"},
+        )
+
+    def test_post_bulk_favourite_movies_with_incorrect_param(self):
+        """
+        Validating bulk favourite Api returns validationerror when user_id or items are malformed
+        """
+        url = reverse("favourite-movie-bulk")
+        response = self.client.post(
+            url, data={"user_id": faker.word(), "items": [{"movie": 1}]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            url, data={"user_id": faker.pyint(), "items": []}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            url, data={"user_id": 2147483648, "items": [{"movie": 1}]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            url,
+            data={"user_id": faker.pyint(), "items": [{"movie": 2147483648}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        result = response.json()["data"]["results"][0]
+        self.assertEqual(result["status"], "invalid")
+        self.assertIn("movie", result["errors"])
+
+
+class AsyncMovieApiTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.movies = MovieFactory.create_batch(3)
+        cls.user_id = faker.pyint()
+        FavouriteMovieFactory(
+            movie=cls.movies[0], user_id=cls.user_id, custom_title="favourite"
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    async def test_async_movielist_matches_sync_movielist(self):
+        """
+        Validate the async movie list returns the same pages as the sync one
+        """
+        for params in [
+            {},
+            {"user_id": self.user_id},
+            {"user_id": self.user_id, "title": "favourite"},
+            {"limit": 1},
+        ]:
+            expected = await sync_to_async(self.client.get)(
+                reverse("movie-list"), data=params
+            )
+            response = await self.async_client.get(
+                reverse("async-movie-list"), data=params
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json(), expected.json())
+
+        response = await self.async_client.get(
+            reverse("async-movie-list"), data={"limit": "nan"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = await self.async_client.get(
+            reverse("async-movie-list"), data={"include": "planets", "stream": 1}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = await self.async_client.get(
+            reverse("async-movie-list"), data={"stream": 1}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("stream", response.json())
+
+    async def test_async_favourite_movie_upsert_and_delete(self):
+        """
+        Validate async favourite writes upsert, delete and keep the favourites cache in sync
+        """
+        movie = self.movies[1]
+        url = reverse("async-favourite-movie")
+        for custom_title in ["first", "second"]:
+            response = await self.async_client.post(
+                url,
+                data={
+                    "movie": movie.id,
+                    "user_id": self.user_id,
+                    "custom_title": custom_title,
+                },
+                content_type="application/json",
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json()["data"]["custom_title"], custom_title)
+        self.assertEqual(
+            (await movie_favourites.aget_map(self.user_id))[movie.id], "second"
+        )
+
+        body = {"movie": movie.id, "user_id": self.user_id}
+        response = await self.async_client.delete(
+            url, data=body, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        response = await self.async_client.delete(
+            url, data=body, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = await self.async_client.post(
+            url, data="{", content_type="application/json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_async_bulk_favourite_movies(self):
+        """
+        Validate async bulk favourite Api saves valid items and reports invalid ones
+        """
+        user_id = faker.pyint()
+        response = await self.async_client.post(
+            reverse("async-favourite-movie-bulk"),
+            data={
+                "user_id": user_id,
+                "items": [
+                    {"movie": self.movies[0].id, "custom_title": "new"},
+                    {"movie": self.movies[-1].id + 1000},
+                ],
+            },
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [result["status"] for result in response.json()["data"]["results"]],
+            ["saved", "invalid"],
+        )
+        self.assertEqual(
+            await movie_favourites.aget_map(user_id), {self.movies[0].id: "new"}
+        )
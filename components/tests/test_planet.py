@@ -1,10 +1,14 @@
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
+from components.caching import catalogue_version, planet_favourites
 from components.models import Movie, Planet, FavouriteMovie, FavouritePlanet
 from django.utils import timezone
 from components.serializers import PlanetListSerializer, FavouritePlanetSerializer
 import json
+from unittest import mock
 from components.factories import (
     MovieFactory,
     PlanetFactory,
@@ -22,6 +26,9 @@ class PlanetListApiTest(APITestCase):
         PlanetFactory.create_batch(2)
         super().setUpClass()
 
+    def setUp(self):
+        cache.clear()
+
     def test_get_planetlist_without_any_param(self):
         """
         Get List of planet when no params are sent
@@ -32,7 +39,7 @@ class PlanetListApiTest(APITestCase):
         data = PlanetListSerializer(Planet.objects.all(), many=True).data
         for node in data:
             node["is_favourite"] = False
-        output = json.loads(json.dumps({"results": data}))
+        output = json.loads(json.dumps({"results": data, "next": None}))
         self.assertEqual(response.json(), output)
 
     def test_get_planetlist_with_user_param(self):
@@ -45,7 +52,7 @@ class PlanetListApiTest(APITestCase):
         data = PlanetListSerializer(Planet.objects.all(), many=True).data
         for node in data:
             node["is_favourite"] = False
-        output = json.loads(json.dumps({"results": data}))
+        output = json.loads(json.dumps({"results": data, "next": None}))
         self.assertEqual(response.json(), output)
 
     def test_get_planetlist_with_name_param(self):
@@ -59,7 +66,7 @@ class PlanetListApiTest(APITestCase):
 
         data = PlanetListSerializer(Planet.objects.get(name=planet.name)).data
         data["is_favourite"] = False
-        output = json.loads(json.dumps({"results": [data]}))
+        output = json.loads(json.dumps({"results": [data], "next": None}))
         self.assertEqual(response.json(), output)
 
     def test_get_planetlist_with_user_param_and_favourite(self):
@@ -174,6 +181,227 @@ class PlanetListApiTest(APITestCase):
                 self.assertNotEqual(node["name"], planet_with_custom_name.name)
                 self.assertTrue(node["is_favourite"])
 
+    def test_get_planetlist_is_paginated_with_cursor(self):
+        """
+        Validate walking the `next` cursors returns every planet exactly once and in id order,
+        and favourites are overlaid on later pages as well
+        """
+        last_planet = PlanetFactory()
+        user_id = faker.pyint()
+        custom_name = faker.word()
+        FavouritePlanetFactory(
+            planet=last_planet, user_id=user_id, custom_name=custom_name
+        )
+
+        url = reverse("planet-list")
+        seen_ids = []
+        cursor = None
+        while True:
+            params = {"user_id": user_id, "limit": 1}
+            if cursor:
+                params["cursor"] = cursor
+            response = self.client.get(url, data=params, format="json")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.json()["results"]), 1)
+            node = response.json()["results"][0]
+            seen_ids.append(node["id"])
+            if node["id"] == last_planet.id:
+                self.assertEqual(node["name"], custom_name)
+                self.assertTrue(node["is_favourite"])
+            cursor = response.json()["next"]
+            if not cursor:
+                break
+
+        expected_ids = list(Planet.objects.order_by("id").values_list("id", flat=True))
+        self.assertEqual(seen_ids, expected_ids)
+
+    def test_get_planetlist_with_invalid_pagination_param(self):
+        """
+        Validate malformed cursor or limit returns validationerror
+        """
+        url = reverse("planet-list")
+        response = self.client.get(url, data={"cursor": "invalid"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(url, data={"limit": 0}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_planetlist_runs_one_query_per_page(self):
+        """
+        Validate the favourite overlay and search are resolved in the same query as the page,
+        user requests first check whether the user has any favourites
+        """
+        planet = PlanetFactory()
+        user_id = faker.pyint()
+        FavouritePlanetFactory(planet=planet, user_id=user_id, custom_name=faker.word())
+
+        url = reverse("planet-list")
+        with self.assertNumQueries(1):
+            response = self.client.get(url, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        for params in (
+            {"user_id": user_id},
+            {"user_id": user_id, "name": planet.name},
+            {"user_id": user_id, "limit": 1},
+            {"user_id": user_id + 1},
+        ):
+            with self.assertNumQueries(2):
+                response = self.client.get(url, data=params, format="json")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_planetlist_favourites_cache_follows_writes(self):
+        """
+        Validate cached favourites are dropped when a favourite is added or removed, once the
+        removal is committed, while the list reads the written favourite
+        """
+        planet = Planet.objects.first()
+        user_id = faker.pyint()
+        url = reverse("planet-list")
+        stats = planet_favourites.stats()
+
+        planet_favourites.get_map(user_id)
+        planet_favourites.get_map(user_id)
+        self.assertEqual(planet_favourites.stats()["misses"], stats["misses"] + 1)
+        self.assertEqual(planet_favourites.stats()["hits"], stats["hits"] + 1)
+
+        custom_name = faker.word()
+        self.client.post(
+            reverse("favourite-planet"),
+            data={"planet": planet.id, "user_id": user_id, "custom_name": custom_name},
+            format="json",
+        )
+        self.assertEqual(planet_favourites.get_map(user_id), {planet.id: custom_name})
+        response = self.client.get(url, data={"user_id": user_id}, format="json")
+        node = {node["id"]: node for node in response.json()["results"]}[planet.id]
+        self.assertEqual(node["name"], custom_name)
+        self.assertTrue(node["is_favourite"])
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            FavouritePlanet.objects.get(user_id=user_id).delete()
+        self.assertIn(planet.id, planet_favourites.get_map(user_id))
+        for callback in callbacks:
+            callback()
+        self.assertNotIn(planet.id, planet_favourites.get_map(user_id))
+        response = self.client.get(url, data={"user_id": user_id}, format="json")
+        node = {node["id"]: node for node in response.json()["results"]}[planet.id]
+        self.assertEqual(node["name"], planet.name)
+        self.assertFalse(node["is_favourite"])
+
+    def test_get_planetlist_streams_whole_list_as_ndjson(self):
+        """
+        Validate `stream=1` streams every planet unpaginated, one json row per line,
+        with the favourite overlay applied across chunks
+        """
+        planet = PlanetFactory()
+        user_id = faker.pyint()
+        custom_name = faker.word()
+        FavouritePlanetFactory(planet=planet, user_id=user_id, custom_name=custom_name)
+
+        url = reverse("planet-list")
+        with mock.patch("components.views.STREAM_CHUNK_SIZE", 2):
+            response = self.client.get(
+                url, data={"user_id": user_id, "stream": 1, "limit": 1}
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(response.streaming)
+            self.assertEqual(response["Content-Type"], "application/x-ndjson")
+            nodes = [
+                json.loads(line)
+                for line in b"".join(response.streaming_content).splitlines()
+            ]
+        self.assertEqual(
+            [node["id"] for node in nodes],
+            list(Planet.objects.order_by("id").values_list("id", flat=True)),
+        )
+        for node in nodes:
+            self.assertEqual(node["is_favourite"], node["id"] == planet.id)
+            if node["id"] == planet.id:
+                self.assertEqual(node["name"], custom_name)
+
+    def test_get_planetlist_includes_films_without_n_plus_one(self):
+        """
+        Validate include=films adds the movies of each planet with one query per page
+        """
+        planets = PlanetFactory.create_batch(3)
+        movie = MovieFactory()
+        movie.planets.set(planets[:2])
+        url = reverse("planet-list")
+
+        # user favourites load, page query and one query for the films of the page
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                url, data={"include": "films", "user_id": 10}, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        films = {node["id"]: node["films"] for node in response.json()["results"]}
+        expected = [{"id": movie.id, "title": movie.title, "url": movie.url}]
+        self.assertEqual(films[planets[0].id], expected)
+        self.assertEqual(films[planets[1].id], expected)
+        self.assertEqual(films[planets[2].id], [])
+
+    def test_get_planetlist_anonymous_is_served_from_catalogue_cache(self):
+        """
+        Validate anonymous unfiltered pages are cached per catalogue version and support If-None-Match
+        """
+        url = reverse("planet-list")
+        response = self.client.get(url, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+
+        with self.assertNumQueries(0):
+            cached_response = self.client.get(url, format="json")
+        self.assertEqual(cached_response.content, response.content)
+        self.assertEqual(cached_response["ETag"], etag)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # a catalogue write invalidates cached pages and their etag
+        catalogue_version.bump()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+
+class PlanetAutocompleteApiTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_autocomplete_matches_name_and_custom_name(self):
+        """
+        Validate planet names complete by word prefix, accent insensitive, and a user
+        sees its renamed favourites under their custom name
+        """
+        # other test classes leave planets behind, complete against these ones only
+        Planet.objects.all().delete()
+        hoth = PlanetFactory(name="Hôth")
+        tatooine = PlanetFactory(name="Tatooine")
+        FavouritePlanetFactory(planet=tatooine, user_id=1, custom_name="Home")
+        url = reverse("planet-autocomplete")
+
+        response = self.client.get(url, data={"name": "ho"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json(),
+            {"results": [{"id": hoth.id, "name": "Hôth", "is_favourite": False}]},
+        )
+        response = self.client.get(
+            url, data={"name": "ho", "user_id": 1}, format="json"
+        )
+        self.assertEqual(
+            response.json(),
+            {
+                "results": [
+                    {"id": tatooine.id, "name": "Home", "is_favourite": True},
+                    {"id": hoth.id, "name": "Hôth", "is_favourite": False},
+                ]
+            },
+        )
+        response = self.client.get(url, data={"name": "ho", "limit": "x"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
 
 class FavouritePlanetApiTest(APITestCase):
     @classmethod
@@ -243,3 +471,212 @@ class FavouritePlanetApiTest(APITestCase):
             format="json",
         )
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # ids beyond the integer columns are rejected before reaching the database
+        for data in (
+            {"planet": planet.id, "user_id": 2147483648},
+            {"planet": 2147483648, "user_id": user_id},
+        ):
+            with self.assertNumQueries(0):
+                response = self.client.post(url, data=data, format="json")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                response = self.client.delete(url, data=data, format="json")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_post_and_put_favourite_planet_upserts(self):
+        """
+        Validating re-adding a favourite planet replaces its custom_name with a single statement
+        """
+        planet = Planet.objects.first()
+        user_id = faker.pyint()
+        url = reverse("favourite-planet")
+        response = self.client.post(
+            url,
+            data={"planet": planet.id, "user_id": user_id, "custom_name": "old"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        favourite_id = response.json()["data"]["id"]
+
+        for method, custom_name in (
+            (self.client.post, "new"),
+            (self.client.put, "newer"),
+        ):
+            # the favourite upsert and the refresh of the user catalogue entries
+            with self.assertNumQueries(2):
+                response = method(
+                    url,
+                    data={
+                        "planet": planet.id,
+                        "user_id": user_id,
+                        "custom_name": custom_name,
+                    },
+                    format="json",
+                )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                response.json(),
+                {
+                    "data": {
+                        "id": favourite_id,
+                        "user_id": user_id,
+                        "planet": planet.id,
+                        "custom_name": custom_name,
+                    }
+                },
+            )
+        favourite = FavouritePlanet.objects.get(user_id=user_id)
+        self.assertEqual(favourite.custom_name, "newer")
+
+    def test_delete_favourite_planet(self):
+        """
+        Validating Api call to remove planet from user favourite
+        """
+        planet = Planet.objects.first()
+        user_id = faker.pyint()
+        FavouritePlanetFactory(planet=planet, user_id=user_id)
+        url = reverse("favourite-planet")
+
+        with self.assertNumQueries(2):
+            response = self.client.delete(
+                url, data={"planet": planet.id, "user_id": user_id}, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(FavouritePlanet.objects.filter(user_id=user_id).exists())
+
+        response = self.client.delete(
+            url, data={"planet": planet.id, "user_id": user_id}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class BulkFavouritePlanetApiTest(APITestCase):
+    def test_post_bulk_favourite_planets(self):
+        """
+        Validating bulk favourite Api adds and updates favourites with one lookup, one write and
+        one refresh of the user catalogue entries, and reports invalid items in their own result
+        """
+        new_planet, favourite_planet = PlanetFactory.create_batch(2)
+        user_id = faker.pyint()
+        FavouritePlanetFactory(
+            planet=favourite_planet, user_id=user_id, custom_name="old"
+        )
+        missing_id = Planet.objects.order_by("-id").first().id + 1
+
+        url = reverse("favourite-planet-bulk")
+        with self.assertNumQueries(3):
+            response = self.client.post(
+                url,
+                data={
+                    "user_id": user_id,
+                    "items": [
+                        {"planet": new_planet.id},
+                        {"planet": favourite_planet.id, "custom_name": "new"},
+                        {"planet": missing_id, "custom_name": "missing"},
+                        {"custom_name": "malformed"},
+                    ],
+                },
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.json()["data"]["results"]
+        self.assertEqual(
+            [result["status"] for result in results],
+            ["saved", "saved", "invalid", "invalid"],
+        )
+        self.assertIn("planet", results[2]["errors"])
+        self.assertIn("planet", results[3]["errors"])
+        self.assertEqual(
+            dict(
+                FavouritePlanet.objects.filter(user_id=user_id).values_list(
+                    "planet_id", "custom_name"
+                )
+            ),
+            {new_planet.id: None, favourite_planet.id: "new"},
+        )
+
+    def test_post_bulk_favourite_planets_with_incorrect_param(self):
+        """
+        Validating bulk favourite Api returns validationerror when user_id or items are malformed
+        """
+        url = reverse("favourite-planet-bulk")
+        response = self.client.post(
+            url, data={"user_id": faker.word(), "items": [{"planet": 1}]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            url, data={"user_id": faker.pyint(), "items": []}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            url, data={"user_id": 2147483648, "items": [{"planet": 1}]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            url,
+            data={"user_id": faker.pyint(), "items": [{"planet": 2147483648}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        result = response.json()["data"]["results"][0]
+        self.assertEqual(result["status"], "invalid")
+        self.assertIn("planet", result["errors"])
+
+
+class AsyncPlanetApiTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.planets = PlanetFactory.create_batch(3)
+        cls.user_id = faker.pyint()
+        FavouritePlanetFactory(
+            planet=cls.planets[0], user_id=cls.user_id, custom_name="favourite"
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    async def test_async_planetlist_matches_sync_planetlist(self):
+        """
+        Validate the async planet list returns the same pages as the sync one
+        """
+        for params in [
+            {},
+            {"user_id": self.user_id},
+            {"user_id": self.user_id, "name": "favourite"},
+            {"limit": 1},
+        ]:
+            expected = await sync_to_async(self.client.get)(
+                reverse("planet-list"), data=params
+            )
+            response = await self.async_client.get(
+                reverse("async-planet-list"), data=params
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json(), expected.json())
+
+    async def test_async_favourite_planet_upsert_and_delete(self):
+        """
+        Validate async favourite writes upsert, delete and keep the favourites cache in sync
+        """
+        planet = self.planets[1]
+        url = reverse("async-favourite-planet")
+        response = await self.async_client.put(
+            url,
+            data={"planet": planet.id, "user_id": self.user_id, "custom_name": "home"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            (await planet_favourites.aget_map(self.user_id))[planet.id], "home"
+        )
+
+        response = await self.async_client.delete(
+            url,
+            data={"planet": planet.id, "user_id": self.user_id},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertNotIn(planet.id, await planet_favourites.aget_map(self.user_id))
@@ -0,0 +1,259 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from components.factories import FavouriteMovieFactory, MovieFactory, PlanetFactory
+from components.models import (
+    FavouriteMovie,
+    Movie,
+    MovieCatalogueEntry,
+    PendingLink,
+    Planet,
+)
+
+
+def film_record(index, title, edited="2014-12-20T19:49:45.256000Z", planets=()):
+    return {
+        "title": title,
+        "release_date": "1977-05-25",
+        "created": "2014-12-10T14:23:31.880000Z",
+        "edited": edited,
+        "url": f"https://swapi.dev/api/films/{index}/",
+        "planets": [f"https://swapi.dev/api/planets/{planet}/" for planet in planets],
+    }
+
+
+def planet_record(index, name, edited="2014-12-20T20:58:18.411000Z", films=()):
+    return {
+        "name": name,
+        "created": "2014-12-09T13:50:49.641000Z",
+        "edited": edited,
+        "url": f"https://swapi.dev/api/planets/{index}/",
+        "films": [f"https://swapi.dev/api/films/{film}/" for film in films],
+    }
+
+
+def links():
+    return sorted(
+        Movie.planets.through.objects.values_list("movie__url", "planet__url")
+    )
+
+
+def prepopulate(records, *args):
+    # upstream serves pages of two records
+    pages = [
+        (resource, nodes[start : start + 2])
+        for resource, nodes in records.items()
+        for start in range(0, len(nodes), 2)
+    ]
+    with mock.patch(
+        "components.management.commands.prepopulate_data.fetch_all_resources",
+        return_value=iter(pages),
+    ):
+        call_command("prepopulate_data", *args, stdout=StringIO())
+
+
+class PrepopulateDataTest(TestCase):
+    def test_prepopulate_reloads_catalogue(self):
+        """
+        Validate a full run replaces the catalogue with upstream records
+        """
+        MovieFactory()
+        prepopulate(
+            {
+                "films": [film_record(1, "A New Hope")],
+                "planets": [planet_record(1, "Tatooine"), planet_record(2, "Alderaan")],
+            }
+        )
+        self.assertEqual(
+            list(Movie.objects.values_list("title", flat=True)), ["A New Hope"]
+        )
+        self.assertEqual(Planet.objects.count(), 2)
+
+    def test_prepopulate_reloads_catalogue_with_favourites(self):
+        """
+        Validate a full reload drops favourited records along with their favourites
+        and catalogue entries
+        """
+        FavouriteMovieFactory(movie=MovieFactory(), user_id=10, custom_title="toto")
+        prepopulate({"films": [film_record(1, "A New Hope")], "planets": []})
+        self.assertEqual(
+            list(Movie.objects.values_list("title", flat=True)), ["A New Hope"]
+        )
+        self.assertFalse(FavouriteMovie.objects.exists())
+        self.assertFalse(MovieCatalogueEntry.objects.exists())
+
+    def test_prepopulate_records_without_edited_date(self):
+        """
+        Validate records missing their edited date load with their created date as
+        last update
+        """
+        film = film_record(1, "A New Hope")
+        planet = planet_record(1, "Tatooine")
+        del film["edited"], planet["edited"]
+        prepopulate({"films": [film], "planets": [planet]})
+        movie = Movie.objects.get()
+        self.assertEqual(movie.updated, movie.created)
+        planet = Planet.objects.get()
+        self.assertEqual(planet.updated, planet.created)
+
+    def test_prepopulate_writes_in_batches(self):
+        """
+        Validate records are written in batch size chunks as pages stream in
+        """
+        films = [film_record(index, f"Film {index}") for index in range(1, 8)]
+        with mock.patch.object(
+            Movie.objects, "bulk_create", wraps=Movie.objects.bulk_create
+        ) as bulk_create:
+            prepopulate({"films": films, "planets": []}, "--batch-size", "3")
+        self.assertEqual(
+            [len(call.args[0]) for call in bulk_create.call_args_list], [3, 3, 1]
+        )
+        self.assertEqual(Movie.objects.count(), 7)
+
+    def test_prepopulate_incremental_upserts_changed_records(self):
+        """
+        Validate incremental sync updates edited records, adds new ones, skips unchanged ones
+        and keeps user favourites and their catalogue entries in sync
+        """
+        prepopulate(
+            {
+                "films": [film_record(1, "A New Hope"), film_record(2, "Empire")],
+                "planets": [planet_record(1, "Tatooine")],
+            }
+        )
+        edited_movie = Movie.objects.get(url="https://swapi.dev/api/films/2/")
+        FavouriteMovieFactory(movie=edited_movie, user_id=10, custom_title="toto")
+
+        prepopulate(
+            {
+                "films": [
+                    # same edited timestamp, local change must not be overwritten
+                    film_record(1, "Unchanged upstream"),
+                    film_record(2, "The Empire Strikes Back", "2015-01-01T00:00:00Z"),
+                    film_record(3, "Return of the Jedi"),
+                ],
+                "planets": [planet_record(1, "Tatooine")],
+            },
+            "--incremental",
+        )
+        self.assertEqual(
+            list(Movie.objects.order_by("url").values_list("title", flat=True)),
+            ["A New Hope", "The Empire Strikes Back", "Return of the Jedi"],
+        )
+        self.assertEqual(Movie.objects.get(url=edited_movie.url).id, edited_movie.id)
+        self.assertTrue(
+            FavouriteMovie.objects.filter(movie=edited_movie, user_id=10).exists()
+        )
+        self.assertEqual(
+            list(
+                MovieCatalogueEntry.objects.filter(user_id=10)
+                .order_by("movie__url")
+                .values_list("display_name", "search_name")
+            ),
+            [("toto", "The Empire Strikes Back\ntoto")],
+        )
+        self.assertEqual(Planet.objects.count(), 1)
+
+    def test_prepopulate_links_films_and_planets(self):
+        """
+        Validate film and planet cross references are written as their batches flush,
+        resolved by url from either side once both are stored, links to missing records
+        are dropped and an incremental sync drops removed links
+        """
+        through = Movie.planets.through
+        with mock.patch.object(
+            through.objects, "bulk_create", wraps=through.objects.bulk_create
+        ) as bulk_create:
+            prepopulate(
+                {
+                    "films": [
+                        film_record(1, "A New Hope", planets=[1, 2]),
+                        film_record(2, "Empire", planets=[3]),
+                    ],
+                    "planets": [
+                        planet_record(1, "Tatooine", films=[1]),
+                        planet_record(2, "Alderaan", films=[1]),
+                        planet_record(3, "Hoth", films=[1, 2, 9]),
+                    ],
+                }
+            )
+        self.assertEqual(bulk_create.call_count, 1)
+        self.assertFalse(PendingLink.objects.exists())
+        film, planet = (
+            "https://swapi.dev/api/films/{}/",
+            "https://swapi.dev/api/planets/{}/",
+        )
+        self.assertEqual(
+            links(),
+            [
+                (film.format(1), planet.format(1)),
+                (film.format(1), planet.format(2)),
+                (film.format(1), planet.format(3)),
+                (film.format(2), planet.format(3)),
+            ],
+        )
+
+        prepopulate(
+            {
+                "films": [
+                    film_record(1, "A New Hope", planets=[1]),
+                    film_record(2, "Empire", planets=[3]),
+                ],
+                "planets": [
+                    planet_record(1, "Tatooine", films=[1]),
+                    planet_record(2, "Alderaan"),
+                    planet_record(3, "Hoth", films=[2]),
+                ],
+            },
+            "--incremental",
+        )
+        self.assertEqual(
+            links(),
+            [(film.format(1), planet.format(1)), (film.format(2), planet.format(3))],
+        )
+
+
+class CatalogueSnapshotTest(TestCase):
+    def test_export_and_import_snapshot(self):
+        """
+        Validate a catalogue exported to a compressed snapshot seeds an empty database identically
+        """
+        MovieFactory.create_batch(3)
+        PlanetFactory.create_batch(5)
+        Movie.objects.first().planets.set(Planet.objects.all()[:2])
+        fields = ["title", "release_date", "created", "updated", "url"]
+        movie_planets = links()
+        movies = list(Movie.objects.order_by("url").values(*fields))
+        planets = list(
+            Planet.objects.order_by("url").values("name", "created", "updated", "url")
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "catalogue.jsonl.gz")
+            call_command("export_catalogue", path, stdout=StringIO())
+            Movie.objects.all().delete()
+            Planet.objects.all().delete()
+            call_command(
+                "prepopulate_data",
+                "--from-file",
+                path,
+                "--batch-size",
+                "2",
+                stdout=StringIO(),
+            )
+
+        self.assertEqual(list(Movie.objects.order_by("url").values(*fields)), movies)
+        self.assertEqual(
+            list(
+                Planet.objects.order_by("url").values(
+                    "name", "created", "updated", "url"
+                )
+            ),
+            planets,
+        )
+        self.assertEqual(links(), movie_planets)
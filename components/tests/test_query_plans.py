@@ -0,0 +1,131 @@
+import re
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from components.factories import (
+    FavouriteMovieFactory,
+    FavouritePlanetFactory,
+    MovieFactory,
+    PlanetFactory,
+)
+from components.pagination import encode_cursor
+
+# the first page of an unfiltered list walks a catalogue table in primary key order
+# up to the page limit, every other page seeks to its cursor
+PAGING_SCAN = re.compile(r"^SCAN (components_movie|components_planet)$")
+# searches read the search index, a virtual table scanned through its own index
+SEARCH_INDEX = re.compile(r"^SCAN components_(movie|planet)_fts VIRTUAL TABLE INDEX")
+
+
+@skipUnless(connection.vendor == "sqlite", "query plans are asserted for sqlite")
+class ListQueryPlanTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.movies = MovieFactory.create_batch(5)
+        cls.planets = PlanetFactory.create_batch(5)
+        FavouriteMovieFactory(movie=cls.movies[0], user_id=1, custom_title="toto")
+        FavouritePlanetFactory(planet=cls.planets[0], user_id=1, custom_name="toto")
+
+    def setUp(self):
+        cache.clear()
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            return [row[-1] for row in cursor.fetchall()]
+
+    def plans(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url, data=params, format="json")
+        selects = [q["sql"] for q in queries if q["sql"].startswith("SELECT")]
+        self.assertTrue(selects)
+        return [(sql, self.explain(sql)) for sql in selects]
+
+    def assertPagingPlans(self, url, params):
+        for sql, steps in self.plans(url, params):
+            for step in steps:
+                if step.startswith("SCAN"):
+                    self.assertTrue(
+                        PAGING_SCAN.match(step) and "cursor" not in params,
+                        f"full scan `{step}` in {sql}",
+                    )
+                self.assertNotIn("TEMP B-TREE", step, f"sort `{step}` in {sql}")
+
+    def assertSearchPlans(self, url, params):
+        plans = self.plans(url, params)
+        for sql, steps in plans:
+            for step in steps:
+                if step.startswith("SCAN"):
+                    self.assertRegex(step, SEARCH_INDEX, f"full scan in {sql}")
+        self.assertTrue(
+            any(SEARCH_INDEX.match(step) for _, steps in plans for step in steps),
+            f"search index unused in {plans}",
+        )
+
+    def test_list_queries_use_indexes(self):
+        """
+        Validate list pages only scan a catalogue table in primary key order for the
+        first unfiltered page, never scan the favourite or catalogue entry tables,
+        and read rows in index order instead of sorting them
+        """
+        for url_name, objects in (
+            ("movie-list", self.movies),
+            ("planet-list", self.planets),
+        ):
+            url = reverse(url_name)
+            for params in (
+                {},
+                {"cursor": encode_cursor(objects[1].id)},
+                {"user_id": 1},
+                {"user_id": 1, "cursor": encode_cursor(objects[1].id)},
+            ):
+                with self.subTest(url=url_name, params=params):
+                    cache.clear()
+                    self.assertPagingPlans(url, params)
+
+    def test_search_queries_use_search_index(self):
+        """
+        Validate searches, with or without user, read matches through the search index
+        and the user entries index without scanning any table. Only matching rows
+        are sorted
+        """
+        for url_name, search_param in (
+            ("movie-list", "title"),
+            ("planet-list", "name"),
+        ):
+            url = reverse(url_name)
+            for params in (
+                {search_param: "toto"},
+                {"user_id": 1, search_param: "toto"},
+                {"user_id": 2, search_param: "toto"},
+            ):
+                with self.subTest(url=url_name, params=params):
+                    cache.clear()
+                    self.assertSearchPlans(url, params)
+
+    def test_favourites_check_seeks_entry_index(self):
+        """
+        Validate the check for a user having favourites seeks the (user_id, object)
+        unique index of the catalogue entries
+        """
+        for url_name, table in (
+            ("movie-list", "moviecatalogueentry"),
+            ("planet-list", "planetcatalogueentry"),
+        ):
+            with self.subTest(url=url_name):
+                steps = [
+                    step
+                    for sql, steps in self.plans(reverse(url_name), {"user_id": 1})
+                    if f'FROM "components_{table}"' in sql
+                    for step in steps
+                ]
+                self.assertEqual(len(steps), 1)
+                self.assertRegex(
+                    steps[0],
+                    rf"^SEARCH components_{table} USING COVERING INDEX \S+ \(user_id=\?\)$",
+                )
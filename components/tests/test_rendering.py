@@ -0,0 +1,59 @@
+import datetime
+import json
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from components.factories import (
+    FavouriteMovieFactory,
+    FavouritePlanetFactory,
+    MovieFactory,
+    PlanetFactory,
+)
+from components.queries import movie_queryset, planet_queryset
+from components import rendering
+from components.rendering import dumps, movie_rows, planet_rows
+from components.serializers import MovieListItemSerializer, PlanetListItemSerializer
+
+
+class RowRendererTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.movies = [
+            MovieFactory(title="Ørsted's Return"),
+            MovieFactory(
+                created=datetime.datetime(2014, 12, 10, 14, 23, 31, tzinfo=timezone.utc)
+            ),
+            MovieFactory(),
+        ]
+        FavouriteMovieFactory(movie=cls.movies[1], user_id=1, custom_title="“quoted”")
+        cls.planets = PlanetFactory.create_batch(2)
+        FavouritePlanetFactory(planet=cls.planets[0], user_id=1)
+
+    def assertRendersLikeSerializer(self, queryset, row_renderer, serializer_class):
+        expected = JSONRenderer().render(
+            serializer_class(queryset.order_by("id"), many=True).data
+        )
+        data = row_renderer.to_data(row_renderer.rows(queryset).order_by("id"))
+        self.assertEqual(json.loads(dumps(data)), json.loads(expected))
+
+    def test_rows_render_like_the_list_serializers(self):
+        """
+        Validate the values_list fast path renders the same json as the list serializers,
+        with and without orjson installed
+        """
+        favourites = {self.movies[1].id: "“quoted”"}
+        for orjson in [rendering.orjson, None]:
+            with mock.patch("components.rendering.orjson", orjson):
+                self.assertRendersLikeSerializer(
+                    movie_queryset(1, favourites, None),
+                    movie_rows,
+                    MovieListItemSerializer,
+                )
+                self.assertRendersLikeSerializer(
+                    planet_queryset(1, {self.planets[0].id: None}, None),
+                    planet_rows,
+                    PlanetListItemSerializer,
+                )
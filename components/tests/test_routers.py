@@ -0,0 +1,95 @@
+from contextlib import nullcontext
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from components.factories import MovieFactory
+from components.models import FavouriteMovie, Movie
+from components.caching import primary_pins
+from components.routers import (
+    ReplicaRouter,
+    next_replica,
+    read_alias_for,
+    reading_from,
+)
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1", "replica_2"])
+class ReplicaRouterTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_router_routes_reads_inside_reading_from(self):
+        """
+        Validate only reads issued inside reading_from go to the replica, writes stay on primary
+        """
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Movie))
+        with reading_from("replica_1"):
+            self.assertEqual(router.db_for_read(Movie), "replica_1")
+            self.assertEqual(router.db_for_write(FavouriteMovie), "default")
+        self.assertIsNone(router.db_for_read(Movie))
+
+    def test_router_never_migrates_replicas(self):
+        """
+        Validate migrations are refused on replicas and left to the default on the primary
+        """
+        router = ReplicaRouter()
+        self.assertFalse(router.allow_migrate("replica_1", "components"))
+        self.assertIsNone(router.allow_migrate("default", "components"))
+
+    def test_replicas_are_picked_round_robin(self):
+        """
+        Validate consecutive requests alternate between the replicas
+        """
+        picked = [next_replica() for _ in range(4)]
+        self.assertEqual(sorted(picked), ["replica_1"] * 2 + ["replica_2"] * 2)
+        self.assertNotEqual(picked[0], picked[1])
+
+    def test_list_reads_stay_on_primary_after_a_favourite_write(self):
+        """
+        Validate list requests read from replicas, except for a user who just wrote a favourite
+        """
+        movie = MovieFactory()
+        aliases = []
+
+        def record(alias):
+            aliases.append(alias)
+            return nullcontext()
+
+        url = reverse("movie-list")
+        with mock.patch("components.views.reading_from", side_effect=record):
+            self.client.get(url, data={"user_id": 1}, format="json")
+            response = self.client.post(
+                reverse("favourite-movie"),
+                data={"movie": movie.id, "user_id": 1},
+                format="json",
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.client.get(url, data={"user_id": 1}, format="json")
+            self.client.get(url, data={"user_id": 2}, format="json")
+            self.client.get(url, format="json")
+
+        self.assertIn(aliases[0], ["replica_1", "replica_2"])
+        self.assertIsNone(aliases[1])
+        self.assertIn(aliases[2], ["replica_1", "replica_2"])
+        self.assertIn(aliases[3], ["replica_1", "replica_2"])
+
+        # the pin expires with its cache entry
+        cache.clear()
+        with mock.patch("components.views.reading_from", side_effect=record):
+            self.client.get(url, data={"user_id": 1}, format="json")
+        self.assertIn(aliases[4], ["replica_1", "replica_2"])
+
+    def test_user_zero_is_pinned_after_a_write(self):
+        """
+        Validate user 0 is pinned to the primary like any other user
+        """
+        self.assertIsNotNone(read_alias_for(0))
+        primary_pins.pin(0)
+        self.assertIsNone(read_alias_for(0))
+        self.assertIsNotNone(read_alias_for(None))
@@ -0,0 +1,224 @@
+import asyncio
+import threading
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from components.caching import CataloguePayloadCache
+from components.metrics import registry
+from components.singleflight import RESULT_TIMEOUT, SingleFlight
+
+# the test cache is process-local, other processes are simulated on it as if shared
+shared_cache = mock.patch.object(SingleFlight, "shared", True)
+
+
+class SingleFlightTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.flights = SingleFlight("test")
+        self.calls = []
+        self.release = threading.Event()
+
+    def compute(self):
+        self.calls.append(threading.get_ident())
+        self.release.wait(5)
+        return b"page"
+
+    def run_concurrently(self, count, compute):
+        arrived = []
+        results = []
+
+        def joined():
+            # followers check for a stale value before waiting for the leader
+            arrived.append(1)
+            return None
+
+        def call():
+            try:
+                results.append(self.flights.do("key", compute, joined))
+            except ValueError as error:
+                results.append(error)
+
+        threads = [threading.Thread(target=call) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        while len(arrived) < count - 1:
+            threading.Event().wait(0.01)
+        self.release.set()
+        for thread in threads:
+            thread.join(5)
+        return results
+
+    def test_concurrent_callers_compute_once(self):
+        """
+        Validate threads asking for the same key share one computation
+        """
+        results = self.run_concurrently(8, self.compute)
+
+        self.assertEqual(results, [b"page"] * 8)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(
+            self.flights.stats(),
+            {"leader": 1, "coalesced": 7, "stale": 0, "fallback": 0},
+        )
+
+    def test_failed_leader_lets_waiters_compute(self):
+        """
+        Validate waiters compute the value themselves when the leader fails
+        """
+
+        def compute():
+            if not self.calls:
+                self.calls.append("failed")
+                self.release.wait(5)
+                raise ValueError("database is locked")
+            return b"page"
+
+        results = self.run_concurrently(3, compute)
+
+        self.assertEqual(sum(isinstance(result, ValueError) for result in results), 1)
+        self.assertEqual(results.count(b"page"), 2)
+        self.assertEqual(self.flights.stats()["fallback"], 2)
+
+    @shared_cache
+    def test_waits_for_result_of_other_process(self):
+        """
+        Validate a key locked by another process is read from its published result
+        """
+        lock_key = self.flights.lock_key("key")
+        cache.add(lock_key, "other", 10)
+
+        def other_process():
+            cache.set(f"{lock_key}:other", b"remote page", 10)
+            cache.delete(lock_key)
+
+        timer = threading.Timer(0.1, other_process)
+        timer.start()
+        value = self.flights.do("key", self.compute)
+        timer.join()
+
+        self.assertEqual(value, b"remote page")
+        self.assertEqual(self.calls, [])
+        self.assertEqual(self.flights.stats()["coalesced"], 1)
+
+    @shared_cache
+    @override_settings(SINGLE_FLIGHT_TIMEOUT=0.1)
+    def test_computes_when_other_process_times_out(self):
+        """
+        Validate a lock held past SINGLE_FLIGHT_TIMEOUT does not block the caller
+        """
+        cache.add(self.flights.lock_key("key"), "other", 10)
+        self.release.set()
+
+        self.assertEqual(self.flights.do("key", self.compute), b"page")
+        self.assertEqual(self.flights.stats()["fallback"], 1)
+
+    def test_process_local_cache_takes_no_lock(self):
+        """
+        Validate no lock or result is written to a cache private to the process
+        """
+        self.release.set()
+        with mock.patch.object(cache, "add") as add, mock.patch.object(
+            cache, "set"
+        ) as set_:
+            self.assertEqual(self.flights.do("key", self.compute), b"page")
+        add.assert_not_called()
+        set_.assert_not_called()
+
+    @shared_cache
+    def test_result_published_only_for_waiting_processes(self):
+        """
+        Validate a leader publishes its result, with a short timeout, only when
+        another process registered as waiting for it
+        """
+        self.release.set()
+        lock_key = self.flights.lock_key("key")
+        with mock.patch.object(cache, "set", wraps=cache.set) as set_:
+            self.flights.do("key", self.compute)
+        set_.assert_not_called()
+        self.assertIsNone(cache.get(lock_key))
+
+        def waited_compute():
+            token = cache.get(lock_key)
+            cache.set(self.flights.waiting_key(lock_key, token), True)
+            self.calls.append(token)
+            return b"page"
+
+        with mock.patch.object(cache, "set", wraps=cache.set) as set_:
+            self.flights.do("key", waited_compute)
+        result_key = self.flights.result_key(lock_key, self.calls[-1])
+        set_.assert_called_with(result_key, b"page", RESULT_TIMEOUT)
+        self.assertEqual(cache.get(result_key), b"page")
+        self.assertIsNone(cache.get(lock_key))
+
+    def test_async_callers_compute_once(self):
+        """
+        Validate coroutines asking for the same key share one computation
+        """
+
+        async def compute():
+            self.calls.append(1)
+            await asyncio.sleep(0.05)
+            return b"page"
+
+        async def main():
+            return await asyncio.gather(
+                *(self.flights.ado("key", compute) for _ in range(5))
+            )
+
+        self.assertEqual(asyncio.run(main()), [b"page"] * 5)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(self.flights.stats()["coalesced"], 4)
+
+
+class CataloguePayloadCacheTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.payloads = CataloguePayloadCache()
+
+    @override_settings(CATALOGUE_STALE_WHILE_REVALIDATE=True)
+    @shared_cache
+    def test_stale_page_served_while_rebuilt(self):
+        """
+        Validate the previous version's page is served while another worker
+        builds the page of the new version
+        """
+        self.payloads.get_or_build("v1", "movie", 10, None, lambda: b"old")
+        key = self.payloads.key("v2", "movie", 10, None)
+        cache.add(self.payloads.flights.lock_key(key), "other", 10)
+
+        served = self.payloads.get_or_build("v2", "movie", 10, None, lambda: b"new")
+
+        self.assertEqual(served, ("v1", b"old"))
+        self.assertEqual(self.payloads.flights.stats()["stale"], 1)
+
+    @shared_cache
+    def test_waits_for_page_without_stale_while_revalidate(self):
+        """
+        Validate a page being built elsewhere is waited for by default
+        """
+        self.payloads.get_or_build("v1", "movie", 10, None, lambda: b"old")
+        key = self.payloads.key("v2", "movie", 10, None)
+        lock_key = self.payloads.flights.lock_key(key)
+        cache.add(lock_key, "other", 10)
+
+        def other_process():
+            cache.set(f"{lock_key}:other", ("v2", b"new"), 10)
+            cache.delete(lock_key)
+
+        timer = threading.Timer(0.1, other_process)
+        timer.start()
+        served = self.payloads.get_or_build("v2", "movie", 10, None, lambda: b"x")
+        timer.join()
+
+        self.assertEqual(served, ("v2", b"new"))
+
+    def test_flights_are_exported_as_metrics(self):
+        """
+        Validate coalescing counters are rendered on /metrics
+        """
+        self.assertIn(
+            'components_singleflight_requests_total{flight="catalogue_pages",result="leader"}',
+            registry.render(),
+        )
@@ -0,0 +1,175 @@
+import json
+import threading
+import time
+from itertools import chain
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from django.test import SimpleTestCase
+
+from components.exceptions import ExternalApiFailedException
+from components.utils import build_session, fetch_all_records, fetch_all_resources
+
+
+class StubSwapiServer:
+    """
+    Local stand-in for swapi serving paginated resources, optionally failing the
+    first requests of a page and recording how many requests ran concurrently
+    """
+
+    def __init__(self, resources, page_size=10, failures=0, delay=0):
+        self.resources = resources
+        self.page_size = page_size
+        self.failures = failures
+        self.delay = delay
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.handler())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def url(self, resource):
+        return f"http://127.0.0.1:{self.server.server_port}/api/{resource}/"
+
+    def handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with stub.lock:
+                    stub.requests.append(self.path)
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                    failing = stub.requests.count(self.path) <= stub.failures
+                time.sleep(stub.delay)
+                try:
+                    if failing:
+                        self.send_response(503)
+                        self.end_headers()
+                    else:
+                        self.send_json(stub.page(self.path))
+                finally:
+                    with stub.lock:
+                        stub.in_flight -= 1
+
+            def send_json(self, data):
+                body = json.dumps(data).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def page(self, path):
+        parts = urlsplit(path)
+        resource = parts.path.strip("/").split("/")[-1]
+        page = int(parse_qs(parts.query).get("page", ["1"])[0])
+        records = self.resources[resource]
+        start = (page - 1) * self.page_size
+        has_next = start + self.page_size < len(records)
+        return {
+            "count": len(records),
+            "next": f"{self.url(resource)}?page={page + 1}" if has_next else None,
+            "results": records[start : start + self.page_size],
+        }
+
+
+def make_records(count):
+    return [{"name": f"record {index}"} for index in range(count)]
+
+
+class FetchAllRecordsTest(SimpleTestCase):
+    def test_fetch_all_records_fetches_every_page_in_order(self):
+        """
+        Validate all pages are fetched, in parallel, and records keep the upstream order
+        """
+        records = make_records(45)
+        with StubSwapiServer({"planets": records}, delay=0.05) as stub:
+            fetched = list(
+                chain.from_iterable(
+                    fetch_all_records(stub.url("planets"), concurrency=4)
+                )
+            )
+        self.assertEqual(fetched, records)
+        self.assertEqual(len(stub.requests), 5)
+        self.assertGreater(stub.max_in_flight, 1)
+        self.assertLessEqual(stub.max_in_flight, 4)
+
+    def test_fetch_all_records_resumes_from_start_page(self):
+        """
+        Validate pages before start_page are skipped, only the first one is fetched for the count
+        """
+        records = make_records(45)
+        with StubSwapiServer({"planets": records}) as stub:
+            fetched = list(
+                chain.from_iterable(
+                    fetch_all_records(stub.url("planets"), start_page=3)
+                )
+            )
+        self.assertEqual(fetched, records[20:])
+        self.assertEqual(len(stub.requests), 4)
+
+    def test_fetch_all_records_prefetches_a_bounded_number_of_pages(self):
+        """
+        Validate pages are fetched as they are consumed, not all at once
+        """
+        with StubSwapiServer({"planets": make_records(200)}) as stub:
+            pages = fetch_all_records(stub.url("planets"), concurrency=2)
+            next(pages)
+            next(pages)
+            time.sleep(0.2)
+            self.assertLessEqual(len(stub.requests), 4)
+            self.assertEqual(len(list(pages)), 18)
+        self.assertEqual(len(stub.requests), 20)
+
+    def test_fetch_all_records_retries_failed_pages(self):
+        """
+        Validate pages failing with a retryable status are retried
+        """
+        records = make_records(25)
+        with StubSwapiServer({"planets": records}, failures=2) as stub:
+            session = build_session(retries=3, backoff_factor=0)
+            fetched = list(
+                chain.from_iterable(
+                    fetch_all_records(stub.url("planets"), session=session)
+                )
+            )
+        self.assertEqual(fetched, records)
+        self.assertEqual(len(stub.requests), 9)
+
+    def test_fetch_all_records_raises_when_retries_exhausted(self):
+        """
+        Validate an api still failing after the retries raises ExternalApiFailedException
+        """
+        with StubSwapiServer({"planets": make_records(5)}, failures=5) as stub:
+            session = build_session(retries=2, backoff_factor=0)
+            with self.assertRaises(ExternalApiFailedException):
+                list(fetch_all_records(stub.url("planets"), session=session))
+
+    def test_fetch_all_resources_fetches_resources_concurrently(self):
+        """
+        Validate several resources are fetched at once and returned by name
+        """
+        films, planets = make_records(6), make_records(60)
+        with StubSwapiServer({"films": films, "planets": planets}, delay=0.05) as stub:
+            fetched = {"films": [], "planets": []}
+            for name, page in fetch_all_resources(
+                {"films": stub.url("films"), "planets": stub.url("planets")}
+            ):
+                fetched[name].extend(page)
+        self.assertEqual(fetched, {"films": films, "planets": planets})
+        self.assertGreater(stub.max_in_flight, 1)
@@ -1,10 +1,22 @@
 from django.urls import include, path
 from rest_framework import routers
+from .async_views import (
+    AsyncMovieListView,
+    AsyncPlanetListView,
+    AsyncFavouriteMovieView,
+    AsyncFavouritePlanetView,
+    AsyncBulkFavouriteMovieView,
+    AsyncBulkFavouritePlanetView,
+)
 from .views import (
     MovieListView,
     PlanetListView,
+    MovieAutocompleteView,
+    PlanetAutocompleteView,
     FavouriteMovieView,
     FavouritePlanetView,
+    BulkFavouriteMovieView,
+    BulkFavouritePlanetView,
 )
 
 
@@ -13,6 +25,48 @@ from .views import (
 urlpatterns = [
     path("planets/", PlanetListView.as_view(), name="planet-list"),
     path("movies/", MovieListView.as_view(), name="movie-list"),
+    path(
+        "planets/autocomplete/",
+        PlanetAutocompleteView.as_view(),
+        name="planet-autocomplete",
+    ),
+    path(
+        "movies/autocomplete/",
+        MovieAutocompleteView.as_view(),
+        name="movie-autocomplete",
+    ),
     path("favourite/movie/", FavouriteMovieView.as_view(), name="favourite-movie"),
     path("favourite/planet/", FavouritePlanetView.as_view(), name="favourite-planet"),
+    path(
+        "favourite/movie/bulk/",
+        BulkFavouriteMovieView.as_view(),
+        name="favourite-movie-bulk",
+    ),
+    path(
+        "favourite/planet/bulk/",
+        BulkFavouritePlanetView.as_view(),
+        name="favourite-planet-bulk",
+    ),
+    path("async/planets/", AsyncPlanetListView.as_view(), name="async-planet-list"),
+    path("async/movies/", AsyncMovieListView.as_view(), name="async-movie-list"),
+    path(
+        "async/favourite/movie/",
+        AsyncFavouriteMovieView.as_view(),
+        name="async-favourite-movie",
+    ),
+    path(
+        "async/favourite/planet/",
+        AsyncFavouritePlanetView.as_view(),
+        name="async-favourite-planet",
+    ),
+    path(
+        "async/favourite/movie/bulk/",
+        AsyncBulkFavouriteMovieView.as_view(),
+        name="async-favourite-movie-bulk",
+    ),
+    path(
+        "async/favourite/planet/bulk/",
+        AsyncBulkFavouritePlanetView.as_view(),
+        name="async-favourite-planet-bulk",
+    ),
 ]
@@ -1,26 +1,167 @@
+import math
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
 from .exceptions import ExternalApiFailedException
 
+REQUEST_TIMEOUT = 10
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5
+MAX_CONCURRENCY = 4
+
+
+def build_session(
+    pool_size=MAX_CONCURRENCY, retries=MAX_RETRIES, backoff_factor=BACKOFF_FACTOR
+):
+    """
+    Session reusing pooled connections, failed requests and retryable status codes
+    are retried with exponential backoff
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def page_url(api_url, page):
+    scheme, netloc, path, query, fragment = urlsplit(api_url)
+    params = dict(parse_qsl(query))
+    params["page"] = page
+    return urlunsplit((scheme, netloc, path, urlencode(params), fragment))
+
+
+def fetch_all_records(api_url, session=None, concurrency=MAX_CONCURRENCY, start_page=1):
+    """
+    Generator yielding the records of external api one page at a time, the page count
+    is computed from the first page so remaining pages are fetched in parallel.
+    At most `concurrency` pages are in flight or waiting to be consumed, pages are
+    yielded in order starting at `start_page`
+    """
+    session = session or build_session(pool_size=concurrency)
+    first_page = call_api(api_url, session)
+    count = first_page.get("count")
+    page_size = len(first_page.get("results", []))
+    if start_page <= 1:
+        yield first_page.get("results", [])
+
+    if not first_page.get("next"):
+        return
+    if count is None or not page_size:
+        # page count unknown, walk next links one by one
+        next_url = first_page.get("next")
+        page = 2
+        while next_url:
+            data = call_api(next_url, session)
+            if page >= start_page:
+                yield data.get("results", [])
+            next_url = data.get("next")
+            page += 1
+        return
+
+    urls = (
+        page_url(api_url, page)
+        for page in range(max(2, start_page), math.ceil(count / page_size) + 1)
+    )
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = deque(
+            executor.submit(call_api, url, session) for url in islice(urls, concurrency)
+        )
+        while pending:
+            data = pending.popleft().result()
+            url = next(urls, None)
+            if url:
+                pending.append(executor.submit(call_api, url, session))
+            yield data.get("results", [])
+
 
-def fetch_all_records(api_url):
+def fetch_all_resources(
+    api_urls, session=None, concurrency=MAX_CONCURRENCY, start_pages=None
+):
     """
-    Iteratively fetch all records from external api
+    Fetch several resources concurrently, yields (resource name, page of records)
+    pairs as pages arrive. Fetching stalls while `concurrency` pages wait to be consumed.
+    Pages of a resource arrive in order, from its page in `start_pages` if given
     """
-    all_records = []
-    next = api_url
-    while next:
-        data = call_api(next)
-        all_records.extend(data.get("results", []))
-        next = data.get("next")
-    return all_records
+    session = session or build_session(pool_size=concurrency * len(api_urls))
+    start_pages = start_pages or {}
+    pages = queue.Queue(maxsize=concurrency)
+    stopped = threading.Event()
+
+    def produce(name, api_url):
+        try:
+            for page in fetch_all_records(
+                api_url, session, concurrency, start_pages.get(name, 1)
+            ):
+                if not put(name, page):
+                    return
+            put(name, None)
+        except Exception as error:
+            put(name, error)
 
+    def put(name, item):
+        while not stopped.is_set():
+            try:
+                pages.put((name, item), timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
 
-def call_api(api_url):
+    producers = [
+        threading.Thread(target=produce, args=(name, api_url), daemon=True)
+        for name, api_url in api_urls.items()
+    ]
+    for producer in producers:
+        producer.start()
     try:
-        data = requests.get(api_url).json()
+        remaining = len(producers)
+        while remaining:
+            name, item = pages.get()
+            if item is None:
+                remaining -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield name, item
+    finally:
+        stopped.set()
+
+
+def call_api(api_url, session=None, timeout=REQUEST_TIMEOUT):
+    session = session or requests
+    try:
+        response = session.get(api_url, timeout=timeout)
+        response.raise_for_status()
+        data = response.json()
     except requests.exceptions.ConnectionError:
         raise ExternalApiFailedException(
             "Connection Error happened while fetching data"
         )
+    except requests.exceptions.Timeout:
+        raise ExternalApiFailedException("Timed out while fetching data")
+    except requests.exceptions.HTTPError as error:
+        raise ExternalApiFailedException(
+            f"External api responded with status {error.response.status_code}"
+        )
+    except ValueError:
+        raise ExternalApiFailedException("External api returned malformed data")
     else:
         return data
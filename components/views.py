@@ -1,121 +1,683 @@
-from django.db.models import Q
+from django.conf import settings
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
 
+from rest_framework.exceptions import ValidationError
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .models import FavouriteMovie, FavouritePlanet
+from .autocomplete import movie_autocomplete, planet_autocomplete
+from .compression import negotiate
+from .caching import (
+    catalogue_payloads,
+    catalogue_searches,
+    catalogue_version,
+    movie_favourites,
+    planet_favourites,
+    primary_pins,
+)
+from .jobs import enqueue_job
+from .models import (
+    FavouriteMovie,
+    FavouritePlanet,
+    MAX_ID,
+    IngestionJob,
+    Movie,
+    MovieCatalogueEntry,
+    Planet,
+    PlanetCatalogueEntry,
+)
+from .metrics import registry, timing
+from .pagination import KeysetPaginator
+from .queries import movie_planets, movie_queryset, planet_films, planet_queryset
+from .rendering import dumps, movie_rows, planet_rows, stream_ndjson
+from .routers import read_alias_for, reading_from
 
 from .serializers import (
-    MovieListSerializer,
-    PlanetListSerializer,
+    BulkFavouriteMovieItemSerializer,
+    BulkFavouritePlanetItemSerializer,
+    BulkFavouriteSerializer,
+    FavouriteMovieDeleteSerializer,
+    FavouriteMovieUpsertSerializer,
+    FavouritePlanetDeleteSerializer,
+    FavouritePlanetUpsertSerializer,
     FavouriteMovieSerializer,
     FavouritePlanetSerializer,
+    IngestionJobSerializer,
 )
 
-from .models import Planet, Movie
+STREAM_CHUNK_SIZE = 2000
+AUTOCOMPLETE_LIMIT = 10
+MAX_AUTOCOMPLETE_LIMIT = 50
+
+
+def parse_user_id(query_params):
+    user_id = query_params.get("user_id")
+    if not user_id:
+        return None
+    try:
+        user_id = int(user_id)
+    except ValueError:
+        raise ValidationError({"user_id": "A valid integer is required"})
+    if not 0 <= user_id <= MAX_ID:
+        raise ValidationError(
+            {"user_id": f"Ensure this value is between 0 and {MAX_ID}."}
+        )
+    return user_id
+
+
+def parse_include(query_params, includes):
+    include = query_params.get("include")
+    if not include:
+        return None
+    if include not in includes:
+        raise ValidationError(
+            {"include": f"Expected one of: {', '.join(includes) or 'none'}"}
+        )
+    return include
+
+
+def parse_stream(query_params):
+    return query_params.get("stream") in ("1", "true")
+
+
+def parse_autocomplete_limit(query_params):
+    limit = query_params.get("limit")
+    if limit is None:
+        return AUTOCOMPLETE_LIMIT
+    try:
+        limit = int(limit)
+    except ValueError:
+        raise ValidationError({"limit": "A valid integer is required"})
+    if limit < 1:
+        raise ValidationError({"limit": "Ensure this value is greater than 0"})
+    return min(limit, MAX_AUTOCOMPLETE_LIMIT)
+
+
+def page_etag(version, kind, paginator, encoding=None):
+    # every encoding of a page is a representation of its own
+    suffix = f"-{encoding}" if encoding else ""
+    return f'"{version}-{kind}-{paginator.limit}-{paginator.after or 0}{suffix}"'
+
+
+def page_response(content, etag, encoding=None):
+    response = HttpResponse(
+        content, content_type="application/json", headers={"ETag": etag}
+    )
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
+
+
+def search_key(version, kind, include, paginator, term):
+    return f"{version}:{kind}:{include}:{paginator.limit}:{paginator.after}:{term}"
+
+
+class CatalogueListMixin:
+    """
+    Parameters, querysets and rendering of the catalogue lists, shared by the views
+    below and their native async counterparts in components.async_views
+    """
+
+    kind = None
+    search_param = None
+    row_renderer = None
+    entry_model = None
+    # include param value -> Relation loaded for the rows of a page
+    includes = {}
+
+    def get_queryset(self, user_id, has_favourites, term):
+        raise NotImplementedError
+
+    def user_entries(self, user_id):
+        # a user without favourites reads the plain catalogue, no entry join needed
+        return self.entry_model.objects.filter(user_id=user_id)
+
+    def parse_params(self, query_params):
+        include = parse_include(query_params, self.includes)
+        if include and parse_stream(query_params):
+            # streamed rows are never joined to their related objects
+            raise ValidationError({"include": "Cannot be combined with stream"})
+        return (
+            query_params.get(self.search_param),
+            parse_user_id(query_params),
+            include,
+        )
+
+    def page_kind(self, include):
+        return f"{self.kind}+{include}" if include else self.kind
+
+    def not_modified(self, request, etag):
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            return HttpResponseNotModified(
+                headers={"ETag": etag, "Vary": "Accept-Encoding"}
+            )
+        return None
+
+    def to_page_data(self, paginator, rows, related, include):
+        with timing("serialize"):
+            data = self.row_renderer.to_data(rows)
+            if include:
+                for node in data:
+                    node[include] = related.get(node["id"], [])
+            return paginator.get_paginated_data(data)
+
+    def render(self, data):
+        with timing("render"):
+            return dumps(data)
+
+
+class CatalogueListView(CatalogueListMixin, APIView):
+    """
+    Shared list behaviour of the catalogue endpoints, anonymous and unfiltered pages
+    are served from pre-encoded payloads of the current catalogue version, concurrent
+    identical anonymous requests are computed once.
+    Rows are fetched as tuples and encoded straight to JSON, skipping the per-row
+    serializer fields. `stream=1` streams the whole list unpaginated as NDJSON,
+    `include` adds the related objects of each row of the page, see `includes`
+    """
+
+    def list(self, request):
+        term, user_id, include = self.parse_params(request.query_params)
+        with reading_from(read_alias_for(user_id)):
+            if parse_stream(request.query_params):
+                return self.stream_list(user_id, term)
+            paginator = KeysetPaginator(request.query_params)
+            if user_id is None and not term:
+                return self.cached_list(request, paginator, include)
+            if user_id is None:
+                content = self.searched_list(paginator, term, include)
+            else:
+                has_favourites = self.user_entries(user_id).exists()
+                content = self.render(
+                    self.get_page_data(
+                        paginator, user_id, has_favourites, term, include
+                    )
+                )
+        return HttpResponse(content, content_type="application/json")
+
+    def get_page_data(self, paginator, user_id, has_favourites, term, include=None):
+        queryset = self.row_renderer.rows(
+            self.get_queryset(user_id, has_favourites, term)
+        )
+        rows = paginator.paginate_queryset(queryset)
+        related = (
+            self.includes[include].load([row.id for row in rows]) if include else {}
+        )
+        return self.to_page_data(paginator, rows, related, include)
+
+    def stream_list(self, user_id, term):
+        has_favourites = user_id is not None and self.user_entries(user_id).exists()
+        queryset = self.get_queryset(user_id, has_favourites, term).order_by("id")
+        # rows are read after the view returns, bind the database chosen for the request
+        queryset = queryset.using(queryset.db)
+        return StreamingHttpResponse(
+            stream_ndjson(self.row_renderer, queryset, STREAM_CHUNK_SIZE),
+            content_type="application/x-ndjson",
+        )
+
+    def cached_list(self, request, paginator, include=None):
+        version = catalogue_version.get()
+        kind = self.page_kind(include)
+        encoding = negotiate(request.headers.get("Accept-Encoding", ""))
+        not_modified = self.not_modified(
+            request, page_etag(version, kind, paginator, encoding)
+        )
+        if not_modified:
+            return not_modified
+        served, content = catalogue_payloads.get_or_build(
+            version,
+            kind,
+            paginator.limit,
+            paginator.after,
+            lambda: self.render(
+                self.get_page_data(paginator, None, False, None, include)
+            ),
+            encoding,
+        )
+        # a stale page served while the current one is built keeps its own etag
+        return page_response(
+            content, page_etag(served, kind, paginator, encoding), encoding
+        )
+
+    def searched_list(self, paginator, term, include=None):
+        """
+        Anonymous search results, users' favourites change their results and are
+        never shared between requests
+        """
+        key = search_key(catalogue_version.get(), self.kind, include, paginator, term)
+        return catalogue_searches.do(
+            key,
+            lambda: self.render(
+                self.get_page_data(paginator, None, False, term, include)
+            ),
+        )
+
+
+class MovieListMixin(CatalogueListMixin):
+    kind = "movie"
+    search_param = "title"
+    row_renderer = movie_rows
+    entry_model = MovieCatalogueEntry
+    includes = {"planets": movie_planets}
+
+    def get_queryset(self, user_id, has_favourites, title):
+        return movie_queryset(user_id, has_favourites, title)
+
+
+class PlanetListMixin(CatalogueListMixin):
+    kind = "planet"
+    search_param = "name"
+    row_renderer = planet_rows
+    entry_model = PlanetCatalogueEntry
+    includes = {"films": planet_films}
+
+    def get_queryset(self, user_id, has_favourites, name):
+        return planet_queryset(user_id, has_favourites, name)
 
 
-class MovieListView(APIView):
+class MovieListView(MovieListMixin, CatalogueListView):
     def get(self, request):
         """
         Api to get list of movies,
         if user_id is provided, we fetch movies and overwrite titles from user favourites
         if title is provided, we filter movies based on title and from user favourites
+        results are paginated on id, `limit` sets the page size and `cursor` is the
+        `next` value returned by the previous page, `stream=1` returns every row as NDJSON,
+        `include=planets` adds the planets of each movie
         """
-        title = request.query_params.get("title")
-        user_id = request.query_params.get("user_id")
+        return self.list(request)
 
-        queryset = Movie.objects.all()
 
-        if user_id:
-            user_favourites = FavouriteMovie.objects.filter(user_id=user_id)
-        else:
-            user_favourites = FavouriteMovie.objects.none()
+class PlanetListView(PlanetListMixin, CatalogueListView):
+    def get(self, request):
+        """
+        Api to get list of planets,
+        if user_id is provided, we fetch planets and overwrite name from user favourites
+        if name is provided, we filter planets based on name and from user favourites
+        results are paginated on id, `limit` sets the page size and `cursor` is the
+        `next` value returned by the previous page, `stream=1` returns every row as NDJSON,
+        `include=films` adds the movies each planet appears in
+        """
+        return self.list(request)
 
-        if title:
-            user_favourites = user_favourites.filter(custom_title__icontains=title)
-            favourite_renamed_movies = [obj.movie_id for obj in user_favourites]
-            queryset = queryset.filter(
-                Q(title__icontains=title) | Q(id__in=favourite_renamed_movies)
-            ).distinct()
 
-        user_favourites_map = {
-            obj.movie_id: obj.custom_title for obj in user_favourites
-        }
-        movie_data = MovieListSerializer(queryset, many=True).data
-        for node in movie_data:
-            if node["id"] in user_favourites_map:
-                custom_title = user_favourites_map[node["id"]]
-                if custom_title:
-                    node["title"] = custom_title
-                node["is_favourite"] = True
-            else:
-                node["is_favourite"] = False
+class AutocompleteView(APIView):
+    """
+    Prefix matches of catalogue names served from a process-local index,
+    without a database query once the index is built and the user favourites cached
+    """
 
-        return Response({"results": movie_data})
+    search_param = None
+    autocomplete = None
 
+    def complete(self, request):
+        term = request.query_params.get(self.search_param, "")
+        user_id = parse_user_id(request.query_params)
+        limit = parse_autocomplete_limit(request.query_params)
+        matches = self.autocomplete.complete(term, limit, user_id)
+        with timing("serialize"):
+            data = {
+                "results": [
+                    {
+                        "id": object_id,
+                        self.search_param: name,
+                        "is_favourite": favourite,
+                    }
+                    for object_id, name, favourite in matches
+                ]
+            }
+        return HttpResponse(self.render(data), content_type="application/json")
+
+    def render(self, data):
+        with timing("render"):
+            return dumps(data)
+
+
+class MovieAutocompleteView(AutocompleteView):
+    search_param = "title"
+    autocomplete = movie_autocomplete
 
-class PlanetListView(APIView):
     def get(self, request):
         """
-        Api to get list of planets,
-        if user_id is provided, we fetch planets and overwrite name from user favourites
-        if name is provided, we filter planets based on name and from user favourites
+        Api to complete a movie title as it is typed, matches any word of the title
+        starting with `title`, the user renamed favourites first when user_id is provided,
+        `limit` sets the number of results (default 10, max 50)
         """
-        name = request.query_params.get("name")
-        user_id = request.query_params.get("user_id")
+        return self.complete(request)
 
-        queryset = Planet.objects.all()
 
-        if user_id:
-            user_favourites = FavouritePlanet.objects.filter(user_id=user_id)
-        else:
-            user_favourites = FavouritePlanet.objects.none()
+class PlanetAutocompleteView(AutocompleteView):
+    search_param = "name"
+    autocomplete = planet_autocomplete
 
-        if name:
-            user_favourites = user_favourites.filter(custom_name__icontains=name)
-            favourite_renamed_planets = [obj.planet_id for obj in user_favourites]
-            queryset = queryset.filter(
-                Q(name__icontains=name) | Q(id__in=favourite_renamed_planets)
-            ).distinct()
+    def get(self, request):
+        """
+        Api to complete a planet name as it is typed, matches any word of the name
+        starting with `name`, the user renamed favourites first when user_id is provided,
+        `limit` sets the number of results (default 10, max 50)
+        """
+        return self.complete(request)
 
-        user_favourites_map = {
-            obj.planet_id: obj.custom_name for obj in user_favourites
-        }
-        planet_data = PlanetListSerializer(queryset, many=True).data
-        for node in planet_data:
-            if node["id"] in user_favourites_map:
-                custom_name = user_favourites_map[node["id"]]
-                if custom_name:
-                    node["name"] = custom_name
-                node["is_favourite"] = True
+
+class FavouriteMixin:
+    """
+    Validation and serialization of single favourite writes, shared by the views
+    below and their native async counterparts
+    """
+
+    model = None
+    object_field = None
+    name_field = None
+    serializer_class = None
+    upsert_serializer_class = None
+    delete_serializer_class = None
+    entry_model = None
+    favourites_cache = None
+
+    def validate_upsert(self, data):
+        serializer = self.upsert_serializer_class(data=data)
+        serializer.is_valid(raise_exception=True)
+        return (
+            serializer.validated_data["user_id"],
+            serializer.validated_data[self.object_field],
+            serializer.validated_data.get(self.name_field),
+        )
+
+    def validate_delete(self, data):
+        serializer = self.delete_serializer_class(data=data)
+        serializer.is_valid(raise_exception=True)
+        return (
+            serializer.validated_data["user_id"],
+            serializer.validated_data[self.object_field],
+        )
+
+    def missing_object(self):
+        return ValidationError({self.object_field: ["Object does not exist."]})
+
+    def to_data(self, favourite):
+        with timing("serialize"):
+            return {"data": self.serializer_class(favourite).data}
+
+
+class FavouriteView(FavouriteMixin, APIView):
+    """
+    Favourite writes with upsert semantics, each write is a single statement
+    followed by one statement refreshing the user catalogue entries
+    """
+
+    def upsert(self, request):
+        user_id, object_id, custom_name = self.validate_upsert(request.data)
+        favourite = self.model.objects.upsert(user_id, object_id, custom_name)
+        if favourite is None:
+            raise self.missing_object()
+        self.favourites_cache.invalidate(user_id)
+        self.entry_model.objects.materialize(user_id, [object_id])
+        primary_pins.pin(user_id)
+        return Response(self.to_data(favourite))
+
+    def remove(self, request):
+        user_id, object_id = self.validate_delete(request.data)
+        if not self.model.objects.remove(user_id, object_id):
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        self.favourites_cache.invalidate(user_id)
+        self.entry_model.objects.remove(user_id, object_id)
+        primary_pins.pin(user_id)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class FavouriteMovieMixin(FavouriteMixin):
+    model = FavouriteMovie
+    object_field = "movie"
+    name_field = "custom_title"
+    serializer_class = FavouriteMovieSerializer
+    upsert_serializer_class = FavouriteMovieUpsertSerializer
+    delete_serializer_class = FavouriteMovieDeleteSerializer
+    entry_model = MovieCatalogueEntry
+    favourites_cache = movie_favourites
+
+
+class FavouritePlanetMixin(FavouriteMixin):
+    model = FavouritePlanet
+    object_field = "planet"
+    name_field = "custom_name"
+    serializer_class = FavouritePlanetSerializer
+    upsert_serializer_class = FavouritePlanetUpsertSerializer
+    delete_serializer_class = FavouritePlanetDeleteSerializer
+    entry_model = PlanetCatalogueEntry
+    favourites_cache = planet_favourites
+
+
+class FavouriteMovieView(FavouriteMovieMixin, FavouriteView):
+    def post(self, request):
+        """
+        Api to add movie to user favourite, re-adding it replaces its custom title
+        """
+        return self.upsert(request)
+
+    def put(self, request):
+        """
+        Api to add or replace movie in user favourite
+        """
+        return self.upsert(request)
+
+    def delete(self, request):
+        """
+        Api to remove movie from user favourite
+        """
+        return self.remove(request)
+
+
+class FavouritePlanetView(FavouritePlanetMixin, FavouriteView):
+    def post(self, request):
+        """
+        Api to add planet to user favourite, re-adding it replaces its custom name
+        """
+        return self.upsert(request)
+
+    def put(self, request):
+        """
+        Api to add or replace planet in user favourite
+        """
+        return self.upsert(request)
+
+    def delete(self, request):
+        """
+        Api to remove planet from user favourite
+        """
+        return self.remove(request)
+
+
+class BulkFavouriteMixin:
+    """
+    Validation and writes of bulk favourite requests, shared by the view below and
+    its native async counterpart
+    """
+
+    model = None
+    catalogue_model = None
+    object_field = None
+    name_field = None
+    item_serializer_class = None
+    entry_model = None
+    favourites_cache = None
+
+    def validate_items(self, data):
+        """
+        Returns the user id, the custom name of each valid item by object id and
+        the result of every item
+        """
+        serializer = BulkFavouriteSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        results = []
+        favourites = {}
+        for item in serializer.validated_data["items"]:
+            item_serializer = self.item_serializer_class(data=item)
+            if item_serializer.is_valid():
+                object_id = item_serializer.validated_data[self.object_field]
+                favourites[object_id] = item_serializer.validated_data.get(
+                    self.name_field
+                )
+                results.append({self.object_field: object_id, "status": "saved"})
             else:
-                node["is_favourite"] = False
+                results.append({"status": "invalid", "errors": item_serializer.errors})
+        return serializer.validated_data["user_id"], favourites, results
+
+    def saved_ids(self, favourites, results, existing):
+        """
+        Marks the items of catalogue objects missing from `existing` invalid,
+        returns the object ids to save
+        """
+        for result in results:
+            if (
+                result["status"] == "saved"
+                and result[self.object_field] not in existing
+            ):
+                result["status"] = "invalid"
+                result["errors"] = {self.object_field: ["Object does not exist."]}
+        return [object_id for object_id in favourites if object_id in existing]
+
+    def to_objects(self, user_id, favourites, saved):
+        return [
+            self.model(
+                user_id=user_id,
+                **{
+                    f"{self.object_field}_id": object_id,
+                    self.name_field: favourites[object_id],
+                },
+            )
+            for object_id in saved
+        ]
+
+    def upsert_options(self):
+        return {
+            "update_conflicts": True,
+            # attname, not field name, so the conflict target is the column on django 4.1
+            "unique_fields": ["user_id", f"{self.object_field}_id"],
+            "update_fields": [self.name_field],
+        }
+
+
+class BulkFavouriteView(BulkFavouriteMixin, APIView):
+    """
+    Adds or updates many favourites of a user at once, catalogue ids are checked
+    with one IN query and favourites are written with a single upsert
+    """
 
-        return Response({"results": planet_data})
+    def create(self, request):
+        user_id, favourites, results = self.validate_items(request.data)
+        existing = set(
+            self.catalogue_model.objects.filter(id__in=favourites).values_list(
+                "id", flat=True
+            )
+        )
+        saved = self.saved_ids(favourites, results, existing)
+        self.model.objects.bulk_create(
+            self.to_objects(user_id, favourites, saved), **self.upsert_options()
+        )
+        # bulk_create sends no signals, cached favourites are reloaded on next read
+        self.favourites_cache.invalidate(user_id)
+        self.entry_model.objects.materialize(user_id, saved)
+        primary_pins.pin(user_id)
+        return Response({"data": {"user_id": user_id, "results": results}})
 
 
-class FavouriteMovieView(APIView):
+class BulkFavouriteMovieMixin(BulkFavouriteMixin):
+    model = FavouriteMovie
+    catalogue_model = Movie
+    object_field = "movie"
+    name_field = "custom_title"
+    item_serializer_class = BulkFavouriteMovieItemSerializer
+    entry_model = MovieCatalogueEntry
+    favourites_cache = movie_favourites
+
+
+class BulkFavouritePlanetMixin(BulkFavouriteMixin):
+    model = FavouritePlanet
+    catalogue_model = Planet
+    object_field = "planet"
+    name_field = "custom_name"
+    item_serializer_class = BulkFavouritePlanetItemSerializer
+    entry_model = PlanetCatalogueEntry
+    favourites_cache = planet_favourites
+
+
+class BulkFavouriteMovieView(BulkFavouriteMovieMixin, BulkFavouriteView):
     def post(self, request):
         """
-        Api to add movie to user favourite
+        Api to add many movies to user favourites in one request
         """
-        serializer = FavouriteMovieSerializer(data=request.data)
-        if serializer.is_valid():
-            serializer.save()
-            return Response({"data": serializer.data})
-        else:
-            return Response(status=status.HTTP_400_BAD_REQUEST, data=serializer.errors)
+        return self.create(request)
 
 
-class FavouritePlanetView(APIView):
+class BulkFavouritePlanetView(BulkFavouritePlanetMixin, BulkFavouriteView):
     def post(self, request):
         """
-        Api to add planet to user favourite
+        Api to add many planets to user favourites in one request
+        """
+        return self.create(request)
+
+
+class MetricsView(APIView):
+    def get(self, request):
+        """
+        Api exposing request and cache metrics of this process in the prometheus
+        text format, only to METRICS_ALLOWED_IPS and when METRICS_ENABLED is set
+        """
+        if (
+            not settings.METRICS_ENABLED
+            or request.META.get("REMOTE_ADDR") not in settings.METRICS_ALLOWED_IPS
+        ):
+            raise Http404
+        return HttpResponse(
+            registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+        )
+
+
+def check_ingestion_allowed(request):
+    if request.META.get("REMOTE_ADDR") not in settings.INGESTION_ALLOWED_IPS:
+        raise Http404
+
+
+class IngestionJobsView(APIView):
+    def get(self, request):
+        """
+        Api listing the latest ingestion jobs, only to INGESTION_ALLOWED_IPS
+        """
+        check_ingestion_allowed(request)
+        jobs = IngestionJob.objects.order_by("-created")[:20]
+        return Response(IngestionJobSerializer(jobs, many=True).data)
+
+    def post(self, request):
+        """
+        Api queueing a catalogue ingestion for the ingestion_worker command,
+        a job already queued or running is returned with 409 instead
+        """
+        check_ingestion_allowed(request)
+        serializer = IngestionJobSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job, created = enqueue_job(serializer.validated_data.get("incremental", False))
+        return Response(
+            IngestionJobSerializer(job).data,
+            status=status.HTTP_202_ACCEPTED if created else status.HTTP_409_CONFLICT,
+        )
+
+
+class IngestionJobView(APIView):
+    def get(self, request, pk):
+        """
+        Api returning the status and per resource progress of an ingestion job
         """
-        serializer = FavouritePlanetSerializer(data=request.data)
-        if serializer.is_valid():
-            serializer.save()
-            return Response({"data": serializer.data})
-        else:
-            return Response(status=status.HTTP_400_BAD_REQUEST, data=serializer.errors)
+        check_ingestion_allowed(request)
+        try:
+            job = IngestionJob.objects.get(pk=pk)
+        except IngestionJob.DoesNotExist:
+            raise Http404
+        return Response(IngestionJobSerializer(job).data)
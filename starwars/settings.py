@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+import django
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -43,6 +46,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "components.metrics.MetricsMiddleware",
+    "components.compression.CompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -76,13 +81,118 @@ WSGI_APPLICATION = "starwars.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
 
+# sqlite by default, set POSTGRES_DB to run on postgresql with persistent connections
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "NAME": os.environ.get("SQLITE_PATH", BASE_DIR / "db.sqlite3"),
     }
 }
 
+if os.environ.get("POSTGRES_DB"):
+    DATABASES["default"] = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": os.environ["POSTGRES_DB"],
+        "USER": os.environ.get("POSTGRES_USER", "postgres"),
+        "PASSWORD": os.environ.get("POSTGRES_PASSWORD", ""),
+        "HOST": os.environ.get("POSTGRES_HOST", "localhost"),
+        "PORT": os.environ.get("POSTGRES_PORT", "5432"),
+        # connections are kept open across requests and checked before reuse
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": True,
+    }
+    if django.VERSION >= (5, 1):
+        # psycopg 3 connection pool, replaces persistent connections
+        DATABASES["default"]["CONN_MAX_AGE"] = 0
+        DATABASES["default"]["OPTIONS"] = {
+            "pool": {
+                "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", 2)),
+                "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", 10)),
+            }
+        }
+
+# covering indexes (include) only exist on postgresql, sqlite skips the included
+# columns of CoveringUniqueConstraint
+if DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3":
+    SILENCED_SYSTEM_CHECKS = ["models.W039"]
+
+# read replicas of the default database, comma separated sqlite paths or postgresql
+# hosts. List endpoints read from them round-robin, see components.routers
+
+DATABASE_REPLICAS = []
+
+for index, replica in enumerate(
+    filter(None, os.environ.get("DATABASE_REPLICAS", "").split(",")), start=1
+):
+    location = "HOST" if os.environ.get("POSTGRES_DB") else "NAME"
+    DATABASES[f"replica_{index}"] = {
+        **DATABASES["default"],
+        location: replica.strip(),
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica_{index}")
+
+DATABASE_ROUTERS = ["components.routers.ReplicaRouter"]
+
+# seconds a user reads from the primary after writing favourites
+REPLICA_PIN_SECONDS = int(os.environ.get("REPLICA_PIN_SECONDS", 5))
+
+# applied to every new sqlite connection, see components.signals
+SQLITE_PRAGMAS = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "mmap_size": 256 * 1024 * 1024,
+    "busy_timeout": 5000,
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+# in-process LRU by default, point REDIS_URL at a redis server to share it across workers
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    }
+}
+
+if os.environ.get("REDIS_URL"):
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ["REDIS_URL"],
+    }
+
+FAVOURITES_CACHE_ALIAS = "default"
+FAVOURITES_CACHE_TIMEOUT = 60 * 60
+
+CATALOGUE_CACHE_ALIAS = "default"
+CATALOGUE_CACHE_TIMEOUT = 10 * 60
+# serve the page of the previous catalogue version while its current page is built
+CATALOGUE_STALE_WHILE_REVALIDATE = os.environ.get(
+    "CATALOGUE_STALE_WHILE_REVALIDATE", ""
+) in ("1", "true")
+# longest wait for a page computed by another request before computing it too
+SINGLE_FLIGHT_TIMEOUT = 10
+
+
+# Request metrics, see components.metrics
+# Server-Timing headers on every response and prometheus metrics on /metrics,
+# the middleware removes itself when disabled
+
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "") in ("1", "true")
+METRICS_ALLOWED_IPS = ["127.0.0.1", "::1"]
+
+
+# Background ingestion, see components.jobs
+# Jobs are queued on /ingestion/jobs/ or with prepopulate_data --background and run
+# by the ingestion_worker command, a running job without a heartbeat for
+# INGESTION_JOB_STALE_SECONDS is resumed by the next worker
+
+INGESTION_JOB_STALE_SECONDS = 5 * 60
+INGESTION_ALLOWED_IPS = ["127.0.0.1", "::1"]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
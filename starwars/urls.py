@@ -18,7 +18,12 @@ from django.contrib import admin
 from django.urls import path, include
 from django.http.response import HttpResponse
 
+from components.views import IngestionJobView, IngestionJobsView, MetricsView
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("components/", include("components.urls")),
+    path("metrics", MetricsView.as_view(), name="metrics"),
+    path("ingestion/jobs/", IngestionJobsView.as_view(), name="ingestion-jobs"),
+    path("ingestion/jobs/<int:pk>/", IngestionJobView.as_view(), name="ingestion-job"),
 ]